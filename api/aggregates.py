@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+
+def _bucket():
+    return {"total": 0, "active": 0, "usage": 0}
+
+
+class StatsAggregator:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.licenses = _bucket()
+        self.api_keys = _bucket()
+        self.by_license_type = defaultdict(_bucket)
+        self.by_service = defaultdict(_bucket)
+
+    def rebuild(self, licenses, api_keys):
+        self.reset()
+        for license_data in licenses.values():
+            self.add_license(license_data)
+        for key_data in api_keys.values():
+            self.add_api_key(key_data)
+
+    def _apply(self, buckets, data, sign):
+        active = 1 if data.get("is_active", False) else 0
+        usage = data.get("usage_count", 0)
+        for bucket in buckets:
+            bucket["total"] += sign
+            bucket["active"] += sign * active
+            bucket["usage"] += sign * usage
+
+    def add_license(self, license_data, sign=1):
+        self._apply((self.licenses, self.by_license_type[license_data["license_type"]]), license_data, sign)
+
+    def remove_license(self, license_data):
+        self.add_license(license_data, -1)
+
+    def license_used(self, license_data, count=1):
+        self.licenses["usage"] += count
+        self.by_license_type[license_data["license_type"]]["usage"] += count
+
+    def add_api_key(self, key_data, sign=1):
+        self._apply((self.api_keys, self.by_service[key_data["service"]]), key_data, sign)
+
+    def remove_api_key(self, key_data):
+        self.add_api_key(key_data, -1)
+
+    def api_key_used(self, key_data, count=1):
+        self.api_keys["usage"] += count
+        self.by_service[key_data["service"]]["usage"] += count
+
+    def _breakdown(self, buckets):
+        return {
+            name: {
+                "total": bucket["total"],
+                "active": bucket["active"],
+                "inactive": bucket["total"] - bucket["active"],
+                "usage": bucket["usage"]
+            }
+            for name, bucket in buckets.items() if bucket["total"]
+        }
+
+    def snapshot(self):
+        return {
+            "licenses": {
+                "total": self.licenses["total"],
+                "active": self.licenses["active"],
+                "inactive": self.licenses["total"] - self.licenses["active"]
+            },
+            "api_keys": {
+                "total": self.api_keys["total"],
+                "active": self.api_keys["active"],
+                "inactive": self.api_keys["total"] - self.api_keys["active"]
+            },
+            "usage": {
+                "total_license_usage": self.licenses["usage"],
+                "total_api_usage": self.api_keys["usage"]
+            },
+            "license_types": self._breakdown(self.by_license_type),
+            "services": self._breakdown(self.by_service)
+        }
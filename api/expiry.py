@@ -0,0 +1,57 @@
+import bisect
+from datetime import datetime
+
+
+def expiry_timestamp(license_data):
+    return datetime.fromisoformat(license_data["expires_at"]).timestamp()
+
+
+class ExpiryIndex:
+    # (bitiş zamanı, lisans anahtarı) çiftlerinden oluşan sıralı liste
+    def __init__(self):
+        self._entries = []
+        self._expiry = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rebuild(self, licenses):
+        self._expiry = {
+            license_key: expiry_timestamp(license_data)
+            for license_key, license_data in licenses.items()
+            if license_data.get("is_active", False)
+        }
+        self._entries = sorted((expires_at, license_key) for license_key, expires_at in self._expiry.items())
+
+    def add(self, license_key, expires_at):
+        self.discard(license_key)
+        self._expiry[license_key] = expires_at
+        bisect.insort(self._entries, (expires_at, license_key))
+
+    def discard(self, license_key):
+        expires_at = self._expiry.pop(license_key, None)
+        if expires_at is None:
+            return
+        index = bisect.bisect_left(self._entries, (expires_at, license_key))
+        if index < len(self._entries) and self._entries[index] == (expires_at, license_key):
+            del self._entries[index]
+
+    def update(self, license_data):
+        if license_data.get("is_active", False):
+            self.add(license_data["license_key"], expiry_timestamp(license_data))
+        else:
+            self.discard(license_data["license_key"])
+
+    def pop_expired(self, now, limit):
+        end = bisect.bisect_right(self._entries, (now, "\uffff"))
+        end = min(end, limit)
+        expired = [license_key for _, license_key in self._entries[:end]]
+        del self._entries[:end]
+        for license_key in expired:
+            del self._expiry[license_key]
+        return expired
+
+    def expiring_between(self, start, end, limit):
+        first = bisect.bisect_left(self._entries, (start, ""))
+        last = bisect.bisect_right(self._entries, (end, "\uffff"))
+        return [license_key for _, license_key in self._entries[first:min(last, first + limit)]]
@@ -0,0 +1,282 @@
+import asyncio
+import functools
+import importlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+JOB_WORKERS = int(os.environ.get("TOOLBOX_JOB_WORKERS", str(os.cpu_count() or 2)))
+JOB_MAX_PENDING = int(os.environ.get("TOOLBOX_JOB_MAX_PENDING", "64"))
+JOB_DIR = os.environ.get("TOOLBOX_JOB_DIR", "jobs")
+JOB_RETENTION = float(os.environ.get("TOOLBOX_JOB_RETENTION", "3600"))
+
+PDF_TOOLS = ("tools.pdf_tools", "PDFTools")
+IMAGE_TOOLS = ("tools.image_tools", "ImageTools")
+CONVERT_TOOLS = ("tools.convert_tools", "ConvertTools")
+SYSTEM_TOOLS = ("tools.system_tools", "SystemTools")
+
+# mode: each = dosya başına bir çıktı, combine = tüm girdiler tek çıktı,
+# directory = dosya başına bir çıktı klasörü, digest = dosya başına bir değer
+# İşler zaten süreç havuzunda çalışır; "defaults" içindeki workers=1 iç içe süreç havuzu açılmasını önler.
+# "defaults" istemci parametrelerinin üzerine yazılır, istemci bu değerleri değiştiremez.
+# page_progress: araç progress_callback ile sayfa bazında ilerleme bildirir
+OPERATIONS = {
+    "pdf.merge": {"tool": PDF_TOOLS, "method": "merge_pdfs", "mode": "combine", "output": "merged.pdf"},
+    "pdf.from_images": {"tool": PDF_TOOLS, "method": "jpg_to_pdf", "mode": "combine", "output": "images.pdf"},
+    "pdf.split": {"tool": PDF_TOOLS, "method": "split_pdf", "mode": "directory", "defaults": {"workers": 1}},
+    "pdf.to_jpg": {"tool": PDF_TOOLS, "method": "pdf_to_jpg", "mode": "directory", "defaults": {"workers": 1},
+                   "page_progress": True},
+    "pdf.to_images": {"tool": PDF_TOOLS, "method": "pdf_to_images", "mode": "directory", "defaults": {"workers": 1},
+                      "page_progress": True},
+    "pdf.compress": {"tool": PDF_TOOLS, "method": "compress_pdf", "mode": "each", "defaults": {"workers": 1}},
+    "pdf.watermark_text": {"tool": PDF_TOOLS, "method": "add_watermark_text", "mode": "each"},
+    "image.convert": {"tool": IMAGE_TOOLS, "method": "convert_image", "mode": "each", "extension": "output_format"},
+    "image.resize": {"tool": IMAGE_TOOLS, "method": "resize_image", "mode": "each"},
+    "image.optimize": {"tool": IMAGE_TOOLS, "method": "optimize_image", "mode": "each"},
+    "image.watermark_text": {"tool": IMAGE_TOOLS, "method": "add_text_watermark", "mode": "each"},
+    "convert.format": {"tool": CONVERT_TOOLS, "method": "convert_format", "mode": "each", "extension": "output_format"},
+    "hash.md5": {"tool": SYSTEM_TOOLS, "method": "generate_md5", "mode": "digest"},
+    "hash.sha256": {"tool": SYSTEM_TOOLS, "method": "generate_sha256", "mode": "digest"},
+    "hash.sha512": {"tool": SYSTEM_TOOLS, "method": "generate_sha512", "mode": "digest"},
+}
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def _write_progress(job_dir, done, total, pages_done=None, pages_total=None):
+    progress = {"done": done, "total": total}
+    if pages_total is not None:
+        progress["pages_done"] = pages_done
+        progress["pages_total"] = pages_total
+    path = os.path.join(job_dir, "progress.json")
+    with open(path + ".tmp", 'w') as f:
+        json.dump(progress, f)
+    os.replace(path + ".tmp", path)
+
+
+def _remove_directories(directories):
+    for directory in directories:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _unique_path(directory, filename):
+    stem, ext = os.path.splitext(filename)
+    path = os.path.join(directory, filename)
+    index = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{stem}_{index}{ext}")
+        index += 1
+    return path
+
+
+def run_job(job_dir, operation, inputs, params):
+    # Ayrı bir süreçte çalışır; tool modülleri yalnızca burada içe aktarılır
+    spec = OPERATIONS[operation]
+    module_name, class_name = spec["tool"]
+    tool = getattr(importlib.import_module(module_name), class_name)()
+    method = getattr(tool, spec["method"])
+    output_dir = os.path.join(job_dir, "output")
+    os.makedirs(output_dir, exist_ok=True)
+    params = {**params, **spec.get("defaults", {})}
+    if "size" in params:
+        params["size"] = tuple(params["size"])
+    if "position" in params:
+        params["position"] = tuple(params["position"])
+
+    total = 1 if spec["mode"] == "combine" else len(inputs)
+    _write_progress(job_dir, 0, total)
+
+    if spec["mode"] == "digest":
+        digests = {}
+        for done, input_path in enumerate(inputs, 1):
+            digests[os.path.basename(input_path)] = method(input_path, **params)
+            _write_progress(job_dir, done, total)
+        return {"data": digests, "result": None}
+
+    if spec["mode"] == "combine":
+        method(inputs, os.path.join(output_dir, spec["output"]), **params)
+        _write_progress(job_dir, 1, total)
+    else:
+        for done, input_path in enumerate(inputs, 1):
+            stem, ext = os.path.splitext(os.path.basename(input_path))
+            if spec["mode"] == "directory":
+                target = _unique_path(output_dir, stem) if len(inputs) > 1 else output_dir
+                os.makedirs(target, exist_ok=True)
+            else:
+                extension = spec.get("extension")
+                if extension and params.get(extension):
+                    ext = "." + params[extension].lower().lstrip(".")
+                    if operation == "convert.format":
+                        params[extension] = ext
+                target = _unique_path(output_dir, stem + ext)
+            if spec.get("page_progress"):
+                params["progress_callback"] = functools.partial(_write_progress, job_dir, done - 1, total)
+            method(input_path, target, **params)
+            _write_progress(job_dir, done, total)
+
+    outputs = [os.path.join(root, name) for root, _, names in os.walk(output_dir) for name in names]
+    if len(outputs) == 1:
+        return {"data": None, "result": outputs[0]}
+    system_module, system_class = SYSTEM_TOOLS
+    system_tools = getattr(importlib.import_module(system_module), system_class)()
+    return {"data": None, "result": system_tools.create_zip([output_dir], os.path.join(job_dir, "result.zip"))}
+
+
+class JobManager:
+    def __init__(self, root=JOB_DIR, workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING, retention=JOB_RETENTION):
+        self.root = root
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self.jobs = {}
+        self.completed = 0
+        self.failed = 0
+        self._executor = None
+
+    def start(self):
+        os.makedirs(self.root, exist_ok=True)
+        # İşler yalnızca bellekte tutulur; önceki çalışmadan kalan klasörlerin sahibi yoktur
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+        # fork yerine spawn: olay döngüsü ve iş parçacıkları alt sürece kopyalanmaz
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def pending(self):
+        return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def create(self, operation, params, owner):
+        if operation not in OPERATIONS:
+            raise ValueError(f"Bilinmeyen işlem: {operation}")
+        if self.pending() >= self.max_pending:
+            raise JobQueueFull()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "operation": operation,
+            "params": params,
+            "owner": owner,
+            "status": "queued",
+            "created_at": time.time(),
+            "finished_at": None,
+            "inputs": [],
+            "uploads": [],
+            "result": None,
+            "data": None,
+            "error": None,
+            "progress": None,
+            "future": None
+        }
+        os.makedirs(os.path.join(self.root, job_id, "input"))
+        self.jobs[job_id] = job
+        return job
+
+    def job_dir(self, job):
+        return os.path.join(self.root, job["job_id"])
+
+    def add_input(self, job, spool_file):
+        directory = os.path.join(self.job_dir(job), "input", str(len(job["inputs"])))
+        os.makedirs(directory)
+        path = os.path.join(directory, spool_file.filename)
+        shutil.move(spool_file.path, path)
+        job["inputs"].append(path)
+        job["uploads"].append(spool_file.to_dict())
+
+    def submit(self, job):
+        loop = asyncio.get_running_loop()
+        job["future"] = loop.run_in_executor(self._executor, run_job, self.job_dir(job),
+                                             job["operation"], job["inputs"], job["params"])
+        job["future"].add_done_callback(lambda future: self._finish(job, future))
+
+    def _finish(self, job, future):
+        job["finished_at"] = time.time()
+        job["future"] = None
+        if future.cancelled():
+            job["status"] = "cancelled"
+            return
+        error = future.exception()
+        if error is not None:
+            job["status"] = "failed"
+            job["error"] = str(error) or error.__class__.__name__
+            self.failed += 1
+            return
+        outcome = future.result()
+        job["status"] = "completed"
+        job["result"] = outcome["result"]
+        job["data"] = outcome["data"]
+        self.completed += 1
+
+    def _read_progress(self, job):
+        try:
+            with open(os.path.join(self.job_dir(job), "progress.json"), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"done": 0, "total": None}
+
+    async def progress(self, job):
+        if job["progress"] is not None:
+            return job["progress"]
+        # İlerleme dosyası alt süreçte yazılır; olay döngüsünü bloklamamak için iş parçacığında okunur
+        finished = job["finished_at"] is not None
+        progress = await asyncio.get_running_loop().run_in_executor(None, self._read_progress, job)
+        if finished:
+            job["progress"] = progress
+        return progress
+
+    async def status(self, job):
+        progress = await self.progress(job)
+        status = job["status"]
+        if status == "queued" and progress["total"] is not None:
+            status = "running"
+        return {
+            "job_id": job["job_id"],
+            "operation": job["operation"],
+            "status": status,
+            "progress": progress,
+            "created_at": job["created_at"],
+            "finished_at": job["finished_at"],
+            "error": job["error"],
+            "inputs": job["uploads"],
+            "data": job["data"],
+            "has_result": job["result"] is not None
+        }
+
+    def get(self, job_id, owner):
+        job = self.jobs.get(job_id)
+        if job is None or job["owner"] != owner:
+            return None
+        return job
+
+    def _remove(self, job):
+        # İş kaydı ve future olay döngüsünde bırakılır; yalnızca dosya silme iş parçacığına taşınır
+        if job["future"] is not None:
+            job["future"].cancel()
+        self.jobs.pop(job["job_id"], None)
+        return self.job_dir(job)
+
+    async def delete(self, job):
+        directory = self._remove(job)
+        await asyncio.get_running_loop().run_in_executor(None, shutil.rmtree, directory, True)
+
+    async def prune(self, now=None):
+        # Süresi geçen tamamlanmış işler ve dosyaları silinir
+        now = time.time() if now is None else now
+        expired = [job for job in self.jobs.values()
+                   if job["finished_at"] is not None and now - job["finished_at"] > self.retention]
+        directories = [self._remove(job) for job in expired]
+        if directories:
+            await asyncio.get_running_loop().run_in_executor(None, _remove_directories, directories)
+        return len(expired)
@@ -1,15 +1,179 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import PlainTextResponse, FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 import uuid
 import json
 import os
 from datetime import datetime, timedelta
 import hashlib
+import hmac
+import asyncio
+import math
 import secrets
-from typing import Optional
+import time
+from typing import Optional, List
+from contextlib import asynccontextmanager
+from api.storage import open_store
+from api.repository import Repository
+from api.cache import VerificationCache
+from api.metrics import metrics, MetricsMiddleware, file_size
+from api.ratelimit import RateLimiter, QuotaTracker
+from api.rollups import UsageRollups
+from api.responses import FastJSONResponse
+from components import serialization
+from api.replication import (ROLE, REPLICATION_TOKEN, REPLICATION_USAGE_INTERVAL, ReplicationLog, ReplicaFollower,
+                             ReplicaMiddleware, ReplicationSeqMiddleware)
+from api.jobs import JobManager, JobQueueFull
+from api.uploads import MultipartSpool, UploadError, UploadTooLarge
+from components.license_tokens import (LicenseTokenSigner, LicenseTokenVerifier, RevocationList,
+                                       load_private_key, export_public_key)
 
-app = FastAPI(title="Python Toolbox API", version="1.0.0")
+async def sweep_expired_licenses():
+    while True:
+        try:
+            await expire_licenses()
+        except Exception as e:
+            print(f"Süresi dolan lisansları kapatma hatası: {e}")
+        await asyncio.sleep(EXPIRY_SWEEP_INTERVAL)
+
+async def expire_licenses():
+    total = 0
+    while True:
+        expired = repository.expiry.pop_expired(time.time(), EXPIRY_SWEEP_BATCH)
+        if not expired:
+            return total
+        with repository.transaction() as ops:
+            for license_key in expired:
+                repository.update_license(license_key, is_active=False)
+                verification_cache.invalidate(license_key)
+        await repository.commit(ops)
+        total += len(expired)
+
+def load_token_signer():
+    value = os.environ.get("TOOLBOX_SIGNING_KEY")
+    key_file = os.environ.get("TOOLBOX_SIGNING_KEY_FILE")
+    if key_file:
+        with open(key_file, 'r') as f:
+            value = f.read()
+    return LicenseTokenSigner(load_private_key(value)) if value else None
+
+repository = Repository()
+verification_cache = VerificationCache()
+revocations = RevocationList()
+rate_limiter = RateLimiter()
+quotas = QuotaTracker()
+rollups = UsageRollups()
+token_signer = load_token_signer()
+token_verifier = LicenseTokenVerifier(token_signer.public_key, revocations) if token_signer else None
+job_manager = JobManager()
+
+USAGE_FIELDS = {"usage_count", "last_used"}
+
+def load_revocations():
+    revocations.replace(
+        [key for key, lic in repository.licenses.items() if not lic.get("is_active", False)],
+        int(time.time())
+    )
+
+def replicated(ops):
+    # Replikada: birincil düğümden gelen değişiklikler önbellek ve iptal listesine yansıtılır
+    if ops is None:
+        verification_cache.clear()
+        load_revocations()
+        return
+    for op in ops:
+        if op[0] == "put_license":
+            key = op[1]["license_key"]
+        elif op[0] == "put_api_key":
+            key = op[1]["api_key"]
+        elif set(op[2]) <= USAGE_FIELDS:
+            continue
+        else:
+            key = op[1]
+        verification_cache.invalidate(key)
+        if op[0] == "update_license" and op[2].get("is_active") is False:
+            revocations.add(key)
+
+follower = ReplicaFollower(repository, on_apply=replicated) if ROLE == "replica" else None
+replication_log = ReplicationLog() if follower is None else None
+repository.log = replication_log
+
+@asynccontextmanager
+async def lifespan(app):
+    loop = asyncio.get_running_loop()
+    if follower is not None:
+        await follower.bootstrap()
+        tasks = [follower.run(), follower.forward_usage(), maintain_limits()]
+    else:
+        await repository.open(open_store)
+        load_revocations()
+        quotas.load(await loop.run_in_executor(None, list, repository.store.iter_quotas()))
+        rollups.load(await loop.run_in_executor(None, list, repository.store.iter_rollups()))
+        tasks = [maintain_limits(), maintain_rollups(), sweep_expired_licenses(), publish_usage()]
+    job_manager.start()
+    tasks.append(prune_jobs())
+    tasks = [loop.create_task(task) for task in tasks]
+    yield
+    for task in tasks:
+        task.cancel()
+    job_manager.shutdown()
+    if follower is None:
+        await repository.commit(quotas.flush_ops() + rollups.flush_ops())
+    await repository.close()
+
+QUOTA_FLUSH_INTERVAL = 5.0
+EXPIRY_SWEEP_INTERVAL = 60.0
+EXPIRY_SWEEP_BATCH = 500
+JOB_PRUNE_INTERVAL = 60.0
+ROLLUP_FLUSH_INTERVAL = 5.0
+ROLLUP_DOWNSAMPLE_INTERVAL = 3600.0
+
+async def maintain_limits():
+    while True:
+        await asyncio.sleep(QUOTA_FLUSH_INTERVAL)
+        try:
+            for _ in range(8):
+                rate_limiter.prune()
+            ops = quotas.prune() + quotas.flush_ops()
+            if ops and follower is None:
+                await repository.commit(ops)
+        except Exception as e:
+            print(f"Kota kaydetme hatası: {e}")
+
+async def maintain_rollups():
+    downsampled_at = 0.0
+    while True:
+        await asyncio.sleep(ROLLUP_FLUSH_INTERVAL)
+        try:
+            ops = rollups.flush_ops()
+            if time.time() - downsampled_at >= ROLLUP_DOWNSAMPLE_INTERVAL:
+                ops.extend(rollups.downsample())
+                downsampled_at = time.time()
+            if ops:
+                await repository.commit(ops)
+        except Exception as e:
+            print(f"Kullanım özetlerini kaydetme hatası: {e}")
+
+async def publish_usage():
+    while True:
+        await asyncio.sleep(REPLICATION_USAGE_INTERVAL)
+        replication_log.flush_usage()
+
+async def prune_jobs():
+    while True:
+        await asyncio.sleep(JOB_PRUNE_INTERVAL)
+        try:
+            await job_manager.prune()
+        except Exception as e:
+            print(f"İş temizleme hatası: {e}")
+
+app = FastAPI(title="Python Toolbox API", version="1.0.0", lifespan=lifespan)
+
+if follower is not None:
+    app.add_middleware(ReplicaMiddleware, follower=follower)
+else:
+    app.add_middleware(ReplicationSeqMiddleware, log=replication_log)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,9 +182,31 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
-LICENSES_FILE = "licenses.json"
-API_KEYS_FILE = "api_keys.json"
+def store_file_size():
+    path = getattr(repository.store, "path", None)
+    if path is None:
+        return 0
+    return file_size(path) + file_size(path + "-wal")
+
+metrics.register("toolbox_store_licenses", "Bellekteki lisans sayısı", lambda: len(repository.licenses))
+metrics.register("toolbox_store_api_keys", "Bellekteki API anahtarı sayısı", lambda: len(repository.api_keys))
+metrics.register("toolbox_store_file_bytes", "Depolama dosyasının boyutu", lambda: store_file_size())
+metrics.register("toolbox_usage_journal_bytes", "Kullanım günlüğünün boyutu", lambda: repository.journal.size())
+metrics.register("toolbox_store_batches_total", "Grup halinde yazılan işlem sayısı",
+                 lambda: repository.writer.batches_committed if repository.writer else 0, "counter")
+metrics.register("toolbox_store_ops_total", "Yazılan değişiklik sayısı",
+                 lambda: repository.writer.ops_committed if repository.writer else 0, "counter")
+metrics.register("toolbox_cache_hits_total", "Doğrulama önbelleği isabetleri", lambda: verification_cache.hits, "counter")
+metrics.register("toolbox_cache_misses_total", "Doğrulama önbelleği ıskaları", lambda: verification_cache.misses, "counter")
+metrics.register("toolbox_replication_seq", "Uygulanan son replikasyon kaydı",
+                 lambda: follower.seq if follower is not None else replication_log.seq)
+metrics.register("toolbox_replica_staleness_seconds", "Replikanın son eşitlemeden beri geçen süresi",
+                 lambda: follower.staleness() if follower is not None else 0)
+metrics.register("toolbox_jobs_pending", "Kuyruktaki ve çalışan araç işleri", lambda: job_manager.pending())
+metrics.register("toolbox_jobs_completed_total", "Tamamlanan araç işleri", lambda: job_manager.completed, "counter")
+metrics.register("toolbox_jobs_failed_total", "Hata veren araç işleri", lambda: job_manager.failed, "counter")
 
 class LicenseRequest(BaseModel):
     email: str
@@ -37,25 +223,46 @@ class APIKeyRequest(BaseModel):
 class APIKeyVerification(BaseModel):
     api_key: str
 
-def load_licenses():
-    if os.path.exists(LICENSES_FILE):
-        with open(LICENSES_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+class ReplicationUsage(BaseModel):
+    usage: List[list]
+
+class LicenseVerificationResult(BaseModel):
+    success: bool
+    message: str
+    license_type: str
+    expires_at: str
+    usage_count: int
+    license_token: Optional[str] = None
+
+class APIKeyVerificationResult(BaseModel):
+    success: bool
+    message: str
+    service: str
+    usage_count: int
+    last_used: str
+
+class LicenseInfo(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    license_key: str
+    email: str
+    name: Optional[str] = None
+    license_type: str
+    created_at: str
+    expires_at: str
+    is_active: bool
+    usage_count: int = 0
+    last_used: Optional[str] = None
 
-def save_licenses(licenses):
-    with open(LICENSES_FILE, 'w') as f:
-        json.dump(licenses, f, indent=2)
+class LicenseTokenVerification(BaseModel):
+    license_token: str
+    email: Optional[str] = None
 
-def load_api_keys():
-    if os.path.exists(API_KEYS_FILE):
-        with open(API_KEYS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+class RevokeBatchRequest(BaseModel):
+    license_keys: List[str] = []
+    api_keys: List[str] = []
 
-def save_api_keys(api_keys):
-    with open(API_KEYS_FILE, 'w') as f:
-        json.dump(api_keys, f, indent=2)
+MAX_BATCH_SIZE = 1000
 
 def generate_license_key(email, license_type="pro"):
     timestamp = datetime.now().isoformat()
@@ -67,29 +274,61 @@ def generate_api_key(service):
     data = f"{service}:{timestamp}:{secrets.token_hex(16)}"
     return hashlib.sha256(data.encode()).hexdigest()[:24]
 
-@app.get("/")
-async def root():
-    return {"message": "Python Toolbox API", "version": "1.0.0", "status": "running"}
-
-@app.get("/health")
-async def health_check():
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0",
-        "services": {
-            "database": "connected",
-            "api": "running"
-        }
-    }
+def check_license(license_key, email):
+    license_data = repository.get_license(license_key)
+    
+    if license_data is None:
+        return 404, "Lisans bulunamadı", None
+    
+    expires_at = datetime.fromisoformat(license_data["expires_at"]).timestamp()
+    
+    if not license_data.get("is_active", False):
+        if time.time() > expires_at:
+            return 403, "Lisans süresi dolmuş", None
+        return 403, "Lisans aktif değil", None
+    
+    if license_data["email"] != email:
+        return 403, "E-posta adresi uyuşmuyor", expires_at
+    
+    if time.time() > expires_at:
+        return 403, "Lisans süresi dolmuş", None
+    
+    return 200, "Lisans doğrulandı", expires_at
 
-@app.post("/generate-license")
-async def generate_license(request: LicenseRequest):
-    licenses = load_licenses()
+def check_api_key(api_key):
+    key_data = repository.get_api_key(api_key)
+    
+    if key_data is None:
+        return 404, "API anahtarı bulunamadı"
     
+    if not key_data.get("is_active", False):
+        return 403, "API anahtarı aktif değil"
+    
+    return 200, "API anahtarı doğrulandı"
+
+def cached_license_decision(license_key, email):
+    cache_key = ("license", license_key, email)
+    decision = verification_cache.get(cache_key)
+    if decision is None:
+        decision = check_license(license_key, email)
+        # Bulunamayan anahtarlar önbelleğe alınmaz; rastgele anahtarlarla önbellek doldurulamaz
+        if decision[0] != 404:
+            verification_cache.put(cache_key, decision, license_key, decision[2])
+    return decision
+
+def cached_api_key_decision(api_key):
+    cache_key = ("api_key", api_key)
+    decision = verification_cache.get(cache_key)
+    if decision is None:
+        decision = check_api_key(api_key)
+        if decision[0] != 404:
+            verification_cache.put(cache_key, decision, api_key)
+    return decision
+
+def new_license_data(request):
     license_key = generate_license_key(request.email, request.license_type)
     
-    license_data = {
+    return {
         "license_key": license_key,
         "email": request.email,
         "name": request.name,
@@ -99,130 +338,263 @@ async def generate_license(request: LicenseRequest):
         "is_active": True,
         "usage_count": 0
     }
-    
-    licenses[license_key] = license_data
-    save_licenses(licenses)
+
+def new_api_key_data(request):
+    api_key = generate_api_key(request.service)
     
     return {
-        "success": True,
-        "license_key": license_key,
-        "message": "Lisans başarıyla oluşturuldu",
-        "license_data": license_data
+        "api_key": api_key,
+        "service": request.service,
+        "created_at": datetime.now().isoformat(),
+        "is_active": True,
+        "usage_count": 0
     }
 
-@app.post("/verify-license")
-async def verify_license(request: LicenseVerification):
-    licenses = load_licenses()
-    
-    if request.license_key not in licenses:
-        raise HTTPException(status_code=404, detail="Lisans bulunamadı")
-    
-    license_data = licenses[request.license_key]
+def sign_license(license_data):
+    if token_signer is None:
+        return None
+    return token_signer.sign(license_data["license_key"], license_data["email"],
+                             license_data["license_type"], license_data["expires_at"])
+
+def deactivate_license(license_key):
+    future = repository.update_license(license_key, is_active=False)
+    verification_cache.invalidate(license_key)
+    revocations.add(license_key)
+    return future
+
+def deactivate_api_key(api_key):
+    future = repository.update_api_key(api_key, is_active=False)
+    verification_cache.invalidate(api_key)
+    return future
+
+def check_limits(subject):
+    retry_after = rate_limiter.acquire(subject)
+    if retry_after:
+        return {"success": False, "status_code": 429, "message": "İstek sınırı aşıldı",
+                "retry_after": math.ceil(retry_after)}
+    
+    retry_after = quotas.check(subject)
+    if retry_after:
+        return {"success": False, "status_code": 429, "message": "Kullanım kotası aşıldı",
+                "retry_after": math.ceil(retry_after)}
+    
+    return None
+
+def raise_for_result(result):
+    if result["success"]:
+        return
+    headers = {"Retry-After": str(result["retry_after"])} if "retry_after" in result else None
+    raise HTTPException(status_code=result["status_code"], detail=result["message"], headers=headers)
+
+def verify_license_item(license_key, email):
+    subject = f"license:{license_key}"
+    limited = check_limits(subject)
+    if limited:
+        return limited
     
-    if not license_data.get("is_active", False):
-        raise HTTPException(status_code=403, detail="Lisans aktif değil")
+    status_code, detail, _ = cached_license_decision(license_key, email)
     
-    if license_data["email"] != request.email:
-        raise HTTPException(status_code=403, detail="E-posta adresi uyuşmuyor")
+    if status_code != 404:
+        quotas.add(subject)
     
-    expires_at = datetime.fromisoformat(license_data["expires_at"])
-    if datetime.now() > expires_at:
-        raise HTTPException(status_code=403, detail="Lisans süresi dolmuş")
+    if status_code != 200:
+        return {"success": False, "status_code": status_code, "message": detail}
     
-    license_data["usage_count"] = license_data.get("usage_count", 0) + 1
-    licenses[request.license_key] = license_data
-    save_licenses(licenses)
+    license_data = repository.get_license(license_key)
+    usage_count = repository.record_license_usage(license_key)
+    if follower is None:
+        rollups.record((f"key:{license_key}", f"license_type:{license_data['license_type']}"))
     
     return {
         "success": True,
         "message": "Lisans doğrulandı",
         "license_type": license_data["license_type"],
         "expires_at": license_data["expires_at"],
-        "usage_count": license_data["usage_count"]
+        "usage_count": usage_count
     }
 
-@app.post("/generate-api-key")
-async def generate_api_key_endpoint(request: APIKeyRequest):
-    api_keys = load_api_keys()
+def verify_api_key_item(api_key):
+    subject = f"api_key:{api_key}"
+    limited = check_limits(subject)
+    if limited:
+        return limited
     
-    api_key = generate_api_key(request.service)
+    status_code, detail = cached_api_key_decision(api_key)
     
-    key_data = {
-        "api_key": api_key,
-        "service": request.service,
-        "created_at": datetime.now().isoformat(),
-        "is_active": True,
-        "usage_count": 0
-    }
+    if status_code != 404:
+        quotas.add(subject)
     
-    api_keys[api_key] = key_data
-    save_api_keys(api_keys)
+    if status_code != 200:
+        return {"success": False, "status_code": status_code, "message": detail}
+    
+    key_data = repository.get_api_key(api_key)
+    last_used = datetime.now().isoformat()
+    usage_count = repository.record_api_key_usage(api_key, last_used)
+    if follower is None:
+        rollups.record((f"key:{api_key}", f"service:{key_data['service']}"))
     
     return {
         "success": True,
-        "api_key": api_key,
-        "message": f"{request.service} için API anahtarı oluşturuldu",
-        "key_data": key_data
+        "message": "API anahtarı doğrulandı",
+        "service": key_data["service"],
+        "usage_count": usage_count,
+        "last_used": last_used
     }
 
-@app.post("/verify-api-key")
-async def verify_api_key_endpoint(request: APIKeyVerification):
-    api_keys = load_api_keys()
+def check_batch_size(items):
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Tek istekte en fazla {MAX_BATCH_SIZE} kayıt işlenebilir")
+
+def get_job(job_id, api_key):
+    job = job_manager.get(job_id, api_key)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+# Sabit yanıtlar bir kez serileştirilir; /health yalnızca zaman damgasını ekler
+ROOT_BODY = serialization.dumps({"message": "Python Toolbox API", "version": "1.0.0", "status": "running"})
+HEALTH_BODY_START = serialization.dumps({"status": "healthy"})[:-1] + b',"timestamp":'
+HEALTH_BODY_END = b"," + serialization.dumps({
+    "version": "1.0.0",
+    "services": {
+        "database": "connected",
+        "api": "running"
+    }
+})[1:]
+
+@app.get("/")
+async def root():
+    return Response(ROOT_BODY, media_type="application/json")
+
+@app.get("/health")
+async def health_check():
+    timestamp = serialization.dumps(datetime.now().isoformat())
+    return Response(HEALTH_BODY_START + timestamp + HEALTH_BODY_END, media_type="application/json")
+
+@app.post("/generate-license")
+async def generate_license(request: LicenseRequest):
+    license_data = new_license_data(request)
+    license_key = license_data["license_key"]
     
-    if request.api_key not in api_keys:
-        raise HTTPException(status_code=404, detail="API anahtarı bulunamadı")
+    await repository.put_license(license_data)
+    verification_cache.invalidate(license_key)
     
-    key_data = api_keys[request.api_key]
+    result = {
+        "success": True,
+        "license_key": license_key,
+        "message": "Lisans başarıyla oluşturuldu",
+        "license_data": license_data
+    }
+    license_token = sign_license(license_data)
+    if license_token:
+        result["license_token"] = license_token
+    return result
+
+@app.post("/verify-license", response_model=LicenseVerificationResult)
+async def verify_license(request: LicenseVerification):
+    result = verify_license_item(request.license_key, request.email)
+    raise_for_result(result)
     
-    if not key_data.get("is_active", False):
-        raise HTTPException(status_code=403, detail="API anahtarı aktif değil")
+    # İstemci imzalı jetonu çevrimdışı doğrulama için saklar
+    result["license_token"] = sign_license(repository.get_license(request.license_key))
+    return result
+
+@app.post("/generate-api-key")
+async def generate_api_key_endpoint(request: APIKeyRequest):
+    key_data = new_api_key_data(request)
+    api_key = key_data["api_key"]
     
-    key_data["usage_count"] = key_data.get("usage_count", 0) + 1
-    key_data["last_used"] = datetime.now().isoformat()
-    api_keys[request.api_key] = key_data
-    save_api_keys(api_keys)
+    await repository.put_api_key(key_data)
+    verification_cache.invalidate(api_key)
     
     return {
         "success": True,
-        "message": "API anahtarı doğrulandı",
-        "service": key_data["service"],
-        "usage_count": key_data["usage_count"],
-        "last_used": key_data.get("last_used")
+        "api_key": api_key,
+        "message": f"{request.service} için API anahtarı oluşturuldu",
+        "key_data": key_data
     }
 
-@app.get("/license-info/{license_key}")
+@app.post("/verify-api-key", response_model=APIKeyVerificationResult)
+async def verify_api_key_endpoint(request: APIKeyVerification):
+    result = verify_api_key_item(request.api_key)
+    raise_for_result(result)
+    
+    return result
+
+@app.get("/license-info/{license_key}", response_model=LicenseInfo, response_model_exclude_unset=True)
 async def get_license_info(license_key: str):
-    licenses = load_licenses()
+    license_data = repository.get_license(license_key)
     
-    if license_key not in licenses:
+    if license_data is None:
         raise HTTPException(status_code=404, detail="Lisans bulunamadı")
     
-    return licenses[license_key]
+    return license_data
 
 @app.get("/api-usage/{api_key}")
 async def get_api_usage(api_key: str):
-    api_keys = load_api_keys()
+    key_data = repository.get_api_key(api_key)
     
-    if api_key not in api_keys:
+    if key_data is None:
         raise HTTPException(status_code=404, detail="API anahtarı bulunamadı")
     
     return {
         "api_key": api_key,
-        "service": api_keys[api_key]["service"],
-        "usage_count": api_keys[api_key]["usage_count"],
-        "created_at": api_keys[api_key]["created_at"],
-        "last_used": api_keys[api_key].get("last_used", "Never")
+        "service": key_data["service"],
+        "usage_count": key_data["usage_count"],
+        "created_at": key_data["created_at"],
+        "last_used": key_data.get("last_used", "Never"),
+        "quota": quotas.usage(f"api_key:{api_key}")
     }
 
+def parse_timestamp(value, default):
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Geçersiz zaman değeri: {value}")
+
+@app.get("/usage/timeseries")
+async def get_usage_timeseries(key: Optional[str] = None, service: Optional[str] = None,
+                               license_type: Optional[str] = None,
+                               start: Optional[str] = Query(None, alias="from"),
+                               end: Optional[str] = Query(None, alias="to"), step: int = 3600):
+    dimensions = [(name, value) for name, value in (("key", key), ("service", service), ("license_type", license_type))
+                  if value]
+    if len(dimensions) != 1:
+        raise HTTPException(status_code=400, detail="key, service veya license_type parametrelerinden biri verilmeli")
+    if step < 60:
+        raise HTTPException(status_code=400, detail="step en az 60 saniye olmalı")
+    end_ts = parse_timestamp(end, time.time())
+    start_ts = parse_timestamp(start, end_ts - 86400)
+    if start_ts > end_ts:
+        raise HTTPException(status_code=400, detail="from, to değerinden büyük olamaz")
+    
+    name, value = dimensions[0]
+    try:
+        step, resolution, points = rollups.timeseries(f"{name}:{value}", start_ts, end_ts, step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({
+        name: value,
+        "from": start_ts,
+        "to": end_ts,
+        "step": step,
+        "resolution": resolution,
+        "total": sum(point["count"] for point in points),
+        "points": points
+    })
+
 @app.post("/revoke-license")
 async def revoke_license(license_key: str):
-    licenses = load_licenses()
-    
-    if license_key not in licenses:
+    if repository.get_license(license_key) is None:
         raise HTTPException(status_code=404, detail="Lisans bulunamadı")
     
-    licenses[license_key]["is_active"] = False
-    save_licenses(licenses)
+    await deactivate_license(license_key)
     
     return {
         "success": True,
@@ -231,51 +603,291 @@ async def revoke_license(license_key: str):
 
 @app.post("/revoke-api-key")
 async def revoke_api_key(api_key: str):
-    api_keys = load_api_keys()
-    
-    if api_key not in api_keys:
+    if repository.get_api_key(api_key) is None:
         raise HTTPException(status_code=404, detail="API anahtarı bulunamadı")
     
-    api_keys[api_key]["is_active"] = False
-    save_api_keys(api_keys)
+    await deactivate_api_key(api_key)
     
     return {
         "success": True,
         "message": "API anahtarı iptal edildi"
     }
 
-@app.get("/stats")
-async def get_stats():
-    licenses = load_licenses()
-    api_keys = load_api_keys()
+@app.post("/generate-license/batch")
+async def generate_license_batch(items: List[LicenseRequest]):
+    check_batch_size(items)
+    results = []
+    
+    with repository.transaction() as ops:
+        for item in items:
+            license_data = new_license_data(item)
+            repository.put_license(license_data)
+            verification_cache.invalidate(license_data["license_key"])
+            result = {
+                "success": True,
+                "license_key": license_data["license_key"],
+                "license_data": license_data
+            }
+            license_token = sign_license(license_data)
+            if license_token:
+                result["license_token"] = license_token
+            results.append(result)
+    
+    await repository.commit(ops)
+    
+    return FastJSONResponse({
+        "success": True,
+        "count": len(results),
+        "message": f"{len(results)} lisans oluşturuldu",
+        "results": results
+    })
+
+@app.post("/verify-license/batch")
+async def verify_license_batch(items: List[LicenseVerification]):
+    check_batch_size(items)
+    results = []
+    
+    for item in items:
+        result = verify_license_item(item.license_key, item.email)
+        result["license_key"] = item.license_key
+        results.append(result)
     
-    active_licenses = sum(1 for lic in licenses.values() if lic.get("is_active", False))
-    total_licenses = len(licenses)
+    return FastJSONResponse({
+        "success": True,
+        "count": len(results),
+        "verified": sum(1 for result in results if result["success"]),
+        "results": results
+    })
+
+@app.post("/verify-api-key/batch")
+async def verify_api_key_batch(items: List[APIKeyVerification]):
+    check_batch_size(items)
+    results = []
+    
+    for item in items:
+        result = verify_api_key_item(item.api_key)
+        result["api_key"] = item.api_key
+        results.append(result)
+    
+    return FastJSONResponse({
+        "success": True,
+        "count": len(results),
+        "verified": sum(1 for result in results if result["success"]),
+        "results": results
+    })
+
+@app.post("/revoke/batch")
+async def revoke_batch(request: RevokeBatchRequest):
+    check_batch_size(request.license_keys + request.api_keys)
+    license_results = []
+    api_key_results = []
+    
+    with repository.transaction() as ops:
+        for license_key in request.license_keys:
+            if repository.get_license(license_key) is None:
+                license_results.append({"license_key": license_key, "success": False, "status_code": 404, "message": "Lisans bulunamadı"})
+                continue
+            deactivate_license(license_key)
+            license_results.append({"license_key": license_key, "success": True, "message": "Lisans iptal edildi"})
+        
+        for api_key in request.api_keys:
+            if repository.get_api_key(api_key) is None:
+                api_key_results.append({"api_key": api_key, "success": False, "status_code": 404, "message": "API anahtarı bulunamadı"})
+                continue
+            deactivate_api_key(api_key)
+            api_key_results.append({"api_key": api_key, "success": True, "message": "API anahtarı iptal edildi"})
+    
+    await repository.commit(ops)
+    
+    return FastJSONResponse({
+        "success": True,
+        "licenses": license_results,
+        "api_keys": api_key_results
+    })
+
+@app.get("/licenses/expiring")
+async def get_expiring_licenses(within: float = 7, limit: int = 100):
+    if within < 0:
+        raise HTTPException(status_code=400, detail="within negatif olamaz")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit en az 1 olmalı")
+    now = time.time()
+    license_keys = repository.expiry.expiring_between(now, now + within * 86400, min(limit, MAX_BATCH_SIZE))
+    
+    licenses = []
+    for license_key in license_keys:
+        license_data = repository.get_license(license_key)
+        licenses.append({
+            "license_key": license_key,
+            "email": license_data["email"],
+            "license_type": license_data["license_type"],
+            "expires_at": license_data["expires_at"]
+        })
+    
+    return FastJSONResponse({
+        "within_days": within,
+        "count": len(licenses),
+        "licenses": licenses
+    })
+
+@app.post("/verify-license-token")
+async def verify_license_token(request: LicenseTokenVerification):
+    if token_verifier is None:
+        raise HTTPException(status_code=503, detail="İmzalı lisans desteği yapılandırılmamış")
     
-    active_api_keys = sum(1 for key in api_keys.values() if key.get("is_active", False))
-    total_api_keys = len(api_keys)
+    is_valid, message, claims = token_verifier.verify(request.license_token, request.email)
     
-    total_usage = sum(lic.get("usage_count", 0) for lic in licenses.values())
-    total_api_usage = sum(key.get("usage_count", 0) for key in api_keys.values())
+    if not is_valid:
+        raise HTTPException(status_code=403, detail=message)
     
     return {
-        "licenses": {
-            "total": total_licenses,
-            "active": active_licenses,
-            "inactive": total_licenses - active_licenses
-        },
-        "api_keys": {
-            "total": total_api_keys,
-            "active": active_api_keys,
-            "inactive": total_api_keys - active_api_keys
-        },
-        "usage": {
-            "total_license_usage": total_usage,
-            "total_api_usage": total_api_usage
-        },
-        "timestamp": datetime.now().isoformat()
+        "success": True,
+        "message": message,
+        "license_key": claims["kid"],
+        "license_type": claims["type"],
+        "expires_at": datetime.fromtimestamp(claims["exp"]).isoformat()
     }
 
+@app.get("/public-key")
+async def get_public_key():
+    if token_signer is None:
+        raise HTTPException(status_code=503, detail="İmzalı lisans desteği yapılandırılmamış")
+    
+    return {"algorithm": "Ed25519", "public_key": export_public_key(token_signer.public_key)}
+
+@app.get("/revocations")
+async def get_revocations(since: Optional[int] = None):
+    if since is not None and since == revocations.version:
+        return {"version": revocations.version, "changed": False}
+    
+    result = revocations.to_dict()
+    result["changed"] = True
+    return result
+
+@app.get("/stats")
+async def get_stats():
+    stats = repository.stats.snapshot()
+    stats["timestamp"] = datetime.now().isoformat()
+    return FastJSONResponse(stats)
+
+@app.get("/stats/cache")
+async def get_cache_stats():
+    return verification_cache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def new_job(fields, files, owner):
+    if not files:
+        raise HTTPException(status_code=400, detail="En az bir dosya yüklenmeli")
+    try:
+        params = json.loads(fields.get("params") or "{}")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="params geçerli bir JSON değil")
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="params bir JSON nesnesi olmalı")
+    try:
+        return job_manager.create(fields.get("operation", ""), params, owner)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="İş kuyruğu dolu", headers={"Retry-After": "5"})
+
+def add_job_inputs(job, files):
+    for spool_file in files:
+        job_manager.add_input(job, spool_file)
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: Request, x_api_key: str = Header(...)):
+    # Gövde multipart/form-data: operation, params (JSON) ve bir ya da daha fazla files alanı
+    raise_for_result(verify_api_key_item(x_api_key))
+    spool = MultipartSpool()
+    try:
+        fields, files = await spool.receive(request)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    loop = asyncio.get_running_loop()
+    try:
+        job = new_job(fields, files, x_api_key)
+    except HTTPException:
+        await loop.run_in_executor(None, spool.discard)
+        raise
+    try:
+        await loop.run_in_executor(None, add_job_inputs, job, files)
+    except Exception:
+        await loop.run_in_executor(None, spool.discard)
+        await job_manager.delete(job)
+        raise
+    job_manager.submit(job)
+    return await job_manager.status(job)
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, x_api_key: str = Header(...)):
+    return await job_manager.status(get_job(job_id, x_api_key))
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, x_api_key: str = Header(...)):
+    job = get_job(job_id, x_api_key)
+    if job["status"] != "completed" or job["result"] is None:
+        raise HTTPException(status_code=409, detail="İşin indirilebilir bir sonucu yok")
+    return FileResponse(job["result"], filename=os.path.basename(job["result"]))
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str, x_api_key: str = Header(...)):
+    job = get_job(job_id, x_api_key)
+    await job_manager.delete(job)
+    return {"success": True, "message": "İş silindi"}
+
+def check_replication_access(token):
+    if follower is not None:
+        raise HTTPException(status_code=404, detail="Bu düğüm bir replika")
+    if not REPLICATION_TOKEN or not hmac.compare_digest(token or "", REPLICATION_TOKEN):
+        raise HTTPException(status_code=403, detail="Geçersiz replikasyon anahtarı")
+
+@app.get("/replication/snapshot")
+async def get_replication_snapshot(x_replication_token: Optional[str] = Header(None)):
+    check_replication_access(x_replication_token)
+    return FastJSONResponse({
+        "epoch": replication_log.epoch,
+        "seq": replication_log.seq,
+        "licenses": list(repository.licenses.values()),
+        "api_keys": list(repository.api_keys.values())
+    })
+
+@app.get("/replication/log")
+async def get_replication_log(epoch: str, since: int, wait: float = 0,
+                              x_replication_token: Optional[str] = Header(None)):
+    check_replication_access(x_replication_token)
+    if epoch == replication_log.epoch:
+        await replication_log.wait(since, min(wait, 25.0))
+    entries = replication_log.since(epoch, since)
+    if entries is None:
+        return FastJSONResponse({"reset": True})
+    return FastJSONResponse({"reset": False, "seq": entries[-1][0] if entries else since, "ops": entries})
+
+@app.post("/replication/usage")
+async def post_replication_usage(request: ReplicationUsage, x_replication_token: Optional[str] = Header(None)):
+    check_replication_access(x_replication_token)
+    for kind, key, count, last_used in request.usage:
+        if kind == "license" and key in repository.licenses:
+            repository.record_license_usage(key, count)
+            rollups.record((f"key:{key}", f"license_type:{repository.licenses[key]['license_type']}"), count)
+        elif kind == "api_key" and key in repository.api_keys:
+            repository.record_api_key_usage(key, last_used or datetime.now().isoformat(), count)
+            rollups.record((f"key:{key}", f"service:{repository.api_keys[key]['service']}"), count)
+    return {"success": True}
+
+@app.get("/replication/status")
+async def get_replication_status():
+    if follower is not None:
+        return {"role": "replica", "seq": follower.seq, "staleness": follower.staleness(),
+                "stale": follower.stale(), "snapshots": follower.snapshots}
+    return {"role": "primary", "seq": replication_log.seq, "log_entries": len(replication_log.entries)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
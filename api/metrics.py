@@ -0,0 +1,119 @@
+import bisect
+import os
+import time
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class Metrics:
+    # Tüm güncellemeler olay döngüsü iş parçacığında yapılır; kilit gerekmez
+    def __init__(self):
+        self.started_at = time.time()
+        self.in_flight = 0
+        self.requests = defaultdict(int)
+        self.latency = defaultdict(Histogram)
+        self.store_durations = defaultdict(Histogram)
+        self.gauges = {}
+
+    def observe_request(self, method, route, status_code, duration):
+        self.requests[(method, route, status_code)] += 1
+        self.latency[(method, route)].observe(duration)
+
+    def observe_store(self, operation, duration):
+        self.store_durations[operation].observe(duration)
+
+    def register(self, name, help_text, callback, kind="gauge"):
+        self.gauges[name] = (help_text, kind, callback)
+
+    def render(self):
+        lines = [
+            "# HELP toolbox_http_requests_total HTTP isteklerinin sayısı",
+            "# TYPE toolbox_http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            lines.append(f'toolbox_http_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {count}')
+
+        lines.append("# HELP toolbox_http_request_duration_seconds HTTP istek süreleri")
+        lines.append("# TYPE toolbox_http_request_duration_seconds histogram")
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines.extend(histogram.render("toolbox_http_request_duration_seconds", f'method="{method}",route="{route}"'))
+
+        lines.append("# HELP toolbox_http_requests_in_flight İşlenmekte olan istek sayısı")
+        lines.append("# TYPE toolbox_http_requests_in_flight gauge")
+        lines.append(f"toolbox_http_requests_in_flight {self.in_flight}")
+
+        lines.append("# HELP toolbox_store_operation_duration_seconds Depolama yükleme/yazma süreleri")
+        lines.append("# TYPE toolbox_store_operation_duration_seconds histogram")
+        for operation, histogram in sorted(self.store_durations.items()):
+            lines.extend(histogram.render("toolbox_store_operation_duration_seconds", f'operation="{operation}"'))
+
+        for name, (help_text, kind, callback) in sorted(self.gauges.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {callback()}")
+
+        lines.append("# HELP toolbox_uptime_seconds Sunucunun çalışma süresi")
+        lines.append("# TYPE toolbox_uptime_seconds gauge")
+        lines.append(f"toolbox_uptime_seconds {time.time() - self.started_at:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe_request(scope["method"], route, status[0], time.perf_counter() - start)
+
+
+metrics = Metrics()
@@ -0,0 +1,137 @@
+import math
+import os
+import time
+
+RATE_LIMIT = float(os.environ.get("TOOLBOX_RATE_LIMIT", "20"))
+RATE_BURST = float(os.environ.get("TOOLBOX_RATE_BURST", "40"))
+RATE_SHARDS = 64
+QUOTA_PER_MINUTE = int(os.environ.get("TOOLBOX_QUOTA_PER_MINUTE", "0"))
+QUOTA_PER_DAY = int(os.environ.get("TOOLBOX_QUOTA_PER_DAY", "0"))
+
+
+class RateLimiter:
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST, shards=RATE_SHARDS):
+        self.rate = rate
+        self.burst = burst
+        self.limited = 0
+        self._shards = [{} for _ in range(shards)]
+        self._next_shard = 0
+
+    def acquire(self, key, cost=1.0, now=None):
+        # İzin verilirse 0, aksi halde kaç saniye beklenmesi gerektiğini döner
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        shard = self._shards[hash(key) % len(self._shards)]
+        bucket = shard.get(key)
+        if bucket is None:
+            tokens = self.burst
+        else:
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        if tokens >= cost:
+            shard[key] = [tokens - cost, now]
+            return 0.0
+        shard[key] = [tokens, now]
+        self.limited += 1
+        return (cost - tokens) / self.rate
+
+    def prune(self, now=None):
+        # Her çağrıda tek bir parça taranır; dolmuş kovalar silinir
+        now = time.monotonic() if now is None else now
+        shard = self._shards[self._next_shard]
+        self._next_shard = (self._next_shard + 1) % len(self._shards)
+        full = [key for key, (tokens, updated) in shard.items()
+                if tokens + (now - updated) * self.rate >= self.burst]
+        for key in full:
+            del shard[key]
+        return len(full)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+
+class QuotaTracker:
+    def __init__(self, per_minute=QUOTA_PER_MINUTE, per_day=QUOTA_PER_DAY):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self._counters = {}
+        self._dirty = set()
+        self._pruned_day = None
+
+    def _windows(self, now):
+        return int(now // 60), int(now // 86400)
+
+    def _current(self, subject, now):
+        minute, day = self._windows(now)
+        counter = self._counters.get(subject)
+        if counter is None:
+            counter = self._counters[subject] = [minute, 0, day, 0]
+        if counter[0] != minute:
+            counter[0], counter[1] = minute, 0
+        if counter[2] != day:
+            counter[2], counter[3] = day, 0
+        return counter
+
+    def check(self, subject, now=None):
+        now = time.time() if now is None else now
+        counter = self._counters.get(subject)
+        if counter is None:
+            return 0.0
+        counter = self._current(subject, now)
+        if self.per_day and counter[3] >= self.per_day:
+            return math.ceil((counter[2] + 1) * 86400 - now)
+        if self.per_minute and counter[1] >= self.per_minute:
+            return math.ceil((counter[0] + 1) * 60 - now)
+        return 0.0
+
+    def add(self, subject, count=1, now=None):
+        counter = self._current(subject, time.time() if now is None else now)
+        counter[1] += count
+        counter[3] += count
+        self._dirty.add(subject)
+
+    def usage(self, subject, now=None):
+        counter = self._current(subject, time.time() if now is None else now)
+        return {
+            "minute": counter[1],
+            "day": counter[3],
+            "minute_limit": self.per_minute or None,
+            "day_limit": self.per_day or None
+        }
+
+    def load(self, records, now=None):
+        minute, day = self._windows(time.time() if now is None else now)
+        for record in records:
+            if record["day"] != day:
+                continue
+            minute_count = record["minute_count"] if record["minute"] == minute else 0
+            self._counters[record["subject"]] = [minute, minute_count, day, record["day_count"]]
+
+    def prune(self, now=None):
+        # Günlük penceresi geçmiş sayaçlar bellekten, kayıtları depolamadan silinir
+        _, day = self._windows(time.time() if now is None else now)
+        expired = [subject for subject, counter in self._counters.items() if counter[2] < day]
+        for subject in expired:
+            del self._counters[subject]
+            self._dirty.discard(subject)
+        if day == self._pruned_day:
+            return []
+        self._pruned_day = day
+        return [("prune_quotas", {"before": day})]
+
+    def flush_ops(self):
+        # Yalnızca değişen sayaçlar depolama katmanına gönderilir
+        ops = []
+        for subject in self._dirty:
+            counter = self._counters.get(subject)
+            if counter is None:
+                continue
+            ops.append(("put_quota", {
+                "subject": subject,
+                "minute": counter[0],
+                "minute_count": counter[1],
+                "day": counter[2],
+                "day_count": counter[3]
+            }))
+        self._dirty.clear()
+        return ops
@@ -0,0 +1,266 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from components.api_client import LicenseAPIClient
+from components import serialization
+
+ROLE = os.environ.get("TOOLBOX_ROLE", "primary")
+PRIMARY_URL = os.environ.get("TOOLBOX_PRIMARY_URL", "")
+REPLICATION_TOKEN = os.environ.get("TOOLBOX_REPLICATION_TOKEN", "")
+REPLICATION_LOG_SIZE = int(os.environ.get("TOOLBOX_REPLICATION_LOG_SIZE", "100000"))
+REPLICA_MAX_STALENESS = float(os.environ.get("TOOLBOX_REPLICA_MAX_STALENESS", "10"))
+REPLICATION_BATCH = 5000
+REPLICATION_POLL_WAIT = 2.0
+REPLICATION_USAGE_INTERVAL = 0.5
+READ_YOUR_WRITES_TIMEOUT = 2.0
+
+# Replikada yerel bellekten yanıtlanmayan, birincil düğüme iletilen yollar
+FORWARDED_PATHS = {"/generate-license", "/generate-license/batch", "/generate-api-key", "/revoke-license",
+                   "/revoke-api-key", "/revoke/batch", "/usage/timeseries"}
+# Replika geride kalsa bile yerel olarak yanıtlanan yollar
+STALENESS_EXEMPT_PATHS = {"/", "/health", "/metrics", "/public-key", "/replication/status"}
+
+
+class ReplicationLog:
+    # Birincil düğümdeki değişikliklerin sıra numaralı, sınırlı boyutlu kaydı
+    def __init__(self, capacity=REPLICATION_LOG_SIZE):
+        self.entries = deque(maxlen=capacity)
+        # Birincil yeniden başladığında sıra numaraları sıfırlanır; replikalar dönemden bunu anlar
+        self.epoch = uuid.uuid4().hex
+        self.seq = 0
+        self._usage = {}
+        self._changed = None
+
+    def append(self, op):
+        self.seq += 1
+        self.entries.append((self.seq, op))
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    def append_usage(self, kind, key, fields):
+        # Kullanım sayaçları birleştirilir; her doğrulama için ayrı kayıt yazılmaz
+        self._usage[(kind, key)] = fields
+
+    def flush_usage(self):
+        usage, self._usage = self._usage, {}
+        for (kind, key), fields in usage.items():
+            self.append(("update_license" if kind == "license" else "update_api_key", key, fields))
+        return len(usage)
+
+    def first_seq(self):
+        return self.entries[0][0] if self.entries else self.seq + 1
+
+    def since(self, epoch, seq, limit=REPLICATION_BATCH):
+        # Kayıt artık tutulmuyorsa None döner; replika anlık görüntüden yeniden başlamalıdır
+        if epoch != self.epoch or seq > self.seq:
+            return None
+        if seq < self.first_seq() - 1:
+            return None
+        start = len(self.entries) - (self.seq - seq)
+        return [self.entries[index] for index in range(start, min(start + limit, len(self.entries)))]
+
+    async def wait(self, seq, timeout):
+        if self.seq > seq:
+            return
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class ReplicaFollower:
+    def __init__(self, repository, primary_url=PRIMARY_URL, token=REPLICATION_TOKEN,
+                 max_staleness=REPLICA_MAX_STALENESS, on_apply=None):
+        self.repository = repository
+        self.primary_url = primary_url
+        self.headers = {"X-Replication-Token": token}
+        self.max_staleness = max_staleness
+        self.on_apply = on_apply
+        self.client = LicenseAPIClient(primary_url)
+        # Yazma istekleri yeniden denenmez; aynı lisansın iki kez oluşturulmasını önler
+        self.forward_client = LicenseAPIClient(primary_url, max_retries=0)
+        self.epoch = None
+        self.seq = 0
+        self.synced_at = 0.0
+        self.snapshots = 0
+        self._applied = None
+
+    def staleness(self):
+        return time.time() - self.synced_at
+
+    def stale(self):
+        return self.staleness() > self.max_staleness
+
+    async def _get(self, path, params=None):
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None, lambda: self.client.request("GET", path, params=params, headers=self.headers,
+                                              timeout=(3.05, REPLICATION_POLL_WAIT + 10)))
+        response.raise_for_status()
+        return serialization.loads(response.content)
+
+    async def bootstrap(self):
+        snapshot = await self._get("/replication/snapshot")
+        self.repository.load_snapshot(snapshot["licenses"], snapshot["api_keys"])
+        self.epoch = snapshot["epoch"]
+        self.seq = snapshot["seq"]
+        self.synced_at = time.time()
+        self.snapshots += 1
+        if self.on_apply is not None:
+            self.on_apply(None)
+        self._notify()
+
+    def _notify(self):
+        if self._applied is not None:
+            self._applied.set()
+            self._applied = None
+
+    async def poll(self):
+        batch = await self._get("/replication/log", {"epoch": self.epoch, "since": self.seq,
+                                                       "wait": REPLICATION_POLL_WAIT})
+        if batch["reset"]:
+            await self.bootstrap()
+            return 0
+        ops = [tuple(op) for _, op in batch["ops"]]
+        for op in ops:
+            self.repository.apply(op)
+        if self.on_apply is not None and ops:
+            self.on_apply(ops)
+        self.seq = batch["seq"]
+        self.synced_at = time.time()
+        self._notify()
+        return len(ops)
+
+    async def run(self):
+        delay = 0.5
+        while True:
+            try:
+                await self.poll()
+                delay = 0.5
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Replikasyon hatası: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    async def forward_usage(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(REPLICATION_USAGE_INTERVAL)
+            usage = self.repository.take_forwarded_usage()
+            if not usage:
+                continue
+            payload = {"usage": [[kind, key, count, last_used] for (kind, key), (count, last_used) in usage.items()]}
+            try:
+                response = await loop.run_in_executor(
+                    None, lambda: self.client.request("POST", "/replication/usage", json=payload, headers=self.headers))
+                response.raise_for_status()
+            except Exception as e:
+                # İletilemeyen kullanım bir sonraki denemeye bırakılır
+                print(f"Kullanım iletme hatası: {e}")
+                for (kind, key), (count, last_used) in usage.items():
+                    self.repository.add_forwarded_usage(kind, key, count, last_used)
+
+    async def wait_for(self, seq, timeout=READ_YOUR_WRITES_TIMEOUT):
+        # Birincil düğüme iletilen yazma, yanıt dönmeden önce replikaya da yansır
+        deadline = time.monotonic() + timeout
+        while self.seq < seq:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._applied is None:
+                self._applied = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._applied.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def forward(self, method, path, query_string, body, content_type):
+        if query_string:
+            path = f"{path}?{query_string}"
+        headers = {"Content-Type": content_type} if content_type else {}
+        return self.forward_client.request(method, path, data=body, headers=headers)
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+async def _send_json(send, status, content, headers=()):
+    body = serialization.dumps(content)
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()), *headers]})
+    await send({"type": "http.response.body", "body": body})
+
+
+class ReplicaMiddleware:
+    def __init__(self, app, follower):
+        self.app = app
+        self.follower = follower
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        if path in FORWARDED_PATHS:
+            await self._forward(scope, receive, send)
+            return
+        if path not in STALENESS_EXEMPT_PATHS and self.follower.stale():
+            await _send_json(send, 503, {"detail": "Replika güncel değil"},
+                             [(b"retry-after", str(int(REPLICATION_POLL_WAIT)).encode())])
+            return
+        await self.app(scope, receive, send)
+
+    async def _forward(self, scope, receive, send):
+        body = await _read_body(receive)
+        headers = dict(scope["headers"])
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                None, self.follower.forward, scope["method"], scope["path"],
+                scope["query_string"].decode(), body, headers.get(b"content-type", b"").decode())
+        except Exception as e:
+            await _send_json(send, 502, {"detail": f"Birincil düğüme ulaşılamadı: {e}"})
+            return
+        seq = response.headers.get("X-Replication-Seq")
+        if seq is not None:
+            await self.follower.wait_for(int(seq))
+        response_headers = [(b"content-type", response.headers.get("Content-Type", "application/json").encode()),
+                            (b"content-length", str(len(response.content)).encode())]
+        if "Retry-After" in response.headers:
+            response_headers.append((b"retry-after", response.headers["Retry-After"].encode()))
+        await send({"type": "http.response.start", "status": response.status_code, "headers": response_headers})
+        await send({"type": "http.response.body", "body": response.content})
+
+
+class ReplicationSeqMiddleware:
+    # Birincil düğüm her yanıta güncel kayıt numarasını ekler
+    def __init__(self, app, log):
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_seq(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-replication-seq", str(self.log.seq).encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_seq)
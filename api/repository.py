@@ -0,0 +1,237 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from api.aggregates import StatsAggregator
+from api.expiry import ExpiryIndex
+from api.metrics import metrics
+from api.writer import StoreWriter
+from components.usage_journal import UsageJournal
+
+USAGE_JOURNAL_PATH = os.environ.get("TOOLBOX_USAGE_JOURNAL", "usage.journal")
+JOURNAL_FLUSH_INTERVAL = 0.5
+JOURNAL_COMPACT_INTERVAL = 30.0
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+
+USAGE_OPS = {"license": "update_license", "api_key": "update_api_key"}
+REPLICATED_OPS = {"put_license", "update_license", "put_api_key", "update_api_key"}
+
+
+class Repository:
+    def __init__(self, journal_path=USAGE_JOURNAL_PATH):
+        self.store = None
+        self.writer = None
+        self.journal = UsageJournal(journal_path)
+        self.licenses = {}
+        self.api_keys = {}
+        self.stats = StatsAggregator()
+        self.expiry = ExpiryIndex()
+        self.log = None
+        self.replica = False
+        self.forwarded_usage = {}
+        self._compactor = None
+        self._transaction = None
+
+    async def open(self, store_factory):
+        loop = asyncio.get_running_loop()
+        self.store = await loop.run_in_executor(None, store_factory)
+        start = time.perf_counter()
+        self.licenses, self.api_keys = await loop.run_in_executor(None, self._load)
+        metrics.observe_store("load", time.perf_counter() - start)
+        self.writer = StoreWriter(self.store)
+        self.writer.start()
+        await self._recover_journal()
+        self.stats.rebuild(self.licenses, self.api_keys)
+        self.expiry.rebuild(self.licenses)
+        self._compactor = loop.create_task(self._compact_loop())
+
+    def load_snapshot(self, licenses, api_keys):
+        # Replika: depolama açılmaz, veriler birincil düğümün anlık görüntüsünden yüklenir
+        self.replica = True
+        self.licenses = {lic["license_key"]: lic for lic in licenses}
+        self.api_keys = {key["api_key"]: key for key in api_keys}
+        self.stats.rebuild(self.licenses, self.api_keys)
+        self.expiry.rebuild(self.licenses)
+
+    def apply(self, op):
+        # Birincil düğümden gelen değişiklik yalnızca belleğe uygulanır
+        name = op[0]
+        if name == "put_license":
+            self.put_license(dict(op[1]))
+        elif name == "put_api_key":
+            self.put_api_key(dict(op[1]))
+        elif name == "update_license" and op[1] in self.licenses:
+            self.update_license(op[1], **op[2])
+        elif name == "update_api_key" and op[1] in self.api_keys:
+            self.update_api_key(op[1], **op[2])
+
+    def _load(self):
+        licenses = {lic["license_key"]: lic for lic in self.store.iter_licenses()}
+        api_keys = {key["api_key"]: key for key in self.store.iter_api_keys()}
+        return licenses, api_keys
+
+    async def close(self):
+        if self._compactor is not None:
+            self._compactor.cancel()
+            try:
+                await self._compactor
+            except asyncio.CancelledError:
+                pass
+            self._compactor = None
+        if self.writer is not None:
+            await self.compact()
+            await self.writer.stop()
+        if self.store is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.store.close)
+        self.writer = None
+        self.store = None
+
+    def _usage_ops(self, records):
+        ops = []
+        for (kind, key), fields in records.items():
+            items = self.licenses if kind == "license" else self.api_keys
+            if key in items:
+                ops.append((USAGE_OPS[kind], key, fields))
+        return ops
+
+    async def _recover_journal(self):
+        loop = asyncio.get_running_loop()
+        records = await loop.run_in_executor(None, self.journal.replay)
+        if not records:
+            return
+        for (kind, key), fields in records.items():
+            items = self.licenses if kind == "license" else self.api_keys
+            if key in items:
+                items[key].update(fields)
+        await self.writer.submit(*self._usage_ops(records))
+        await loop.run_in_executor(None, self.journal.reset)
+
+    async def compact(self):
+        loop = asyncio.get_running_loop()
+        sealed = await loop.run_in_executor(None, self.journal.seal)
+        if sealed is None:
+            return 0
+        start = time.perf_counter()
+        records = await loop.run_in_executor(None, self.journal.read, sealed)
+        ops = self._usage_ops(records)
+        if ops:
+            await self.writer.submit(*ops)
+        await loop.run_in_executor(None, self.journal.discard, sealed)
+        metrics.observe_store("compact", time.perf_counter() - start)
+        return len(ops)
+
+    async def _compact_loop(self):
+        loop = asyncio.get_running_loop()
+        last_compaction = loop.time()
+        while True:
+            await asyncio.sleep(JOURNAL_FLUSH_INTERVAL)
+            try:
+                if self.journal.pending_count():
+                    await loop.run_in_executor(None, self.journal.flush)
+                if (loop.time() - last_compaction >= JOURNAL_COMPACT_INTERVAL
+                        or self.journal.size() >= JOURNAL_COMPACT_BYTES):
+                    await self.compact()
+                    last_compaction = loop.time()
+            except Exception as e:
+                print(f"Kullanım günlüğü sıkıştırma hatası: {e}")
+
+    def _submit(self, op):
+        if self.log is not None and op[0] in REPLICATED_OPS:
+            self.log.append(op)
+        if self.replica:
+            return None
+        if self._transaction is not None:
+            self._transaction.append(op)
+            return None
+        return self.writer.submit(op)
+
+    @contextmanager
+    def transaction(self):
+        # Bloktaki tüm değişiklikler tek bir depolama işleminde yazılır
+        ops = []
+        self._transaction = ops
+        try:
+            yield ops
+        finally:
+            self._transaction = None
+
+    def commit(self, ops):
+        if not ops:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(0)
+            return future
+        return self.writer.submit(*ops)
+
+    def get_license(self, license_key):
+        return self.licenses.get(license_key)
+
+    def put_license(self, license_data):
+        previous = self.licenses.get(license_data["license_key"])
+        if previous is not None:
+            self.stats.remove_license(previous)
+        self.licenses[license_data["license_key"]] = license_data
+        self.stats.add_license(license_data)
+        self.expiry.update(license_data)
+        return self._submit(("put_license", dict(license_data)))
+
+    def update_license(self, license_key, **fields):
+        license_data = self.licenses[license_key]
+        self.stats.remove_license(license_data)
+        license_data.update(fields)
+        self.stats.add_license(license_data)
+        if "is_active" in fields or "expires_at" in fields:
+            self.expiry.update(license_data)
+        return self._submit(("update_license", license_key, fields))
+
+    def get_api_key(self, api_key):
+        return self.api_keys.get(api_key)
+
+    def put_api_key(self, key_data):
+        previous = self.api_keys.get(key_data["api_key"])
+        if previous is not None:
+            self.stats.remove_api_key(previous)
+        self.api_keys[key_data["api_key"]] = key_data
+        self.stats.add_api_key(key_data)
+        return self._submit(("put_api_key", dict(key_data)))
+
+    def update_api_key(self, api_key, **fields):
+        key_data = self.api_keys[api_key]
+        self.stats.remove_api_key(key_data)
+        key_data.update(fields)
+        self.stats.add_api_key(key_data)
+        return self._submit(("update_api_key", api_key, fields))
+
+    def add_forwarded_usage(self, kind, key, count, last_used=None):
+        # Replikadaki kullanım birincil düğüme toplu olarak iletilmek üzere biriktirilir
+        pending = self.forwarded_usage.setdefault((kind, key), [0, None])
+        pending[0] += count
+        pending[1] = last_used or pending[1]
+
+    def record_license_usage(self, license_key, count=1):
+        license_data = self.licenses[license_key]
+        license_data["usage_count"] = license_data.get("usage_count", 0) + count
+        self.stats.license_used(license_data, count)
+        if self.replica:
+            self.add_forwarded_usage("license", license_key, count)
+            return license_data["usage_count"]
+        self.journal.append("license", license_key, license_data["usage_count"])
+        if self.log is not None:
+            self.log.append_usage("license", license_key, {"usage_count": license_data["usage_count"]})
+        return license_data["usage_count"]
+
+    def record_api_key_usage(self, api_key, last_used, count=1):
+        key_data = self.api_keys[api_key]
+        key_data["usage_count"] = key_data.get("usage_count", 0) + count
+        key_data["last_used"] = last_used
+        self.stats.api_key_used(key_data, count)
+        if self.replica:
+            self.add_forwarded_usage("api_key", api_key, count, last_used)
+            return key_data["usage_count"]
+        self.journal.append("api_key", api_key, key_data["usage_count"], last_used)
+        if self.log is not None:
+            self.log.append_usage("api_key", api_key, {"usage_count": key_data["usage_count"], "last_used": last_used})
+        return key_data["usage_count"]
+
+    def take_forwarded_usage(self):
+        usage, self.forwarded_usage = self.forwarded_usage, {}
+        return usage
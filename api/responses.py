@@ -0,0 +1,8 @@
+from starlette.responses import JSONResponse
+from components import serialization
+
+
+class FastJSONResponse(JSONResponse):
+    # orjson/msgspec kuruluysa onlarla, değilse standart json ile serileştirir
+    def render(self, content):
+        return serialization.dumps(content)
@@ -0,0 +1,144 @@
+import bisect
+import os
+import time
+from array import array
+
+ROLLUP_STEPS = (60, 3600, 86400)
+ROLLUP_RETENTION = {
+    60: float(os.environ.get("TOOLBOX_ROLLUP_MINUTE_RETENTION", str(2 * 86400))),
+    3600: float(os.environ.get("TOOLBOX_ROLLUP_HOUR_RETENTION", str(90 * 86400))),
+    86400: float(os.environ.get("TOOLBOX_ROLLUP_DAY_RETENTION", str(5 * 365 * 86400)))
+}
+ROLLUP_MAX_POINTS = 10000
+
+
+class Series:
+    # Kova numaraları ve sayaçlar sabit genişlikli dizilerde, kova sırasına göre tutulur
+    __slots__ = ("buckets", "counts")
+
+    def __init__(self):
+        self.buckets = array('q')
+        self.counts = array('I')
+
+    def add(self, bucket, count=1):
+        if self.buckets and self.buckets[-1] == bucket:
+            self.counts[-1] += count
+            return self.counts[-1]
+        if not self.buckets or self.buckets[-1] < bucket:
+            self.buckets.append(bucket)
+            self.counts.append(count)
+            return count
+        index = bisect.bisect_left(self.buckets, bucket)
+        if self.buckets[index] == bucket:
+            self.counts[index] += count
+            return self.counts[index]
+        self.buckets.insert(index, bucket)
+        self.counts.insert(index, count)
+        return count
+
+    def set(self, bucket, count):
+        index = bisect.bisect_left(self.buckets, bucket)
+        if index < len(self.buckets) and self.buckets[index] == bucket:
+            self.counts[index] = count
+        else:
+            self.buckets.insert(index, bucket)
+            self.counts.insert(index, count)
+
+    def get(self, bucket):
+        index = bisect.bisect_left(self.buckets, bucket)
+        if index < len(self.buckets) and self.buckets[index] == bucket:
+            return self.counts[index]
+        return 0
+
+    def between(self, first, last):
+        start = bisect.bisect_left(self.buckets, first)
+        end = bisect.bisect_right(self.buckets, last)
+        return zip(self.buckets[start:end], self.counts[start:end])
+
+    def trim(self, before):
+        index = bisect.bisect_left(self.buckets, before)
+        del self.buckets[:index]
+        del self.counts[:index]
+        return index
+
+
+class UsageRollups:
+    def __init__(self, steps=ROLLUP_STEPS, retention=None):
+        self.steps = tuple(sorted(steps))
+        self.retention = retention or ROLLUP_RETENTION
+        self._series = {step: {} for step in self.steps}
+        self._dirty = set()
+
+    def __len__(self):
+        return len(self._series[self.steps[0]])
+
+    def record(self, names, count=1, now=None):
+        # Her olay tüm çözünürlüklerde (dakika/saat/gün) ilgili serilere eklenir
+        now = time.time() if now is None else now
+        for step, table in self._series.items():
+            bucket = int(now // step)
+            for name in names:
+                series = table.get(name)
+                if series is None:
+                    series = table[name] = Series()
+                series.add(bucket, count)
+                self._dirty.add((name, step, bucket))
+
+    def resolution(self, start, step, now=None):
+        # Başlangıcı hâlâ saklanan en ince çözünürlük seçilir; eski aralıklar kaba kovalardan okunur
+        now = time.time() if now is None else now
+        available = [r for r in self.steps if now - self.retention[r] <= start] or [self.steps[-1]]
+        dividing = [r for r in available if step % r == 0]
+        return dividing[-1] if dividing else available[0]
+
+    def timeseries(self, name, start, end, step, now=None):
+        resolution = self.resolution(start, step, now)
+        step = max(resolution, -(-int(step) // resolution) * resolution)
+        first = int(start // step) * step
+        if (int(end) - first) // step + 1 > ROLLUP_MAX_POINTS:
+            raise ValueError(f"Tek sorguda en fazla {ROLLUP_MAX_POINTS} nokta döndürülebilir")
+        points = {timestamp: 0 for timestamp in range(first, int(end) + 1, step)}
+        series = self._series[resolution].get(name)
+        if series is not None:
+            for bucket, count in series.between(first // resolution, int(end) // resolution):
+                timestamp = bucket * resolution // step * step
+                if timestamp in points:
+                    points[timestamp] += count
+        return step, resolution, [{"timestamp": timestamp, "count": count} for timestamp, count in points.items()]
+
+    def downsample(self, now=None):
+        # Saklama süresini aşan ince kovalar silinir; aynı aralık daha kaba çözünürlükte kalır
+        now = time.time() if now is None else now
+        ops = []
+        for step, table in self._series.items():
+            before = int((now - self.retention[step]) // step)
+            empty = []
+            for name, series in table.items():
+                series.trim(before)
+                if not series.buckets:
+                    empty.append(name)
+            for name in empty:
+                del table[name]
+            ops.append(("prune_rollups", {"step": step, "before": before}))
+        return ops
+
+    def load(self, records):
+        for record in records:
+            table = self._series.get(record["step"])
+            if table is None:
+                continue
+            series = table.get(record["series"])
+            if series is None:
+                series = table[record["series"]] = Series()
+            series.set(record["bucket"], record["count"])
+
+    def flush_ops(self):
+        ops = []
+        for name, step, bucket in self._dirty:
+            series = self._series[step].get(name)
+            if series is None:
+                continue
+            ops.append(("put_rollup", {"series": name, "step": step, "bucket": bucket,
+                                       "count": series.get(bucket)}))
+        self._dirty.clear()
+        return ops
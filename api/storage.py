@@ -0,0 +1,387 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from components import serialization
+
+STORE_BACKEND = os.environ.get("TOOLBOX_STORE_BACKEND", "sqlite")
+STORE_PATH = os.environ.get("TOOLBOX_STORE_PATH", "toolbox.db")
+
+LICENSE_COLUMNS = ("license_key", "email", "name", "license_type", "created_at",
+                   "expires_at", "is_active", "usage_count", "last_used")
+API_KEY_COLUMNS = ("api_key", "service", "created_at", "is_active", "usage_count", "last_used")
+QUOTA_COLUMNS = ("subject", "minute", "minute_count", "day", "day_count")
+ROLLUP_COLUMNS = ("series", "step", "bucket", "count")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS licenses (
+    license_key TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    name TEXT,
+    license_type TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    last_used TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_licenses_email ON licenses(email);
+CREATE TABLE IF NOT EXISTS api_keys (
+    api_key TEXT PRIMARY KEY,
+    service TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    last_used TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_api_keys_service ON api_keys(service);
+CREATE TABLE IF NOT EXISTS quotas (
+    subject TEXT PRIMARY KEY,
+    minute INTEGER NOT NULL,
+    minute_count INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    day_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    series TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (series, step, bucket)
+) WITHOUT ROWID;
+"""
+
+
+def _row_to_dict(columns, row):
+    data = {}
+    for column, value in zip(columns, row):
+        if value is None and column == "last_used":
+            continue
+        data[column] = value
+    data["is_active"] = bool(data["is_active"])
+    extra = row[len(columns)]
+    if extra:
+        data.update(json.loads(extra))
+    return data
+
+
+def apply_op(store, op):
+    if op[0].startswith("update_"):
+        return getattr(store, op[0])(op[1], **op[2])
+    return getattr(store, op[0])(op[1])
+
+
+def _dict_to_row(columns, data):
+    row = []
+    for column in columns:
+        value = data.get(column)
+        if column == "is_active":
+            value = 1 if value else 0
+        elif column == "usage_count":
+            value = value or 0
+        row.append(value)
+    extra = {k: v for k, v in data.items() if k not in columns}
+    row.append(json.dumps(extra) if extra else None)
+    return row
+
+
+class SQLiteStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+
+    def _get(self, table, columns, key_column, key):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(columns)}, extra FROM {table} WHERE {key_column} = ?", (key,)
+            ).fetchone()
+        return _row_to_dict(columns, row) if row else None
+
+    def _put(self, table, columns, data):
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, extra) VALUES ({placeholders})",
+                _dict_to_row(columns, data)
+            )
+
+    def _update(self, table, columns, key_column, key, fields):
+        fields = {k: v for k, v in fields.items() if k in columns and k != key_column}
+        if not fields:
+            return False
+        if "is_active" in fields:
+            fields["is_active"] = 1 if fields["is_active"] else 0
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE {table} SET {assignments} WHERE {key_column} = ?",
+                list(fields.values()) + [key]
+            )
+        return cursor.rowcount > 0
+
+    def _iter(self, table, columns):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(columns)}, extra FROM {table}").fetchall()
+        for row in rows:
+            yield _row_to_dict(columns, row)
+
+    def _count(self, table):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def get_license(self, license_key):
+        return self._get("licenses", LICENSE_COLUMNS, "license_key", license_key)
+
+    def put_license(self, license_data):
+        self._put("licenses", LICENSE_COLUMNS, license_data)
+
+    def update_license(self, license_key, **fields):
+        return self._update("licenses", LICENSE_COLUMNS, "license_key", license_key, fields)
+
+    def iter_licenses(self):
+        return self._iter("licenses", LICENSE_COLUMNS)
+
+    def count_licenses(self):
+        return self._count("licenses")
+
+    def get_api_key(self, api_key):
+        return self._get("api_keys", API_KEY_COLUMNS, "api_key", api_key)
+
+    def put_api_key(self, key_data):
+        self._put("api_keys", API_KEY_COLUMNS, key_data)
+
+    def update_api_key(self, api_key, **fields):
+        return self._update("api_keys", API_KEY_COLUMNS, "api_key", api_key, fields)
+
+    def iter_api_keys(self):
+        return self._iter("api_keys", API_KEY_COLUMNS)
+
+    def count_api_keys(self):
+        return self._count("api_keys")
+
+    def put_quota(self, quota):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO quotas ({', '.join(QUOTA_COLUMNS)}) VALUES (?, ?, ?, ?, ?)",
+                [quota[column] for column in QUOTA_COLUMNS]
+            )
+
+    def prune_quotas(self, prune):
+        with self._lock:
+            self._conn.execute("DELETE FROM quotas WHERE day < ?", (prune["before"],))
+
+    def iter_quotas(self):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(QUOTA_COLUMNS)} FROM quotas").fetchall()
+        return (dict(zip(QUOTA_COLUMNS, row)) for row in rows)
+
+    def put_rollup(self, rollup):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO rollups ({', '.join(ROLLUP_COLUMNS)}) VALUES (?, ?, ?, ?)",
+                [rollup[column] for column in ROLLUP_COLUMNS]
+            )
+
+    def prune_rollups(self, prune):
+        with self._lock:
+            self._conn.execute("DELETE FROM rollups WHERE step = ? AND bucket < ?", (prune["step"], prune["before"]))
+
+    def iter_rollups(self):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM rollups ORDER BY series, step, bucket"
+            ).fetchall()
+        return (dict(zip(ROLLUP_COLUMNS, row)) for row in rows)
+
+    def put_many(self, licenses=(), api_keys=()):
+        ops = [("put_license", license_data) for license_data in licenses]
+        ops.extend(("put_api_key", key_data) for key_data in api_keys)
+        self.apply_batch(ops)
+
+    def apply_batch(self, ops):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for op in ops:
+                    apply_op(self, op)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JSONStore:
+    def __init__(self, licenses_file="licenses.json", api_keys_file="api_keys.json", quotas_file="quotas.json",
+                 rollups_file="rollups.json", format="json"):
+        serialization.check_format(format)
+        self.format = format
+        self.licenses_file = licenses_file
+        self.api_keys_file = api_keys_file
+        self.quotas_file = quotas_file
+        self.rollups_file = rollups_file
+        self._licenses = self._load(licenses_file)
+        self._api_keys = self._load(api_keys_file)
+        self._quotas = self._load(quotas_file)
+        self._rollups = self._load(rollups_file)
+        self._batching = False
+        self._dirty = set()
+
+    def _load(self, path):
+        if os.path.exists(path):
+            return serialization.load_file(path)
+        return {}
+
+    def _save(self, path, data):
+        if self._batching:
+            self._dirty.add(path)
+            return
+        serialization.save_file(path, data, self.format)
+
+    def get_license(self, license_key):
+        license_data = self._licenses.get(license_key)
+        return dict(license_data) if license_data else None
+
+    def put_license(self, license_data):
+        self._licenses[license_data["license_key"]] = dict(license_data)
+        self._save(self.licenses_file, self._licenses)
+
+    def update_license(self, license_key, **fields):
+        if license_key not in self._licenses:
+            return False
+        self._licenses[license_key].update(fields)
+        self._save(self.licenses_file, self._licenses)
+        return True
+
+    def iter_licenses(self):
+        return (dict(license_data) for license_data in list(self._licenses.values()))
+
+    def count_licenses(self):
+        return len(self._licenses)
+
+    def get_api_key(self, api_key):
+        key_data = self._api_keys.get(api_key)
+        return dict(key_data) if key_data else None
+
+    def put_api_key(self, key_data):
+        self._api_keys[key_data["api_key"]] = dict(key_data)
+        self._save(self.api_keys_file, self._api_keys)
+
+    def update_api_key(self, api_key, **fields):
+        if api_key not in self._api_keys:
+            return False
+        self._api_keys[api_key].update(fields)
+        self._save(self.api_keys_file, self._api_keys)
+        return True
+
+    def iter_api_keys(self):
+        return (dict(key_data) for key_data in list(self._api_keys.values()))
+
+    def count_api_keys(self):
+        return len(self._api_keys)
+
+    def put_quota(self, quota):
+        self._quotas[quota["subject"]] = dict(quota)
+        self._save(self.quotas_file, self._quotas)
+
+    def prune_quotas(self, prune):
+        for subject in [subject for subject, quota in self._quotas.items() if quota["day"] < prune["before"]]:
+            del self._quotas[subject]
+        self._save(self.quotas_file, self._quotas)
+
+    def iter_quotas(self):
+        return (dict(quota) for quota in list(self._quotas.values()))
+
+    def put_rollup(self, rollup):
+        # Anahtar: "adım:kova:seri"
+        self._rollups[f"{rollup['step']}:{rollup['bucket']}:{rollup['series']}"] = rollup["count"]
+        self._save(self.rollups_file, self._rollups)
+
+    def prune_rollups(self, prune):
+        for key in list(self._rollups):
+            step, bucket, _ = key.split(":", 2)
+            if int(step) == prune["step"] and int(bucket) < prune["before"]:
+                del self._rollups[key]
+        self._save(self.rollups_file, self._rollups)
+
+    def iter_rollups(self):
+        records = []
+        for key, count in list(self._rollups.items()):
+            step, bucket, series = key.split(":", 2)
+            records.append({"series": series, "step": int(step), "bucket": int(bucket), "count": count})
+        records.sort(key=lambda record: (record["series"], record["step"], record["bucket"]))
+        return iter(records)
+
+    def put_many(self, licenses=(), api_keys=()):
+        ops = [("put_license", license_data) for license_data in licenses]
+        ops.extend(("put_api_key", key_data) for key_data in api_keys)
+        self.apply_batch(ops)
+
+    def apply_batch(self, ops):
+        self._batching = True
+        try:
+            for op in ops:
+                apply_op(self, op)
+        finally:
+            self._batching = False
+        dirty, self._dirty = self._dirty, set()
+        if self.licenses_file in dirty:
+            self._save(self.licenses_file, self._licenses)
+        if self.api_keys_file in dirty:
+            self._save(self.api_keys_file, self._api_keys)
+        if self.quotas_file in dirty:
+            self._save(self.quotas_file, self._quotas)
+        if self.rollups_file in dirty:
+            self._save(self.rollups_file, self._rollups)
+
+    def close(self):
+        pass
+
+
+def open_store(backend=None, path=None):
+    backend = backend or STORE_BACKEND
+    if backend == "sqlite":
+        return SQLiteStore(path or STORE_PATH)
+    if backend == "json":
+        return JSONStore()
+    if backend == "binary":
+        return JSONStore("licenses.bin", "api_keys.bin", "quotas.bin", "rollups.bin", format="binary")
+    raise ValueError(f"Bilinmeyen depolama türü: {backend}")
+
+
+def migrate_json_to_sqlite(licenses_file, api_keys_file, db_path):
+    source = JSONStore(licenses_file, api_keys_file)
+    target = SQLiteStore(db_path)
+    try:
+        target.put_many(source.iter_licenses(), source.iter_api_keys())
+        return target.count_licenses(), target.count_api_keys()
+    finally:
+        target.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Python Toolbox API depolama araçları")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser("migrate", help="JSON dosyalarını SQLite veritabanına aktar")
+    migrate.add_argument("--licenses", default="licenses.json")
+    migrate.add_argument("--api-keys", default="api_keys.json")
+    migrate.add_argument("--db", default=STORE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        license_count, api_key_count = migrate_json_to_sqlite(args.licenses, args.api_keys, args.db)
+        print(f"{license_count} lisans ve {api_key_count} API anahtarı {args.db} dosyasına aktarıldı")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+UPLOAD_DIR = os.environ.get("TOOLBOX_UPLOAD_DIR", "uploads")
+UPLOAD_MAX_FILE_SIZE = int(os.environ.get("TOOLBOX_UPLOAD_MAX_FILE_SIZE", str(2 * 1024 ** 3)))
+UPLOAD_MAX_TOTAL_SIZE = int(os.environ.get("TOOLBOX_UPLOAD_MAX_TOTAL_SIZE", str(8 * 1024 ** 3)))
+UPLOAD_MAX_FILES = int(os.environ.get("TOOLBOX_UPLOAD_MAX_FILES", "100"))
+UPLOAD_MAX_FIELD_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadTooLarge(UploadError):
+    pass
+
+
+class SpoolFile:
+    def __init__(self, directory, filename):
+        self.directory = directory
+        self.filename = os.path.basename(filename) or "input"
+        self.path = None
+        self.size = 0
+        self._file = None
+        self._hash = hashlib.sha256()
+
+    def write(self, data):
+        # Diske yazma olay döngüsü dışında yapılır; hash akış sırasında hesaplanır
+        if self._file is None:
+            fd, self.path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+            self._file = os.fdopen(fd, 'wb')
+        self._file.write(data)
+        self._hash.update(data)
+
+    def close(self):
+        if self._file is None:
+            self.write(b"")
+        self._file.close()
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def to_dict(self):
+        return {"filename": self.filename, "size": self.size, "sha256": self._hash.hexdigest()}
+
+
+class MultipartSpool:
+    def __init__(self, directory=UPLOAD_DIR, max_file_size=UPLOAD_MAX_FILE_SIZE,
+                 max_total_size=UPLOAD_MAX_TOTAL_SIZE, max_files=UPLOAD_MAX_FILES):
+        self.directory = directory
+        self.max_file_size = max_file_size
+        self.max_total_size = max_total_size
+        self.max_files = max_files
+        self.fields = {}
+        self.files = []
+        self.total_size = 0
+        self._pending = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._current = None
+        self._field_name = None
+        self._field_value = b""
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._current = None
+        self._field_name = None
+        self._field_value = b""
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            self._field_name = name
+            return
+        if len(self.files) >= self.max_files:
+            raise UploadTooLarge(f"Tek istekte en fazla {self.max_files} dosya yüklenebilir")
+        self._current = SpoolFile(self.directory, options[b"filename"].decode("utf-8", "replace"))
+        self.files.append(self._current)
+
+    def _on_part_data(self, data, start, end):
+        size = end - start
+        self.total_size += size
+        if self.total_size > self.max_total_size:
+            raise UploadTooLarge(f"Toplam yükleme boyutu {self.max_total_size} baytı aşamaz")
+        if self._current is None:
+            self._field_value += data[start:end]
+            if len(self._field_value) > UPLOAD_MAX_FIELD_SIZE:
+                raise UploadTooLarge(f"{self._field_name} alanı çok büyük")
+            return
+        self._current.size += size
+        if self._current.size > self.max_file_size:
+            raise UploadTooLarge(f"{self._current.filename} dosyası {self.max_file_size} baytı aşamaz")
+        self._pending.append((self._current, data[start:end]))
+
+    def _on_part_end(self):
+        if self._current is None and self._field_name is not None:
+            self.fields[self._field_name] = self._field_value.decode("utf-8", "replace")
+
+    def _flush(self, finish=False):
+        pending, self._pending = self._pending, []
+        for spool_file, data in pending:
+            spool_file.write(data)
+        if finish:
+            for spool_file in self.files:
+                spool_file.close()
+
+    async def receive(self, request):
+        content_type, options = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise UploadError("multipart/form-data bekleniyor")
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_total_size + 1024 * 1024:
+            raise UploadTooLarge(f"Toplam yükleme boyutu {self.max_total_size} baytı aşamaz")
+
+        os.makedirs(self.directory, exist_ok=True)
+        parser = MultipartParser(options[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+        loop = asyncio.get_running_loop()
+        try:
+            # Her parça geldiği anda diske yazılır; bellekte en fazla bir parça tutulur
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if self._pending:
+                    await loop.run_in_executor(None, self._flush)
+            parser.finalize()
+            await loop.run_in_executor(None, self._flush, True)
+        except Exception as e:
+            await loop.run_in_executor(None, self.discard)
+            if isinstance(e, UploadError):
+                raise
+            raise UploadError(f"Yükleme okunamadı: {e}")
+        return self.fields, self.files
+
+    def discard(self):
+        self._pending = []
+        for spool_file in self.files:
+            spool_file.discard()
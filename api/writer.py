@@ -0,0 +1,77 @@
+import asyncio
+import time
+from api.metrics import metrics
+
+WRITER_MAX_BATCH = 512
+WRITER_MAX_DELAY = 0.005
+
+
+class StoreWriter:
+    def __init__(self, store, max_batch=WRITER_MAX_BATCH, max_delay=WRITER_MAX_DELAY):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches_committed = 0
+        self.ops_committed = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def submit(self, *ops):
+        # Geri dönen future, işlemler diske kalıcı olarak yazıldığında tamamlanır
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((list(ops), future))
+        return future
+
+    async def _collect(self, first):
+        loop = asyncio.get_running_loop()
+        batch = [first]
+        op_count = len(first[0])
+        deadline = loop.time() + self.max_delay
+        while op_count < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                self._queue.put_nowait(None)
+                break
+            batch.append(item)
+            op_count += len(item[0])
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = await self._collect(item)
+            ops = [op for item_ops, _ in batch for op in item_ops]
+            start = time.perf_counter()
+            try:
+                await loop.run_in_executor(None, self.store.apply_batch, ops)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            metrics.observe_store("commit", time.perf_counter() - start)
+            self.batches_committed += 1
+            self.ops_committed += len(ops)
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(len(ops))
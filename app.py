@@ -6,11 +6,14 @@ Tüm hakları saklıdır.
 
 import sys
 import os
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt
 from ui.main_window import MainWindow
 
 if __name__ == "__main__":
+    # PyInstaller ile paketlenmiş uygulamada spawn alt süreçleri arayüzü yeniden açmaz
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     
     app.setApplicationName("Python Toolbox")
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Python Toolbox - Lisans API Yük Testi
+Sentetik mağaza oluşturur, api.main:app uygulamasını süreç içinde veya
+uvicorn altında çalıştırır ve uç nokta karışımına göre gecikme ölçer.
+
+Örnek:
+    python benchmarks/api_load.py --licenses 100000 --mode inprocess \\
+        --mix verify-license=80,verify-api-key=15,stats=5 --output bench.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_MIX = "verify-license=70,verify-api-key=20,license-info=5,stats=5"
+
+
+def seed_store(directory, license_count, api_key_count, backend="sqlite"):
+    from api.storage import SQLiteStore, JSONStore
+
+    now = datetime.now()
+    licenses = []
+    for i in range(license_count):
+        licenses.append({
+            "license_key": hashlib.sha256(f"license:{i}".encode()).hexdigest()[:32].upper(),
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "license_type": "pro" if i % 4 else "enterprise",
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(days=365)).isoformat(),
+            "is_active": i % 50 != 0,
+            "usage_count": 0
+        })
+    api_keys = []
+    for i in range(api_key_count):
+        api_keys.append({
+            "api_key": hashlib.sha256(f"api:{i}".encode()).hexdigest()[:24],
+            "service": f"service{i % 10}",
+            "created_at": now.isoformat(),
+            "is_active": True,
+            "usage_count": 0
+        })
+
+    if backend == "sqlite":
+        store = SQLiteStore(os.path.join(directory, "toolbox.db"))
+    else:
+        store = JSONStore(os.path.join(directory, "licenses.json"), os.path.join(directory, "api_keys.json"))
+    store.put_many(licenses, api_keys)
+    store.close()
+    return licenses, api_keys
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(REQUEST_BUILDERS)
+    if unknown:
+        raise SystemExit(f"Bilinmeyen uç nokta: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _verify_license(licenses, api_keys, rng):
+    lic = rng.choice(licenses)
+    return "POST", "/verify-license", {"license_key": lic["license_key"], "email": lic["email"]}
+
+
+def _verify_api_key(licenses, api_keys, rng):
+    return "POST", "/verify-api-key", {"api_key": rng.choice(api_keys)["api_key"]}
+
+
+def _license_info(licenses, api_keys, rng):
+    return "GET", f"/license-info/{rng.choice(licenses)['license_key']}", None
+
+
+def _api_usage(licenses, api_keys, rng):
+    return "GET", f"/api-usage/{rng.choice(api_keys)['api_key']}", None
+
+
+def _generate_license(licenses, api_keys, rng):
+    return "POST", "/generate-license", {"email": f"bench{rng.randrange(10**9)}@example.com", "name": "Bench"}
+
+
+def _stats(licenses, api_keys, rng):
+    return "GET", "/stats", None
+
+
+def _health(licenses, api_keys, rng):
+    return "GET", "/health", None
+
+
+REQUEST_BUILDERS = {
+    "verify-license": _verify_license,
+    "verify-api-key": _verify_api_key,
+    "license-info": _license_info,
+    "api-usage": _api_usage,
+    "generate-license": _generate_license,
+    "stats": _stats,
+    "health": _health,
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, duration, ok):
+        with self._lock:
+            self.samples.setdefault(name, []).append(duration)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        total = 0
+        for name, durations in sorted(self.samples.items()):
+            durations.sort()
+            total += len(durations)
+            endpoints[name] = {
+                "requests": len(durations),
+                "errors": self.errors.get(name, 0),
+                "throughput_rps": round(len(durations) / elapsed, 2),
+                "p50_ms": round(percentile(durations, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(durations, 0.99) * 1000, 3),
+                "max_ms": round(durations[-1] * 1000, 3),
+            }
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "total_requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def _choose(mix, rng):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    return rng.choices(names, weights)[0]
+
+
+async def _asgi_call(app, method, path, body):
+    payload = json.dumps(body).encode() if body is not None else b""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    sent = [False]
+    status = [500]
+
+    async def receive():
+        if not sent[0]:
+            sent[0] = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def _run_inprocess(args, mix, licenses, api_keys, recorder):
+    from api.main import app
+
+    async def client(worker_id, deadline):
+        rng = random.Random(args.seed + worker_id)
+        while time.perf_counter() < deadline:
+            name = _choose(mix, rng)
+            method, path, body = REQUEST_BUILDERS[name](licenses, api_keys, rng)
+            start = time.perf_counter()
+            status = await _asgi_call(app, method, path, body)
+            recorder.record(name, time.perf_counter() - start, status < 400)
+
+    async with app.router.lifespan_context(app):
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(client(i, deadline) for i in range(args.concurrency)))
+        return time.perf_counter() - start
+
+
+def _wait_for_server(base_url, timeout=30):
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("uvicorn sunucusu başlatılamadı")
+
+
+def _run_uvicorn(args, mix, licenses, api_keys, recorder, directory):
+    import requests
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    command = [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1",
+               "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"]
+    server = subprocess.Popen(command, cwd=directory, env=env)
+    try:
+        _wait_for_server(base_url)
+
+        def client(worker_id, deadline):
+            rng = random.Random(args.seed + worker_id)
+            session = requests.Session()
+            while time.perf_counter() < deadline:
+                name = _choose(mix, rng)
+                method, path, body = REQUEST_BUILDERS[name](licenses, api_keys, rng)
+                start = time.perf_counter()
+                try:
+                    response = session.request(method, base_url + path, json=body, timeout=30)
+                    ok = response.status_code < 400
+                except requests.RequestException:
+                    ok = False
+                recorder.record(name, time.perf_counter() - start, ok)
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+        threads = [threading.Thread(target=client, args=(i, deadline)) for i in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline=None):
+    print(f"\n{'Uç nokta':<20}{'İstek':>9}{'Hata':>7}{'RPS':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in report["endpoints"].items():
+        line = (f"{name:<20}{row['requests']:>9}{row['errors']:>7}{row['throughput_rps']:>10}"
+                f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous and previous["p99_ms"]:
+            change = (row["p99_ms"] - previous["p99_ms"]) / previous["p99_ms"] * 100
+            line += f"   p99 {change:+.1f}%"
+        print(line)
+    print(f"\nToplam: {report['total_requests']} istek, {report['throughput_rps']} istek/sn")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lisans API yük testi")
+    parser.add_argument("--licenses", type=int, default=10000, help="Sentetik lisans sayısı")
+    parser.add_argument("--api-keys", type=int, default=1000, help="Sentetik API anahtarı sayısı")
+    parser.add_argument("--backend", choices=["sqlite", "json"], default="sqlite")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="uç nokta=ağırlık listesi")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Saniye cinsinden test süresi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn işçi sayısı (yalnızca 1 desteklenir)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", help="Karşılaştırma için önceki JSON sonucu")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.workers > 1:
+        # Her uvicorn işçisi kendi bellek içi deposunu tutar; yazmalar ve iptaller işçiler arasında paylaşılmaz,
+        # bu yüzden çok işçili sonuçlar tek işçili ölçümlerle karşılaştırılamaz
+        raise SystemExit("--workers 1'den büyük olamaz: işçiler bellek içi depoyu paylaşmaz")
+    directory = tempfile.mkdtemp(prefix="toolbox-bench-")
+    try:
+        # api.storage depo ayarlarını içe aktarılırken okur; ortam değişkenleri herhangi bir api.* içe aktarımından önce ayarlanır
+        os.environ["TOOLBOX_STORE_BACKEND"] = args.backend
+        os.environ["TOOLBOX_STORE_PATH"] = os.path.join(directory, "toolbox.db")
+        os.environ["TOOLBOX_USAGE_JOURNAL"] = os.path.join(directory, "usage.journal")
+        os.environ.setdefault("TOOLBOX_RATE_LIMIT", "0")
+
+        seed_start = time.perf_counter()
+        licenses, api_keys = seed_store(directory, args.licenses, args.api_keys, args.backend)
+        print(f"{args.licenses} lisans ve {args.api_keys} API anahtarı {time.perf_counter() - seed_start:.2f} sn'de oluşturuldu")
+
+        recorder = Recorder()
+        if args.mode == "inprocess":
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                elapsed = asyncio.run(_run_inprocess(args, mix, licenses, api_keys, recorder))
+            finally:
+                os.chdir(cwd)
+        else:
+            elapsed = _run_uvicorn(args, mix, licenses, api_keys, recorder, directory)
+
+        report = recorder.report(elapsed)
+        report["config"] = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+        report["revision"] = git_revision()
+        report["timestamp"] = datetime.now().isoformat()
+
+        baseline = None
+        if args.compare:
+            with open(args.compare, 'r') as f:
+                baseline = json.load(f)
+        print_report(report, baseline)
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Sonuçlar {args.output} dosyasına yazıldı")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Python Toolbox - PDF Birleştirme Karşılaştırması
+Aynı logo ve fontu paylaşan sentetik fatura PDF'leri üretir; eski PyPDF2
+PdfMerger yolunu ve PDFTools.merge_pdfs motorunu ayrı süreçlerde çalıştırıp
+süre, en yüksek bellek kullanımı ve çıktı boyutunu karşılaştırır.
+
+Örnek:
+    python benchmarks/pdf_merge.py --files 500 --pages 2
+    python benchmarks/pdf_merge.py --input-dir faturalar/ --output merge.json
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FONT_CANDIDATES = ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "C:/Windows/Fonts/arial.ttf",
+                   "/Library/Fonts/Arial.ttf")
+
+
+def create_corpus(directory, file_count, page_count, seed=1):
+    import fitz
+    from PIL import Image
+
+    rng = random.Random(seed)
+    logo = Image.frombytes("RGB", (256, 256), bytes(rng.randrange(256) for _ in range(256 * 256 * 3)))
+    buffer = io.BytesIO()
+    logo.save(buffer, "PNG")
+    logo_bytes = buffer.getvalue()
+    font_file = next((path for path in FONT_CANDIDATES if os.path.exists(path)), None)
+
+    # Her fatura kendi logo ve font kopyasını taşır; birleştirme motoru bunları tek nesneye indirmeli
+    files = []
+    for number in range(file_count):
+        doc = fitz.open()
+        for page_number in range(page_count):
+            page = doc.new_page()
+            page.insert_image(fitz.Rect(40, 40, 140, 140), stream=logo_bytes)
+            fontname = "helv"
+            if font_file:
+                fontname = "F0"
+                page.insert_font(fontname=fontname, fontfile=font_file)
+            page.insert_text((180, 80), f"Fatura #{number + 1:05d}", fontsize=20, fontname=fontname)
+            for line in range(30):
+                page.insert_text((50, 180 + line * 18), f"Kalem {line + 1}: {rng.randrange(1, 1000)} adet x "
+                                 f"{rng.randrange(1, 500)} TL", fontsize=10, fontname=fontname)
+        doc.set_toc([[1, f"Fatura {number + 1}", 1]] + [[2, f"Sayfa {p + 1}", p + 1] for p in range(page_count)])
+        path = os.path.join(directory, f"invoice_{number + 1:05d}.pdf")
+        doc.save(path, garbage=3, deflate=True)
+        doc.close()
+        files.append(path)
+    return files
+
+
+def _legacy_merge(files, output):
+    from PyPDF2 import PdfMerger
+
+    # Önceki PDFTools.merge_pdfs uygulaması
+    merger = PdfMerger()
+    for pdf_file in files:
+        merger.append(pdf_file)
+    merger.write(output)
+    merger.close()
+
+
+def _engine_merge(files, output):
+    from tools.pdf_tools import PDFTools
+
+    PDFTools().merge_pdfs(files, output)
+
+
+def peak_rss_mb():
+    if resource is not None:
+        # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        # Windows'ta peak_wset sürecin en yüksek çalışma kümesidir (bayt)
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    return None
+
+
+def run_worker(engine, list_file, output):
+    with open(list_file, 'r') as f:
+        files = json.load(f)
+    start = time.perf_counter()
+    (_legacy_merge if engine == "legacy" else _engine_merge)(files, output)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_rss_mb()}))
+
+
+def measure(engine, files, directory):
+    list_file = os.path.join(directory, "files.json")
+    with open(list_file, 'w') as f:
+        json.dump(files, f)
+    output = os.path.join(directory, f"merged_{engine}.pdf")
+    # Her motor ayrı süreçte çalışır; en yüksek bellek ölçümü birbirini etkilemez
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", engine, list_file, output],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"{engine} birleştirme başarısız:\n{result.stderr}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["output_mb"] = os.path.getsize(output) / (1024 * 1024)
+
+    import pikepdf
+    with pikepdf.open(output) as pdf:
+        report["pages"] = len(pdf.pages)
+        report["objects"] = len(pdf.objects)
+        with pdf.open_outline() as outline:
+            report["outline_entries"] = len(outline.root)
+    return report
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        run_worker(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description="PDF birleştirme karşılaştırması")
+    parser.add_argument("--input-dir", help="Birleştirilecek PDF klasörü (verilmezse sentetik faturalar üretilir)")
+    parser.add_argument("--files", type=int, default=200, help="Sentetik fatura sayısı")
+    parser.add_argument("--pages", type=int, default=2, help="Fatura başına sayfa sayısı")
+    parser.add_argument("--engines", default="legacy,engine", help="Çalıştırılacak motorlar")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="toolbox-merge-bench-")
+    try:
+        if args.input_dir:
+            files = sorted(glob.glob(os.path.join(args.input_dir, "*.pdf")))
+        else:
+            corpus_start = time.perf_counter()
+            corpus_dir = os.path.join(directory, "corpus")
+            os.makedirs(corpus_dir)
+            files = create_corpus(corpus_dir, args.files, args.pages)
+            print(f"{len(files)} fatura {time.perf_counter() - corpus_start:.2f} sn'de üretildi")
+        input_mb = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+
+        results = {}
+        for engine in [name.strip() for name in args.engines.split(",") if name.strip()]:
+            results[engine] = measure(engine, files, directory)
+
+        print(f"\nGirdi: {len(files)} dosya, {input_mb:.2f} MB")
+        print(f"{'Motor':>8} {'Süre (sn)':>10} {'Bellek (MB)':>12} {'Çıktı (MB)':>11} {'Sayfa':>6} {'Nesne':>7} {'Başlık':>7}")
+        for engine, row in results.items():
+            # Windows'ta psutil yoksa bellek ölçülemez
+            peak = "-" if row["peak_rss_mb"] is None else f"{row['peak_rss_mb']:.1f}"
+            print(f"{engine:>8} {row['seconds']:>10.2f} {peak:>12} {row['output_mb']:>11.2f} "
+                  f"{row['pages']:>6} {row['objects']:>7} {row['outline_entries']:>7}")
+
+        if args.output:
+            report = {
+                "config": {k: v for k, v in vars(args).items() if k != "output"},
+                "input_files": len(files),
+                "input_mb": round(input_mb, 3),
+                "timestamp": datetime.now().isoformat(),
+                "results": results
+            }
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Sonuçlar {args.output} dosyasına yazıldı")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Python Toolbox - PDF → JPG Dönüştürme Karşılaştırması
+PDFTools.pdf_to_jpg fonksiyonunu tek süreçte ve süreç havuzuyla çalıştırır,
+süreleri ve çıktıların aynı olup olmadığını raporlar.
+
+Örnek:
+    python benchmarks/pdf_render.py --pages 200 --dpi 150 --workers 1,2,4,8
+    python benchmarks/pdf_render.py --input tarama.pdf --page-range 1-50 --output render.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def create_sample_pdf(path, page_count):
+    import fitz
+
+    # Taranmış belgeye benzesin diye her sayfaya metin, çizgiler ve dolu şekiller eklenir
+    doc = fitz.open()
+    for number in range(page_count):
+        page = doc.new_page()
+        for line in range(40):
+            page.insert_text((50, 60 + line * 18), f"Sayfa {number + 1} satır {line + 1} " + "lorem ipsum " * 6,
+                             fontsize=9)
+        for index in range(25):
+            x = 40 + (index * 53 + number * 7) % 500
+            y = 60 + (index * 31 + number * 13) % 700
+            page.draw_rect(fitz.Rect(x, y, x + 40, y + 25), color=(0.1, 0.3, 0.6),
+                           fill=((index % 5) / 5, (number % 7) / 7, 0.5))
+    doc.save(path)
+    doc.close()
+
+
+def digest_outputs(files):
+    digest = hashlib.sha256()
+    for path in files:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def run_once(pdf_file, output_dir, dpi, pages, workers):
+    from tools.pdf_tools import PDFTools
+
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    files = PDFTools().pdf_to_jpg(pdf_file, output_dir, dpi=dpi, pages=pages, workers=workers)
+    elapsed = time.perf_counter() - start
+    return elapsed, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF → JPG seri/paralel karşılaştırması")
+    parser.add_argument("--input", help="Test edilecek PDF (verilmezse sentetik belge üretilir)")
+    parser.add_argument("--pages", type=int, default=100, help="Sentetik belgenin sayfa sayısı")
+    parser.add_argument("--page-range", help="Dönüştürülecek sayfalar, örn. 1-50,60")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="Denenecek işçi sayıları")
+    parser.add_argument("--repeat", type=int, default=1, help="Her ayar için tekrar sayısı (en iyisi alınır)")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    # Hızlanma ve çıktı karşılaştırması tek süreçli ölçüme göre yapılır; 1 her zaman önce çalışır
+    worker_counts = sorted({int(value) for value in args.workers.split(",") if value.strip()} | {1})
+
+    directory = tempfile.mkdtemp(prefix="toolbox-render-")
+    try:
+        pdf_file = args.input
+        if pdf_file is None:
+            pdf_file = os.path.join(directory, "sample.pdf")
+            create_sample_pdf(pdf_file, args.pages)
+
+        results = []
+        baseline = None
+        for workers in worker_counts:
+            best = None
+            for attempt in range(args.repeat):
+                output_dir = os.path.join(directory, f"out_{workers}_{attempt}")
+                elapsed, files = run_once(pdf_file, output_dir, args.dpi, args.page_range, workers)
+                digest = digest_outputs(files)
+                shutil.rmtree(output_dir, ignore_errors=True)
+                if best is None or elapsed < best:
+                    best = elapsed
+            if workers == 1:
+                baseline = (best, digest)
+            results.append({
+                "workers": workers,
+                "pages": len(files),
+                "seconds": round(best, 3),
+                "pages_per_second": round(len(files) / best, 2) if best else None,
+                "speedup": round(baseline[0] / best, 2) if best else None,
+                "identical": digest == baseline[1]
+            })
+
+        print(f"{'İşçi':>6} {'Sayfa':>6} {'Süre (sn)':>10} {'Sayfa/sn':>9} {'Hızlanma':>9} {'Aynı':>5}")
+        for row in results:
+            print(f"{row['workers']:>6} {row['pages']:>6} {row['seconds']:>10} {row['pages_per_second']:>9} "
+                  f"{row['speedup']:>8}x {'evet' if row['identical'] else 'HAYIR':>5}")
+
+        if args.output:
+            report = {
+                "config": {k: v for k, v in vars(args).items() if k != "output"},
+                "cpu_count": os.cpu_count(),
+                "timestamp": datetime.now().isoformat(),
+                "results": results
+            }
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Sonuçlar {args.output} dosyasına yazıldı")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
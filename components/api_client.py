@@ -0,0 +1,60 @@
+import random
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.25
+BACKOFF_MAX = 4.0
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+
+class LicenseAPIClient:
+    def __init__(self, base_url, session=None, max_retries=MAX_RETRIES, pool_size=4):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        if session is None:
+            # Bağlantılar havuzda tutulur; her çağrıda yeni TCP/TLS el sıkışması yapılmaz
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), BACKOFF_MAX)
+            except ValueError:
+                pass
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    def request(self, method, path, retry=True, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.base_url}{path}"
+        # İdempotent olmayan istekler tekrar gönderilmez; sunucu kaydı işlemiş olabilir
+        max_retries = self.max_retries if retry else 0
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout, OSError):
+                if attempt == max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+                time.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                continue
+            return response
+
+    def post(self, path, payload, retry=True):
+        return self.request("POST", path, retry=retry, json=payload)
+
+    def get(self, path, params=None):
+        return self.request("GET", path, params=params)
+
+    def close(self):
+        self.session.close()
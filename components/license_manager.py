@@ -3,30 +3,144 @@ import os
 import hashlib
 import uuid
 from datetime import datetime, timedelta
-import requests
 import base64
+import time
+import atexit
+import tempfile
+import threading
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from components.usage_journal import UsageJournal
+from components.license_tokens import LicenseTokenVerifier, RevocationList, load_public_key
+from components.api_client import LicenseAPIClient
+from components import serialization
+
+JOURNAL_COMPACT_RECORDS = 1000
+SAVE_DEBOUNCE = 0.5
+VERIFY_CACHE_TTL = 3600
+OFFLINE_GRACE_PERIOD = 7 * 86400
+REVOCATION_REFRESH_INTERVAL = 3600
 
 class LicenseManager:
-    def __init__(self, api_base_url=None):
+    def __init__(self, api_base_url=None, public_key=None, compact_storage=False, session=None, storage_format=None):
         self.api_base_url = api_base_url or "https://your-api-domain.com"
+        self.api_client = LicenseAPIClient(self.api_base_url, session=session)
+        self.verification_cache_file = "license_cache.json"
+        self._verifications = None
+        self.revocations = RevocationList()
+        self.token_verifier = None
+        self._revocations_checked_at = 0.0
+        if public_key:
+            self.set_public_key(public_key)
         self.licenses_file = "licenses.json"
+        # json (girintili), compact (tek satır) veya binary (msgspec gerekir)
+        self.storage_format = storage_format or ("compact" if compact_storage else "json")
+        serialization.check_format(self.storage_format)
+        self.usage_journal = UsageJournal(self.licenses_file + ".usage")
+        self._journal_records = 0
+        self._dirty = False
+        self._save_timer = None
+        self._save_lock = threading.Lock()
         self.local_licenses = self._load_local_licenses()
+        self._rebuild_indexes()
+        atexit.register(self.flush)
         
+    def _rebuild_indexes(self):
+        self.license_version = getattr(self, "license_version", 0) + 1
+        self._email_index = {}
+        self._active_expiry = {}
+        self._latest_expiry = 0.0
+        for license_data in self.local_licenses.values():
+            self._index_license(license_data)
+    
+    def _index_license(self, license_data):
+        license_key = license_data["license_key"]
+        self.license_version += 1
+        self._email_index.setdefault(license_data["email"], set()).add(license_key)
+        if license_data.get("is_active", False):
+            expires_at = datetime.fromisoformat(license_data["expires_at"]).timestamp()
+            previous = self._active_expiry.get(license_key)
+            self._active_expiry[license_key] = expires_at
+            if previous is not None and previous >= self._latest_expiry and expires_at < previous:
+                # Üst sınırı belirleyen lisans daha erken biten biriyle değiştirildi
+                self._latest_expiry = max(self._active_expiry.values(), default=0.0)
+            else:
+                self._latest_expiry = max(self._latest_expiry, expires_at)
+        else:
+            self._unindex_active(license_key)
+    
+    def _unindex_active(self, license_key):
+        expires_at = self._active_expiry.pop(license_key, None)
+        if expires_at is not None:
+            self.license_version += 1
+        if expires_at is not None and expires_at >= self._latest_expiry:
+            # En geç biten lisans kapandıysa üst sınır yeniden hesaplanır
+            self._latest_expiry = max(self._active_expiry.values(), default=0.0)
+    
     def _load_local_licenses(self):
+        licenses = {}
         if os.path.exists(self.licenses_file):
             try:
-                with open(self.licenses_file, 'r') as f:
-                    return json.load(f)
+                licenses = serialization.load_file(self.licenses_file)
             except:
-                return {}
-        return {}
+                # Bozuk dosya bir sonraki kayıtta ezilmesin diye kenara alınır
+                print(f"Lisans dosyası okunamadı, {self.licenses_file}.corrupt olarak saklandı")
+                os.replace(self.licenses_file, self.licenses_file + ".corrupt")
+                licenses = {}
+        
+        for (kind, license_key), fields in self.usage_journal.replay().items():
+            if kind == "license" and license_key in licenses:
+                licenses[license_key].update(fields)
+                self._journal_records += 1
+        return licenses
     
     def _save_local_licenses(self):
-        with open(self.licenses_file, 'w') as f:
-            json.dump(self.local_licenses, f, indent=2)
+        # Yazmalar kısa bir süre boyunca birleştirilir, diske flush() ile yazılır
+        self._dirty = True
+        with self._save_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DEBOUNCE, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def flush(self):
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return False
+            self._dirty = False
+            
+            sealed = self.usage_journal.seal()
+            snapshot = {key: dict(value) for key, value in list(self.local_licenses.items())}
+            self._write_atomic(self.licenses_file, serialization.encode(snapshot, self.storage_format))
+            if sealed:
+                self.usage_journal.discard(sealed)
+            self._journal_records = 0
+            return True
+    
+    def _write_atomic(self, path, payload):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def _record_usage(self, license_key, license_data):
+        self.usage_journal.append("license", license_key, license_data["usage_count"], license_data["last_used"])
+        self.usage_journal.flush()
+        self._journal_records += 1
+        if self._journal_records >= JOURNAL_COMPACT_RECORDS:
+            self._save_local_licenses()
     
     def _generate_license_key(self, email, license_type="pro"):
         timestamp = datetime.now().isoformat()
@@ -49,6 +163,7 @@ class LicenseManager:
         }
         
         self.local_licenses[license_key] = license_data
+        self._index_license(license_data)
         self._save_local_licenses()
         
         return license_data
@@ -65,33 +180,31 @@ class LicenseManager:
         if license_data["email"] != email:
             return False, "E-posta adresi uyuşmuyor"
         
-        expires_at = datetime.fromisoformat(license_data["expires_at"])
-        if datetime.now() > expires_at:
+        expires_at = self._active_expiry.get(license_key)
+        if expires_at is None:
+            expires_at = datetime.fromisoformat(license_data["expires_at"]).timestamp()
+        if time.time() > expires_at:
             return False, "Lisans süresi dolmuş"
         
         license_data["usage_count"] = license_data.get("usage_count", 0) + 1
         license_data["last_used"] = datetime.now().isoformat()
-        self.local_licenses[license_key] = license_data
-        self._save_local_licenses()
+        self._record_usage(license_key, license_data)
         
         return True, "Lisans doğrulandı"
     
     def generate_online_license(self, email, name, license_type="pro"):
         try:
-            response = requests.post(
-                f"{self.api_base_url}/generate-license",
-                json={
-                    "email": email,
-                    "name": name,
-                    "license_type": license_type
-                },
-                timeout=10
-            )
+            response = self.api_client.post("/generate-license", {
+                "email": email,
+                "name": name,
+                "license_type": license_type
+            }, retry=False)
             
             if response.status_code == 200:
                 data = response.json()
                 license_data = data.get("license_data")
                 self.local_licenses[license_data["license_key"]] = license_data
+                self._index_license(license_data)
                 self._save_local_licenses()
                 return license_data
             else:
@@ -100,24 +213,122 @@ class LicenseManager:
             print(f"Online lisans oluşturma hatası: {e}")
             return None
     
+    def _grace_until(self, entry):
+        # Çevrimdışı süre yalnızca sunucunun imzaladığı lisans jetonuyla tanınır; jeton lisans
+        # bitişini, anahtarı ve e-postayı taşır, yerel dosya düzenlenerek uzatılamaz
+        if self.token_verifier is None or not entry.get("license_token"):
+            return None
+        is_valid, _, claims = self.token_verifier.verify(entry["license_token"], entry["email"])
+        if not is_valid or claims["kid"] != entry["license_key"]:
+            return None
+        return min(entry["verified_at"] + OFFLINE_GRACE_PERIOD, claims["exp"])
+    
+    def _load_verifications(self):
+        if self._verifications is not None:
+            return self._verifications
+        self._verifications = {}
+        if os.path.exists(self.verification_cache_file):
+            try:
+                with open(self.verification_cache_file, 'r') as f:
+                    entries = json.load(f)
+            except:
+                entries = []
+            for entry in entries:
+                # Jetonu doğrulanamayan kayıtlar (elle düzenlenmiş ya da eski biçim) yok sayılır
+                try:
+                    grace_until = self._grace_until(entry)
+                except (KeyError, TypeError, AttributeError):
+                    grace_until = None
+                if grace_until is not None:
+                    entry["grace_until"] = grace_until
+                    self._verifications[(entry["license_key"], entry["email"])] = entry
+        return self._verifications
+    
+    def _save_verifications(self):
+        entries = [{key: entry[key] for key in ("license_key", "email", "verified_at", "license_token")}
+                   for entry in self._verifications.values() if entry.get("license_token")]
+        self._write_atomic(self.verification_cache_file, json.dumps(entries, separators=(",", ":")).encode())
+    
+    def _cache_verification(self, license_key, email, expires_at=None, license_token=None):
+        entry = {
+            "license_key": license_key,
+            "email": email,
+            "verified_at": time.time(),
+            "license_token": license_token
+        }
+        # Jetonsuz doğrulamalar diske yazılmaz; yalnızca bellekte, TTL ve lisans bitişi içinde geçerlidir
+        grace_until = self._grace_until(entry)
+        if grace_until is None:
+            grace_until = 0.0
+            entry["expires_at"] = datetime.fromisoformat(expires_at).timestamp() if expires_at else None
+        entry["grace_until"] = grace_until
+        self._load_verifications()[(license_key, email)] = entry
+        if grace_until:
+            self._save_verifications()
+    
+    def _forget_verification(self, license_key, email):
+        if self._load_verifications().pop((license_key, email), None) is not None:
+            self._save_verifications()
+    
     def verify_online_license(self, license_key, email):
+        cached = self._load_verifications().get((license_key, email))
+        now = time.time()
+        if cached and now - cached["verified_at"] < VERIFY_CACHE_TTL and now < (cached.get("expires_at") or cached["grace_until"]):
+            return True, "Lisans doğrulandı"
+        
         try:
-            response = requests.post(
-                f"{self.api_base_url}/verify-license",
-                json={
-                    "license_key": license_key,
-                    "email": email
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return True, "Lisans doğrulandı"
-            else:
-                return False, "Lisans doğrulanamadı"
+            response = self.api_client.post("/verify-license", {
+                "license_key": license_key,
+                "email": email
+            })
         except Exception as e:
             print(f"Online lisans doğrulama hatası: {e}")
-            return False, "Bağlantı hatası"
+            response = None
+        
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            self._cache_verification(license_key, email, data.get("expires_at"), data.get("license_token"))
+            return True, "Lisans doğrulandı"
+        if response is not None and response.status_code in (403, 404):
+            self._forget_verification(license_key, email)
+            return False, "Lisans doğrulanamadı"
+        
+        if cached and now < cached["grace_until"]:
+            return True, "Lisans doğrulandı (çevrimdışı)"
+        if response is not None:
+            return False, "Lisans doğrulanamadı"
+        return False, "Bağlantı hatası"
+    
+    def set_public_key(self, public_key):
+        if isinstance(public_key, str):
+            public_key = load_public_key(public_key)
+        self.token_verifier = LicenseTokenVerifier(public_key, self.revocations)
+    
+    def refresh_revocations(self, force=False):
+        if not force and time.time() - self._revocations_checked_at < REVOCATION_REFRESH_INTERVAL:
+            return False
+        self._revocations_checked_at = time.time()
+        try:
+            response = self.api_client.get("/revocations", {"since": self.revocations.version})
+            if response.status_code != 200:
+                return False
+            data = response.json()
+            if data.get("changed", True):
+                self.revocations.replace(data["revoked"], data["version"])
+            else:
+                self.revocations.refreshed_at = time.time()
+            return True
+        except Exception as e:
+            print(f"İptal listesi güncelleme hatası: {e}")
+            return False
+    
+    def verify_license_token(self, license_token, email=None):
+        if self.token_verifier is None:
+            return False, "İmzalı lisans doğrulaması için açık anahtar gerekli"
+        
+        self.refresh_revocations()
+        is_valid, message, _ = self.token_verifier.verify(license_token, email)
+        return is_valid, message
     
     def load_license_file(self, file_path):
         try:
@@ -125,7 +336,11 @@ class LicenseManager:
                 license_data = json.load(f)
             
             if self.validate_license_data(license_data):
+                previous = self.local_licenses.get(license_data["license_key"])
+                if previous is not None and previous["email"] != license_data["email"]:
+                    self._email_index.get(previous["email"], set()).discard(license_data["license_key"])
                 self.local_licenses[license_data["license_key"]] = license_data
+                self._index_license(license_data)
                 self._save_local_licenses()
                 return True, "Lisans dosyası yüklendi"
             else:
@@ -138,20 +353,25 @@ class LicenseManager:
         return all(field in license_data for field in required_fields)
     
     def is_pro_license_active(self, email=None):
+        now = time.time()
         if email:
-            for license_key, license_data in self.local_licenses.items():
-                if license_data["email"] == email and license_data.get("is_active", False):
-                    expires_at = datetime.fromisoformat(license_data["expires_at"])
-                    if datetime.now() <= expires_at:
-                        return True
+            for license_key in self._email_index.get(email, ()):
+                expires_at = self._active_expiry.get(license_key)
+                if expires_at is not None and now <= expires_at:
+                    return True
             return False
         else:
-            for license_data in self.local_licenses.values():
-                if license_data.get("is_active", False):
-                    expires_at = datetime.fromisoformat(license_data["expires_at"])
-                    if datetime.now() <= expires_at:
-                        return True
-            return False
+            return now <= self._latest_expiry
+    
+    def next_expiry(self, email=None, now=None):
+        # Lisans durumunun kendiliğinden değişebileceği en erken an
+        now = time.time() if now is None else now
+        if email:
+            candidates = (self._active_expiry.get(license_key) for license_key in self._email_index.get(email, ()))
+        else:
+            candidates = self._active_expiry.values()
+        return min((expires_at for expires_at in candidates if expires_at is not None and expires_at >= now),
+                   default=float('inf'))
     
     def get_license_info(self, license_key):
         if license_key in self.local_licenses:
@@ -164,6 +384,7 @@ class LicenseManager:
     def revoke_license(self, license_key):
         if license_key in self.local_licenses:
             self.local_licenses[license_key]["is_active"] = False
+            self._unindex_active(license_key)
             self._save_local_licenses()
             return True
         return False
@@ -194,32 +415,54 @@ class LicenseManager:
 class ProFeatures:
     def __init__(self, license_manager):
         self.license_manager = license_manager
+        self._snapshots = {}
     
-    def check_pdf_limit(self, file_count, email=None):
+    def _snapshot(self, email=None):
+        # Limitler lisans kümesi değişene ya da ilk aktif lisansın süresi dolana kadar yeniden hesaplanmaz
+        now = time.time()
+        snapshot = self._snapshots.get(email)
+        if (snapshot is not None and snapshot["version"] == self.license_manager.license_version
+                and now <= snapshot["valid_until"]):
+            return snapshot
         limits = self.license_manager.check_license_limits(email)
+        is_pro = limits["pro_features"]
+        snapshot = {
+            "version": self.license_manager.license_version,
+            "valid_until": self.license_manager.next_expiry(email, now),
+            "limits": limits,
+            "features": {
+                "is_pro": is_pro,
+                "can_use_batch": is_pro,
+                "can_use_unlimited_pdf": is_pro,
+                "can_use_unlimited_images": is_pro,
+                "has_watermark_feature": is_pro,
+                "has_compression_feature": is_pro
+            }
+        }
+        self._snapshots[email] = snapshot
+        return snapshot
+    
+    def get_limits(self, email=None):
+        snapshot = self._snapshot(email)
+        return {**snapshot["limits"], **snapshot["features"]}
+    
+    def check_pdf_limit(self, file_count, email=None):
+        limits = self._snapshot(email)["limits"]
         if not limits["pro_features"] and file_count > limits["pdf_limit"]:
             return False, f"Free versiyonda en fazla {limits['pdf_limit']} PDF işleyebilirsiniz"
         return True, "OK"
     
     def check_batch_limit(self, item_count, email=None):
-        limits = self.license_manager.check_license_limits(email)
+        limits = self._snapshot(email)["limits"]
         if not limits["pro_features"] and item_count > limits["batch_limit"]:
             return False, f"Free versiyonda en fazla {limits['batch_limit']} dosya işleyebilirsiniz"
         return True, "OK"
     
     def check_image_limit(self, image_count, email=None):
-        limits = self.license_manager.check_license_limits(email)
+        limits = self._snapshot(email)["limits"]
         if not limits["pro_features"] and image_count > limits["image_limit"]:
             return False, f"Free versiyonda en fazla {limits['image_limit']} görsel işleyebilirsiniz"
         return True, "OK"
     
     def get_feature_status(self, email=None):
-        is_pro = self.license_manager.is_pro_license_active(email)
-        return {
-            "is_pro": is_pro,
-            "can_use_batch": is_pro,
-            "can_use_unlimited_pdf": is_pro,
-            "can_use_unlimited_images": is_pro,
-            "has_watermark_feature": is_pro,
-            "has_compression_feature": is_pro
-        }
\ No newline at end of file
+        return dict(self._snapshot(email)["features"])
\ No newline at end of file
@@ -0,0 +1,124 @@
+import base64
+import bisect
+import json
+import time
+from datetime import datetime
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+
+TOKEN_PREFIX = "TBX1"
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def load_private_key(value):
+    if value.strip().startswith("-----BEGIN"):
+        return serialization.load_pem_private_key(value.encode(), password=None)
+    return Ed25519PrivateKey.from_private_bytes(_b64decode(value.strip()))
+
+
+def load_public_key(value):
+    if value.strip().startswith("-----BEGIN"):
+        return serialization.load_pem_public_key(value.encode())
+    return Ed25519PublicKey.from_public_bytes(_b64decode(value.strip()))
+
+
+def export_public_key(public_key):
+    raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    return _b64encode(raw)
+
+
+def generate_signing_key():
+    private_key = Ed25519PrivateKey.generate()
+    raw = private_key.private_bytes(serialization.Encoding.Raw, serialization.PrivateFormat.Raw,
+                                    serialization.NoEncryption())
+    return _b64encode(raw), export_public_key(private_key.public_key())
+
+
+class RevocationList:
+    def __init__(self, key_ids=(), version=0):
+        self.version = version
+        self.refreshed_at = 0.0
+        self._key_ids = sorted(set(key_ids))
+
+    def __len__(self):
+        return len(self._key_ids)
+
+    def is_revoked(self, key_id):
+        index = bisect.bisect_left(self._key_ids, key_id)
+        return index < len(self._key_ids) and self._key_ids[index] == key_id
+
+    def add(self, key_id):
+        index = bisect.bisect_left(self._key_ids, key_id)
+        if index < len(self._key_ids) and self._key_ids[index] == key_id:
+            return False
+        self._key_ids.insert(index, key_id)
+        self.version += 1
+        return True
+
+    def replace(self, key_ids, version):
+        self._key_ids = sorted(set(key_ids))
+        self.version = version
+        self.refreshed_at = time.time()
+
+    def to_dict(self):
+        return {"version": self.version, "revoked": list(self._key_ids)}
+
+
+class LicenseTokenSigner:
+    def __init__(self, private_key):
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+
+    def sign(self, key_id, email, license_type, expires_at):
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at).timestamp()
+        claims = {"kid": key_id, "email": email, "type": license_type, "exp": int(expires_at)}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":"), sort_keys=True).encode())
+        signing_input = f"{TOKEN_PREFIX}.{payload}".encode()
+        signature = _b64encode(self.private_key.sign(signing_input))
+        return f"{TOKEN_PREFIX}.{payload}.{signature}"
+
+
+class LicenseTokenVerifier:
+    def __init__(self, public_key, revocations=None):
+        self.public_key = public_key
+        self.revocations = revocations if revocations is not None else RevocationList()
+
+    def decode(self, token):
+        try:
+            prefix, payload, signature = token.split(".")
+        except ValueError:
+            return None
+        if prefix != TOKEN_PREFIX:
+            return None
+        try:
+            self.public_key.verify(_b64decode(signature), f"{prefix}.{payload}".encode())
+            return json.loads(_b64decode(payload))
+        except (InvalidSignature, ValueError):
+            return None
+
+    def verify(self, token, email=None):
+        claims = self.decode(token)
+        if claims is None:
+            return False, "Geçersiz lisans imzası", None
+        if email is not None and claims["email"] != email:
+            return False, "E-posta adresi uyuşmuyor", claims
+        if time.time() > claims["exp"]:
+            return False, "Lisans süresi dolmuş", claims
+        if self.revocations.is_revoked(claims["kid"]):
+            return False, "Lisans aktif değil", claims
+        return True, "Lisans doğrulandı", claims
+
+
+if __name__ == "__main__":
+    private_key, public_key = generate_signing_key()
+    print(f"TOOLBOX_SIGNING_KEY={private_key}")
+    print(f"TOOLBOX_PUBLIC_KEY={public_key}")
@@ -0,0 +1,85 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# İkili dosyalar 4 baytlık bir başlıkla işaretlenir; okurken biçim otomatik anlaşılır
+BINARY_MSGPACK = b"TBX\x01"
+FORMATS = ("json", "compact", "binary")
+
+
+def backend():
+    if orjson is not None:
+        return "orjson"
+    if msgspec is not None:
+        return "msgspec"
+    return "json"
+
+
+def dumps(obj, indent=False):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if msgspec is not None and not indent:
+        return msgspec.json.encode(obj)
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def check_format(format):
+    if format not in FORMATS:
+        raise ValueError(f"Bilinmeyen kayıt biçimi: {format}")
+    # İkili biçim yalnızca MessagePack'tir; sürümler arası taşınabilir olmayan marshal kullanılmaz
+    if format == "binary" and msgspec is None:
+        raise ValueError("İkili kayıt biçimi için msgspec kurulu olmalı")
+
+
+def pack(obj):
+    check_format("binary")
+    return BINARY_MSGPACK + msgspec.msgpack.encode(obj)
+
+
+def unpack(data):
+    header, body = data[:4], data[4:]
+    if header == BINARY_MSGPACK:
+        if msgspec is None:
+            raise ValueError("Bu dosyayı okumak için msgspec kurulu olmalı")
+        return msgspec.msgpack.decode(body)
+    raise ValueError("Bilinmeyen ikili dosya biçimi")
+
+
+def encode(obj, format="json"):
+    if format == "binary":
+        return pack(obj)
+    return dumps(obj, indent=format == "json")
+
+
+def decode(data):
+    if data[:3] == BINARY_MSGPACK[:3]:
+        return unpack(data)
+    return loads(data)
+
+
+def load_file(path):
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+
+def save_file(path, obj, format="json"):
+    with open(path, 'wb') as f:
+        f.write(encode(obj, format))
@@ -0,0 +1,98 @@
+import os
+import threading
+from components import serialization
+
+
+class UsageJournal:
+    def __init__(self, path):
+        self.path = path
+        self.sealed_path = path + ".compacting"
+        self._lock = threading.Lock()
+        self._pending = []
+        self._file = None
+
+    def append(self, kind, key, usage_count, last_used=None):
+        record = {"s": kind, "k": key, "u": usage_count}
+        if last_used is not None:
+            record["t"] = last_used
+        line = serialization.dumps(record) + b"\n"
+        with self._lock:
+            self._pending.append(line)
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def flush(self, fsync=True):
+        with self._lock:
+            self._write_pending(fsync)
+
+    def _write_pending(self, fsync):
+        if not self._pending:
+            return
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        lines, self._pending = self._pending, []
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def seal(self):
+        with self._lock:
+            self._write_pending(True)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path) and not os.path.exists(self.sealed_path):
+                os.replace(self.path, self.sealed_path)
+        return self.sealed_path if os.path.exists(self.sealed_path) else None
+
+    def read(self, path):
+        records = {}
+        if not os.path.exists(path):
+            return records
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    record = serialization.loads(line)
+                except Exception:
+                    # Çökme anında yarım kalmış son satır
+                    continue
+                fields = {"usage_count": record["u"]}
+                if "t" in record:
+                    fields["last_used"] = record["t"]
+                records[(record["s"], record["k"])] = fields
+        return records
+
+    def replay(self):
+        records = self.read(self.sealed_path)
+        with self._lock:
+            self._write_pending(True)
+            records.update(self.read(self.path))
+        return records
+
+    def discard(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def reset(self):
+        with self._lock:
+            self._pending = []
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.discard(self.path)
+            self.discard(self.sealed_path)
+
+    def close(self):
+        with self._lock:
+            self._write_pending(True)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
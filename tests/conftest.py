@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Bileşenler dosyalarını çalışma klasörüne göre yazar; her test kendi klasöründe çalışır
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def api_client(workdir):
+    # Uygulama modül düzeyinde tek örnektir; her test boş bir mağaza ve önbellekle başlar
+    from fastapi.testclient import TestClient
+    from api import main
+
+    main.verification_cache.clear()
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def store(request, tmp_path):
+    from api.storage import JSONStore, SQLiteStore
+
+    if request.param == "sqlite":
+        store = SQLiteStore(str(tmp_path / "toolbox.db"))
+    else:
+        store = JSONStore(*(str(tmp_path / name) for name in ("l.json", "k.json", "q.json", "r.json")))
+    yield store
+    store.close()
@@ -0,0 +1,298 @@
+import hashlib
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from api import main
+from test_pdf_tools import make_pdf
+
+
+def test_verify_misses_are_not_cached(api_client):
+    for number in range(5):
+        response = api_client.post("/verify-license", json={"license_key": f"MISSING{number}", "email": "a@b.c"})
+        assert response.status_code == 404
+        assert api_client.post("/verify-api-key", json={"api_key": f"missing{number}"}).status_code == 404
+    assert main.verification_cache.stats()["entries"] == 0
+
+
+def test_verify_hits_are_cached_until_revoked(api_client):
+    created = api_client.post("/generate-license", json={"email": "a@example.com", "name": "A"}).json()
+    key = created["license_key"]
+    body = {"license_key": key, "email": "a@example.com"}
+    assert api_client.post("/verify-license", json=body).status_code == 200
+    assert api_client.post("/verify-license", json=body).status_code == 200
+    assert main.verification_cache.stats()["entries"] == 1
+
+    assert api_client.post("/revoke-license", params={"license_key": key}).status_code == 200
+    assert main.verification_cache.stats()["entries"] == 0
+    assert api_client.post("/verify-license", json=body).status_code == 403
+
+
+def run_job(api_client, api_key, operation, files, params=None):
+    response = api_client.post("/jobs", headers={"X-API-Key": api_key},
+                               data={"operation": operation, "params": json.dumps(params or {})},
+                               files=[("files", file) for file in files])
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+    for _ in range(300):
+        status = api_client.get(f"/jobs/{job_id}", headers={"X-API-Key": api_key}).json()
+        if status["status"] in ("completed", "failed", "cancelled"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError("İş zamanında bitmedi")
+
+
+def test_job_result_supports_range_requests(api_client, tmp_path):
+    api_key = api_client.post("/generate-api-key", json={"service": "test"}).json()["api_key"]
+    pdfs = [("a.pdf", open(make_pdf(tmp_path / "a.pdf", 2), "rb").read(), "application/pdf"),
+            ("b.pdf", open(make_pdf(tmp_path / "b.pdf", 3), "rb").read(), "application/pdf")]
+    status = run_job(api_client, api_key, "pdf.merge", pdfs)
+    assert status["status"] == "completed", status
+    assert [upload["sha256"] for upload in status["inputs"]] == [hashlib.sha256(data).hexdigest()
+                                                               for _, data, _ in pdfs]
+
+    url = f"/jobs/{status['job_id']}/result"
+    headers = {"X-API-Key": api_key}
+    full = api_client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.headers["accept-ranges"] == "bytes"
+    size = len(full.content)
+
+    head = api_client.get(url, headers={**headers, "Range": "bytes=0-99"})
+    assert head.status_code == 206
+    assert head.headers["content-range"] == f"bytes 0-99/{size}"
+    tail = api_client.get(url, headers={**headers, "Range": "bytes=100-"})
+    assert tail.status_code == 206
+    assert head.content + tail.content == full.content
+
+    unsatisfiable = api_client.get(url, headers={**headers, "Range": f"bytes={size + 10}-"})
+    assert unsatisfiable.status_code == 416
+    assert api_client.get(url, headers={"X-API-Key": "baska"}).status_code == 404
+
+
+def generate_licenses(api_client, count):
+    items = [{"email": f"user{number}@example.com", "name": f"U{number}"} for number in range(count)]
+    response = api_client.post("/generate-license/batch", json=items)
+    assert response.status_code == 200, response.text
+    return [result["license_key"] for result in response.json()["results"]]
+
+
+def test_oversized_batches_are_rejected(api_client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_BATCH_SIZE", 3)
+    items = [{"email": f"user{number}@example.com", "name": "U"} for number in range(4)]
+    assert api_client.post("/generate-license/batch", json=items).status_code == 413
+    assert main.repository.licenses == {}
+    verify = [{"license_key": f"K{number}", "email": "a@b.c"} for number in range(4)]
+    assert api_client.post("/verify-license/batch", json=verify).status_code == 413
+    assert api_client.post("/verify-api-key/batch", json=[{"api_key": "x"}] * 4).status_code == 413
+    revoke = {"license_keys": ["A", "B"], "api_keys": ["C", "D"]}
+    assert api_client.post("/revoke/batch", json=revoke).status_code == 413
+    assert len(generate_licenses(api_client, 3)) == 3
+
+
+def test_batch_results_follow_input_order(api_client):
+    first, second = generate_licenses(api_client, 2)
+    items = [{"license_key": second, "email": "user1@example.com"},
+             {"license_key": "MISSING", "email": "user0@example.com"},
+             {"license_key": first, "email": "wrong@example.com"},
+             {"license_key": first, "email": "user0@example.com"}]
+    body = api_client.post("/verify-license/batch", json=items).json()
+    assert [result["license_key"] for result in body["results"]] == [second, "MISSING", first, first]
+    assert [result.get("status_code", 200) for result in body["results"]] == [200, 404, 403, 200]
+    assert body["verified"] == 2
+
+    api_key = api_client.post("/generate-api-key", json={"service": "test"}).json()["api_key"]
+    body = api_client.post("/verify-api-key/batch", json=[{"api_key": "missing"}, {"api_key": api_key}]).json()
+    assert [(result["api_key"], result["success"]) for result in body["results"]] == [("missing", False),
+                                                                                      (api_key, True)]
+
+
+def test_revoke_batch_invalidates_cached_verifications(api_client):
+    first, second = generate_licenses(api_client, 2)
+    api_key = api_client.post("/generate-api-key", json={"service": "test"}).json()["api_key"]
+    assert api_client.post("/verify-license", json={"license_key": first, "email": "user0@example.com"}).status_code == 200
+    assert api_client.post("/verify-license", json={"license_key": second, "email": "user1@example.com"}).status_code == 200
+    assert api_client.post("/verify-api-key", json={"api_key": api_key}).status_code == 200
+    assert main.verification_cache.stats()["entries"] == 3
+
+    body = api_client.post("/revoke/batch", json={"license_keys": [first, "MISSING"], "api_keys": [api_key]}).json()
+    assert [result["success"] for result in body["licenses"]] == [True, False]
+    assert [result["success"] for result in body["api_keys"]] == [True]
+    assert main.verification_cache.stats()["entries"] == 1
+    assert api_client.post("/verify-license", json={"license_key": first, "email": "user0@example.com"}).status_code == 403
+    assert api_client.post("/verify-api-key", json={"api_key": api_key}).status_code == 403
+    assert api_client.post("/verify-license", json={"license_key": second, "email": "user1@example.com"}).status_code == 200
+
+
+def test_batch_writes_are_committed_together(api_client, monkeypatch):
+    store = main.repository.store
+    batches = []
+    original = store.apply_batch
+
+    def recording_apply_batch(ops):
+        batches.append([op[0] for op in ops])
+        return original(ops)
+
+    monkeypatch.setattr(store, "apply_batch", recording_apply_batch)
+    keys = generate_licenses(api_client, 5)
+    assert [ops for ops in batches if "put_license" in ops] == [["put_license"] * 5]
+    assert sorted(lic["license_key"] for lic in store.iter_licenses()) == sorted(keys)
+
+    batches.clear()
+    api_client.post("/revoke/batch", json={"license_keys": keys[:3]})
+    assert [ops for ops in batches if "update_license" in ops] == [["update_license"] * 3]
+
+    def failing_apply_batch(ops):
+        # Son işlem bozuk; SQLite işlemi geri alınmalı
+        return original(ops + [("put_license", {})])
+
+    monkeypatch.setattr(store, "apply_batch", failing_apply_batch)
+    with pytest.raises(Exception):
+        generate_licenses(api_client, 4)
+    assert len(list(store.iter_licenses())) == 5
+
+
+def set_expiry(api_client, license_key, seconds, **fields):
+    expires_at = datetime.fromtimestamp(time.time() + seconds).isoformat()
+
+    async def update():
+        await main.repository.update_license(license_key, expires_at=expires_at, **fields)
+
+    api_client.portal.call(update)
+
+
+def test_sweeper_deactivates_expired_licenses(api_client, monkeypatch):
+    keys = generate_licenses(api_client, 3)
+    for number, key in enumerate(keys):
+        body = {"license_key": key, "email": f"user{number}@example.com"}
+        assert api_client.post("/verify-license", json=body).status_code == 200
+    assert main.verification_cache.stats()["entries"] == 3
+    set_expiry(api_client, keys[0], -10)
+    set_expiry(api_client, keys[1], -5)
+
+    monkeypatch.setattr(main, "EXPIRY_SWEEP_BATCH", 1)
+    assert api_client.portal.call(main.expire_licenses) == 2
+    assert [main.repository.get_license(key)["is_active"] for key in keys] == [False, False, True]
+    assert main.verification_cache.stats()["entries"] == 1
+    stored = {lic["license_key"]: lic["is_active"] for lic in main.repository.store.iter_licenses()}
+    assert [bool(stored[key]) for key in keys] == [False, False, True]
+    body = {"license_key": keys[0], "email": "user0@example.com"}
+    assert api_client.post("/verify-license", json=body).json()["detail"] == "Lisans süresi dolmuş"
+    assert api_client.portal.call(main.expire_licenses) == 0
+
+
+def test_expiring_licenses_are_listed_in_order(api_client):
+    keys = generate_licenses(api_client, 4)
+    set_expiry(api_client, keys[0], 3 * 86400)
+    set_expiry(api_client, keys[1], 86400)
+    set_expiry(api_client, keys[2], 2 * 86400, is_active=False)
+
+    body = api_client.get("/licenses/expiring", params={"within": 5}).json()
+    assert [lic["license_key"] for lic in body["licenses"]] == [keys[1], keys[0]]
+    body = api_client.get("/licenses/expiring", params={"within": 5, "limit": 1}).json()
+    assert [lic["license_key"] for lic in body["licenses"]] == [keys[1]]
+    assert api_client.get("/licenses/expiring", params={"within": 400}).json()["count"] == 3
+    assert api_client.get("/licenses/expiring", params={"limit": 0}).status_code == 400
+    assert api_client.get("/licenses/expiring", params={"within": -1}).status_code == 400
+
+
+def recount_stats():
+    # Toplayıcıdan bağımsız tam sayım
+    def count(items, group):
+        totals = {"total": 0, "active": 0, "inactive": 0}
+        usage = 0
+        groups = {}
+        for item in items:
+            state = "active" if item.get("is_active") else "inactive"
+            totals["total"] += 1
+            totals[state] += 1
+            usage += item.get("usage_count", 0)
+            bucket = groups.setdefault(item[group], {"total": 0, "active": 0, "inactive": 0, "usage": 0})
+            bucket["total"] += 1
+            bucket[state] += 1
+            bucket["usage"] += item.get("usage_count", 0)
+        return totals, usage, groups
+
+    licenses, license_usage, license_types = count(main.repository.licenses.values(), "license_type")
+    api_keys, api_usage, services = count(main.repository.api_keys.values(), "service")
+    return {"licenses": licenses, "api_keys": api_keys,
+            "usage": {"total_license_usage": license_usage, "total_api_usage": api_usage},
+            "license_types": license_types, "services": services}
+
+
+def current_stats(api_client):
+    stats = api_client.get("/stats").json()
+    stats.pop("timestamp")
+    return stats
+
+
+def test_stats_match_full_recount(api_client):
+    keys = generate_licenses(api_client, 3)
+    api_client.post("/generate-license", json={"email": "t@example.com", "name": "T", "license_type": "trial"})
+    api_keys = [api_client.post("/generate-api-key", json={"service": service}).json()["api_key"]
+                for service in ("ocr", "ocr", "pdf")]
+    for number, key in enumerate(keys[:2]):
+        api_client.post("/verify-license", json={"license_key": key, "email": f"user{number}@example.com"})
+    api_client.post("/verify-api-key", json={"api_key": api_keys[0]})
+    api_client.post("/verify-api-key/batch", json=[{"api_key": api_keys[0]}, {"api_key": api_keys[2]}])
+    assert current_stats(api_client) == recount_stats()
+    assert current_stats(api_client)["usage"] == {"total_license_usage": 2, "total_api_usage": 3}
+
+    api_client.post("/revoke/batch", json={"license_keys": [keys[0]], "api_keys": [api_keys[1]]})
+    assert current_stats(api_client) == recount_stats()
+
+    set_expiry(api_client, keys[1], -1)
+    api_client.portal.call(main.expire_licenses)
+    stats = current_stats(api_client)
+    assert stats == recount_stats()
+    assert stats["licenses"] == {"total": 4, "active": 2, "inactive": 2}
+
+    # Aynı anahtarla değiştirme: tür ve aktiflik birlikte değişir
+    replaced = dict(main.repository.get_license(keys[0]), license_type="trial", is_active=True, usage_count=7)
+
+    async def replace():
+        await main.repository.put_license(replaced)
+
+    api_client.portal.call(replace)
+    stats = current_stats(api_client)
+    assert stats == recount_stats()
+    assert stats["license_types"]["trial"] == {"total": 2, "active": 2, "inactive": 0, "usage": 7}
+    assert stats["license_types"]["pro"] == {"total": 2, "active": 1, "inactive": 1, "usage": 1}
+
+
+def scrape(api_client):
+    samples = {}
+    for line in api_client.get("/metrics").text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_use_route_templates(api_client):
+    key = generate_licenses(api_client, 1)[0]
+    before = scrape(api_client)
+    for _ in range(2):
+        assert api_client.get(f"/license-info/{key}").status_code == 200
+    assert api_client.get("/license-info/MISSINGKEY").status_code == 404
+    assert api_client.get(f"/nope/{key}").status_code == 404
+    after = scrape(api_client)
+
+    assert not any(key in name or "MISSINGKEY" in name for name in after)
+    route = 'method="GET",route="/license-info/{license_key}"'
+    ok = f'toolbox_http_requests_total{{{route},status="200"}}'
+    missing = f'toolbox_http_requests_total{{{route},status="404"}}'
+    assert after[ok] - before.get(ok, 0) == 2
+    assert after[missing] - before.get(missing, 0) == 1
+    unmatched = 'toolbox_http_requests_total{method="GET",route="unmatched",status="404"}'
+    assert after[unmatched] - before.get(unmatched, 0) == 1
+
+    count = f"toolbox_http_request_duration_seconds_count{{{route}}}"
+    infinite = f'toolbox_http_request_duration_seconds_bucket{{{route},le="+Inf"}}'
+    assert after[count] - before.get(count, 0) == 3
+    assert after[infinite] - before.get(infinite, 0) == 3
+    buckets = [value for name, value in after.items()
+               if name.startswith(f"toolbox_http_request_duration_seconds_bucket{{{route},")]
+    assert buckets == sorted(buckets)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from api.expiry import ExpiryIndex
+
+
+def license_data(license_key, day, is_active=True):
+    return {"license_key": license_key, "expires_at": f"2030-01-{day:02d}T00:00:00", "is_active": is_active}
+
+
+def timestamp(day):
+    return datetime(2030, 1, day).timestamp()
+
+
+def test_index_orders_by_expiry_and_tracks_updates():
+    index = ExpiryIndex()
+    index.rebuild({
+        "A": license_data("A", 3),
+        "B": license_data("B", 2),
+        "C": license_data("C", 4, is_active=False),
+    })
+    assert len(index) == 2
+
+    index.update(license_data("C", 4))
+    index.update(license_data("A", 1))
+    assert index.expiring_between(timestamp(1), timestamp(31), 10) == ["A", "B", "C"]
+    assert index.expiring_between(timestamp(1), timestamp(31), 2) == ["A", "B"]
+    assert index.expiring_between(timestamp(2), timestamp(3), 10) == ["B"]
+
+    index.update(license_data("B", 2, is_active=False))
+    assert index.pop_expired(timestamp(31), 1) == ["A"]
+    assert index.pop_expired(timestamp(31), 10) == ["C"]
+    assert len(index) == 0
@@ -0,0 +1,102 @@
+import asyncio
+import os
+
+from api import jobs
+from api.jobs import JobManager, run_job
+
+
+def test_server_defaults_override_client_workers(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_pdf_to_jpg(self, pdf_file, output_dir, progress_callback=None, **params):
+        calls.append(params)
+
+    monkeypatch.setattr("tools.pdf_tools.PDFTools.pdf_to_jpg", fake_pdf_to_jpg)
+    source = tmp_path / "a.pdf"
+    source.write_bytes(b"%PDF-1.4")
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+
+    run_job(str(job_dir), "pdf.to_jpg", [str(source)], {"workers": 64, "dpi": 72})
+    assert calls == [{"workers": 1, "dpi": 72}]
+
+
+def test_start_removes_leftover_job_directories(tmp_path):
+    leftover = tmp_path / "jobs" / "deadbeef" / "input"
+    leftover.mkdir(parents=True)
+    manager = JobManager(root=str(tmp_path / "jobs"), workers=1)
+    manager.start()
+    try:
+        assert os.listdir(manager.root) == []
+    finally:
+        manager.shutdown()
+
+
+def test_prune_and_delete_run_on_loop(tmp_path):
+    manager = JobManager(root=str(tmp_path / "jobs"), workers=1, retention=10)
+    os.makedirs(manager.root)
+
+    async def scenario():
+        old = manager.create("hash.md5", {}, "owner")
+        old["finished_at"] = 100.0
+        fresh = manager.create("hash.md5", {}, "owner")
+        fresh["finished_at"] = 195.0
+        running = manager.create("hash.md5", {}, "owner")
+        running["future"] = asyncio.get_running_loop().create_future()
+        future = running["future"]
+
+        assert await manager.prune(now=200.0) == 1
+        assert set(manager.jobs) == {fresh["job_id"], running["job_id"]}
+        assert not os.path.exists(manager.job_dir(old))
+
+        await manager.delete(running)
+        assert future.cancelled()
+        assert set(manager.jobs) == {fresh["job_id"]}
+        assert not os.path.exists(manager.job_dir(running))
+
+    asyncio.run(scenario())
+
+
+def test_status_reads_progress_and_caches_finished_jobs(tmp_path):
+    manager = JobManager(root=str(tmp_path / "jobs"), workers=1)
+    os.makedirs(manager.root)
+
+    async def scenario():
+        job = manager.create("hash.md5", {}, "owner")
+        assert (await manager.status(job))["progress"] == {"done": 0, "total": None}
+
+        jobs._write_progress(manager.job_dir(job), 1, 3)
+        status = await manager.status(job)
+        assert status["status"] == "running"
+        assert status["progress"] == {"done": 1, "total": 3}
+
+        jobs._write_progress(manager.job_dir(job), 3, 3)
+        job["status"] = "completed"
+        job["finished_at"] = 1.0
+        assert (await manager.status(job))["progress"] == {"done": 3, "total": 3}
+        os.remove(os.path.join(manager.job_dir(job), "progress.json"))
+        assert (await manager.status(job))["progress"] == {"done": 3, "total": 3}
+
+    asyncio.run(scenario())
+
+
+def test_pdf_to_jpg_job_reports_page_progress(tmp_path, monkeypatch):
+    seen = []
+
+    def fake_pdf_to_jpg(self, pdf_file, output_dir, progress_callback=None, **params):
+        for done in range(1, 4):
+            progress_callback(done, 3)
+            seen.append(jobs.json.load(open(os.path.join(job_dir, "progress.json"))))
+
+    monkeypatch.setattr("tools.pdf_tools.PDFTools.pdf_to_jpg", fake_pdf_to_jpg)
+    inputs = []
+    for name in ("a.pdf", "b.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+        inputs.append(str(tmp_path / name))
+    job_dir = str(tmp_path / "job")
+    os.makedirs(job_dir)
+
+    run_job(job_dir, "pdf.to_jpg", inputs, {})
+    assert seen[0] == {"done": 0, "total": 2, "pages_done": 1, "pages_total": 3}
+    assert seen[3] == {"done": 1, "total": 2, "pages_done": 1, "pages_total": 3}
+    assert [state["pages_done"] for state in seen] == [1, 2, 3, 1, 2, 3]
@@ -0,0 +1,211 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from components.license_manager import LicenseManager
+from components.license_tokens import LicenseTokenSigner, generate_signing_key, load_private_key
+
+
+def write_license(path, license_key, email, days, is_active=True):
+    license_data = {
+        "license_key": license_key,
+        "email": email,
+        "name": "Test",
+        "license_type": "pro",
+        "created_at": datetime.now().isoformat(),
+        "expires_at": (datetime.now() + timedelta(days=days)).isoformat(),
+        "is_active": is_active
+    }
+    with open(path, 'w') as f:
+        json.dump(license_data, f)
+    return str(path)
+
+
+def test_replacing_active_license_with_expired_one_disables_pro(workdir):
+    manager = LicenseManager()
+    assert manager.load_license_file(write_license(workdir / "a.json", "KEY1", "a@example.com", 30))[0]
+    assert manager.is_pro_license_active()
+
+    assert manager.load_license_file(write_license(workdir / "b.json", "KEY1", "a@example.com", -1))[0]
+    assert not manager.is_pro_license_active()
+    assert not manager.is_pro_license_active("a@example.com")
+    manager.flush()
+
+
+def test_latest_expiry_falls_back_to_remaining_license(workdir):
+    manager = LicenseManager()
+    manager.load_license_file(write_license(workdir / "a.json", "KEY1", "a@example.com", 300))
+    manager.load_license_file(write_license(workdir / "b.json", "KEY2", "b@example.com", 10))
+
+    manager.load_license_file(write_license(workdir / "c.json", "KEY1", "a@example.com", -1))
+    assert manager.is_pro_license_active()
+    assert manager._latest_expiry == manager._active_expiry["KEY2"]
+
+    manager.revoke_license("KEY2")
+    assert not manager.is_pro_license_active()
+    manager.flush()
+
+
+def test_licenses_survive_reload(workdir):
+    manager = LicenseManager()
+    license_data = manager.generate_offline_license("a@example.com", "A")
+    manager.flush()
+
+    reloaded = LicenseManager()
+    assert reloaded.verify_offline_license(license_data["license_key"], "a@example.com")[0]
+    assert reloaded.is_pro_license_active("a@example.com")
+    reloaded.flush()
+
+
+def test_pro_snapshot_follows_replaced_license(workdir):
+    from components.license_manager import ProFeatures
+
+    manager = LicenseManager()
+    features = ProFeatures(manager)
+    manager.load_license_file(write_license(workdir / "a.json", "KEY1", "a@example.com", 30))
+    assert features.get_feature_status()["is_pro"]
+    assert features.check_pdf_limit(50)[0]
+
+    manager.load_license_file(write_license(workdir / "b.json", "KEY1", "a@example.com", -1))
+    assert not features.get_feature_status()["is_pro"]
+    assert not features.get_limits()["pro_features"]
+    assert not features.check_pdf_limit(50)[0]
+    manager.flush()
+
+
+def test_pro_snapshot_expires_with_license(workdir, monkeypatch):
+    import time
+    from components.license_manager import ProFeatures
+
+    manager = LicenseManager()
+    features = ProFeatures(manager)
+    manager.load_license_file(write_license(workdir / "a.json", "KEY1", "a@example.com", 1))
+    assert features.get_feature_status("a@example.com")["is_pro"]
+
+    later = time.time() + 2 * 86400
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert not features.get_feature_status("a@example.com")["is_pro"]
+    manager.flush()
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload or {}
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def signer(monkeypatch):
+    monkeypatch.setattr("components.api_client.time.sleep", lambda seconds: None)
+    private_key, public_key = generate_signing_key()
+    return LicenseTokenSigner(load_private_key(private_key)), public_key
+
+
+def verified(signer, license_key="KEY1", email="a@example.com", days=30, token=True):
+    expires_at = (datetime.now() + timedelta(days=days)).isoformat()
+    payload = {"success": True, "expires_at": expires_at, "license_type": "pro"}
+    if token:
+        payload["license_token"] = signer.sign(license_key, email, "pro", expires_at)
+    return FakeResponse(200, payload)
+
+
+def offline_manager(public_key):
+    return LicenseManager(public_key=public_key, session=FakeSession([OSError("offline")] * 4))
+
+
+def test_offline_grace_uses_server_token(workdir, signer):
+    token_signer, public_key = signer
+    manager = LicenseManager(public_key=public_key, session=FakeSession([verified(token_signer)]))
+    assert manager.verify_online_license("KEY1", "a@example.com") == (True, "Lisans doğrulandı")
+    manager.flush()
+    assert sorted(path.name for path in workdir.iterdir()) == ["license_cache.json"]
+
+    offline = offline_manager(public_key)
+    offline._load_verifications()[("KEY1", "a@example.com")]["verified_at"] -= 2 * 3600
+    assert offline.verify_online_license("KEY1", "a@example.com") == (True, "Lisans doğrulandı (çevrimdışı)")
+    offline.flush()
+
+
+def test_offline_grace_rejects_edited_cache(workdir, signer):
+    token_signer, public_key = signer
+    manager = LicenseManager(public_key=public_key, session=FakeSession([verified(token_signer)]))
+    manager.verify_online_license("KEY1", "a@example.com")
+    manager.flush()
+
+    entries = json.loads((workdir / "license_cache.json").read_text())
+    entries[0]["license_key"] = "KEY2"
+    entries.append(dict(entries[0], license_key="KEY3", license_token=entries[0]["license_token"][:-4] + "AAAA"))
+    (workdir / "license_cache.json").write_text(json.dumps(entries))
+
+    offline = offline_manager(public_key)
+    assert offline._load_verifications() == {}
+    assert offline.verify_online_license("KEY2", "a@example.com") == (False, "Bağlantı hatası")
+    offline.flush()
+
+
+def test_verification_without_token_is_not_persisted(workdir, signer):
+    token_signer, public_key = signer
+    manager = LicenseManager(public_key=public_key, session=FakeSession([verified(token_signer, token=False)]))
+    assert manager.verify_online_license("KEY1", "a@example.com")[0]
+    assert manager.verify_online_license("KEY1", "a@example.com")[0]
+    manager.flush()
+    assert not (workdir / "license_cache.json").exists()
+
+    offline = offline_manager(public_key)
+    assert offline.verify_online_license("KEY1", "a@example.com") == (False, "Bağlantı hatası")
+    offline.flush()
+
+
+def test_rejected_license_is_removed_from_cache(workdir, signer):
+    token_signer, public_key = signer
+    manager = LicenseManager(public_key=public_key,
+                             session=FakeSession([verified(token_signer), FakeResponse(403)]))
+    manager.verify_online_license("KEY1", "a@example.com")
+    manager._verifications[("KEY1", "a@example.com")]["verified_at"] -= 2 * 3600
+    assert manager.verify_online_license("KEY1", "a@example.com") == (False, "Lisans doğrulanamadı")
+    manager.flush()
+    assert json.loads((workdir / "license_cache.json").read_text()) == []
+
+
+def test_generate_is_not_reposted_after_timeout(workdir, signer):
+    import requests
+
+    session = FakeSession([requests.Timeout("read timeout"), FakeResponse(200)])
+    manager = LicenseManager(session=session)
+    assert manager.generate_online_license("a@example.com", "A") is None
+    assert len(session.calls) == 1
+
+    session = FakeSession([FakeResponse(504), FakeResponse(200)])
+    manager = LicenseManager(session=session)
+    assert manager.generate_online_license("a@example.com", "A") is None
+    assert len(session.calls) == 1
+    manager.flush()
+
+
+def test_verify_retries_transient_failures(workdir, signer):
+    import requests
+
+    token_signer, public_key = signer
+    session = FakeSession([requests.Timeout("read timeout"), FakeResponse(503), verified(token_signer)])
+    manager = LicenseManager(public_key=public_key, session=session)
+    assert manager.verify_online_license("KEY1", "a@example.com") == (True, "Lisans doğrulandı")
+    assert [method for method, _ in session.calls] == ["POST"] * 3
+    manager.flush()
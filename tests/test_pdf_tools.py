@@ -0,0 +1,338 @@
+import os
+from concurrent.futures import Future
+
+import fitz
+import pikepdf
+import pytest
+
+from tools import pdf_tools
+from tools.pdf_tools import MemorySink, PDFTools
+
+
+def make_pdf(path, page_count, prefix="Sayfa"):
+    doc = fitz.open()
+    for number in range(page_count):
+        page = doc.new_page(width=200, height=200)
+        page.insert_text((20, 40), f"{prefix} {number + 1}", fontsize=12)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class RecordingFuture(Future):
+    def __init__(self, executor):
+        super().__init__()
+        self.executor = executor
+
+    def result(self, timeout=None):
+        self.executor.collected += 1
+        return super().result(timeout)
+
+
+class RecordingExecutor:
+    instances = []
+
+    def __init__(self, max_workers=None, mp_context=None):
+        self.submitted = 0
+        self.collected = 0
+        self.max_pending = 0
+        RecordingExecutor.instances.append(self)
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        self.max_pending = max(self.max_pending, self.submitted - self.collected)
+        future = RecordingFuture(self)
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def recording_executor(monkeypatch):
+    RecordingExecutor.instances = []
+    monkeypatch.setattr(pdf_tools, "ProcessPoolExecutor", RecordingExecutor)
+    monkeypatch.setattr(pdf_tools, "_encode_chunk",
+                        lambda pdf_file, page_numbers, options: [(page, b"x") for page in page_numbers])
+    return RecordingExecutor
+
+
+def test_parallel_render_keeps_bounded_window_in_order(recording_executor):
+    tools = PDFTools()
+    pages = [page_num for page_num, _ in tools._render_parallel("a.pdf", list(range(100)), None, 2)]
+
+    executor = recording_executor.instances[0]
+    assert pages == list(range(100))
+    assert executor.submitted == 8
+    assert executor.max_pending <= 2 * pdf_tools.PDF_RENDER_PENDING_PER_WORKER
+
+
+def test_parallel_export_matches_serial(tmp_path):
+    pdf_file = make_pdf(tmp_path / "a.pdf", 6)
+    tools = PDFTools()
+    serial = MemorySink()
+    list(tools.export_pages(pdf_file, serial, dpi=36, workers=1))
+    parallel = MemorySink()
+    list(tools.export_pages(pdf_file, parallel, dpi=36, workers=2))
+    assert parallel.pages == serial.pages
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pdf_to_jpg_reports_progress_per_page(tmp_path, workers):
+    pdf_file = make_pdf(tmp_path / "a.pdf", 5)
+    (tmp_path / "out").mkdir()
+    calls = []
+    files = PDFTools().pdf_to_jpg(pdf_file, str(tmp_path / "out"), dpi=36, workers=workers,
+                                  progress_callback=lambda done, total: calls.append((done, total)))
+    assert len(files) == 5
+    assert calls == [(done, 5) for done in range(1, 6)]
+
+
+def make_outlined_pdf(path, page_count, title):
+    doc = fitz.open()
+    for number in range(page_count):
+        page = doc.new_page(width=200, height=200)
+        page.insert_text((20, 40), f"{title} {number + 1}", fontsize=12)
+    doc.set_toc([[1, title, 1]] + [[2, f"{title} {p + 1}", p + 1] for p in range(page_count)])
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def outline_titles(path):
+    with pikepdf.open(path) as pdf, pdf.open_outline() as outline:
+        return [(item.title, [child.title for child in item.children]) for item in outline.root]
+
+
+def test_merge_keeps_source_outlines_by_default(tmp_path):
+    files = [make_outlined_pdf(tmp_path / f"{name}.pdf", 2, name) for name in ("a", "b")]
+    output = PDFTools().merge_pdfs(files, str(tmp_path / "merged.pdf"))
+    assert outline_titles(output) == [("a", ["a 1", "a 2"]), ("b", ["b 1", "b 2"])]
+    with pikepdf.open(output) as pdf, pdf.open_outline() as outline:
+        assert pdf.pages.index(pikepdf.Page(outline.root[1].destination[0])) == 2
+
+
+def test_merge_outline_modes(tmp_path):
+    files = [make_outlined_pdf(tmp_path / f"{name}.pdf", 2, name) for name in ("a", "b")]
+    merged = PDFTools().merge_pdfs(files, str(tmp_path / "merged.pdf"), outlines="merge")
+    assert outline_titles(merged) == [("a", ["a"]), ("b", ["b"])]
+    bare = PDFTools().merge_pdfs(files, str(tmp_path / "bare.pdf"), outlines="none")
+    assert outline_titles(bare) == []
+    with pytest.raises(ValueError):
+        PDFTools().merge_pdfs(files, str(tmp_path / "x.pdf"), outlines="flat")
+
+
+def test_merge_page_selection_and_groups(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_tools, "PDF_MERGE_GROUP_SIZE", 2)
+    files = [make_pdf(tmp_path / f"{index}.pdf", 3, prefix=f"Belge{index}") for index in range(5)]
+    calls = []
+    output = PDFTools().merge_pdfs(files, str(tmp_path / "merged.pdf"), pages=["1", None, "2-3", "3", "1,3"],
+                                   progress_callback=lambda done, total: calls.append((done, total)))
+    doc = fitz.open(output)
+    texts = [page.get_text().strip() for page in doc]
+    doc.close()
+    assert texts == ["Belge0 1", "Belge1 1", "Belge1 2", "Belge1 3", "Belge2 2", "Belge2 3",
+                     "Belge3 3", "Belge4 1", "Belge4 3"]
+    assert calls[-1] == (5, 5)
+    with pytest.raises(ValueError):
+        PDFTools().merge_pdfs(files, str(tmp_path / "x.pdf"), pages=["1"])
+
+
+def test_merge_dedupes_shared_streams(tmp_path):
+    files = [make_pdf(tmp_path / f"{index}.pdf", 2) for index in range(4)]
+    deduped = PDFTools().merge_pdfs(files, str(tmp_path / "deduped.pdf"))
+    plain = PDFTools().merge_pdfs(files, str(tmp_path / "plain.pdf"), dedupe=False)
+    with pikepdf.open(deduped) as a, pikepdf.open(plain) as b:
+        assert len(a.pages) == len(b.pages) == 8
+        assert len(a.objects) < len(b.objects)
+
+
+def make_image_pdf(path, masks=(None,), generation=0):
+    import random
+    import zlib
+
+    pdf = pikepdf.new()
+    rng = random.Random(1)
+    content = b""
+    resources = pikepdf.Dictionary()
+    for index, mask in enumerate(masks):
+        pixels = bytes(rng.randrange(256) for _ in range(300 * 300 * 3))
+        image = pikepdf.Stream(pdf, zlib.compress(pixels))
+        image.Type = pikepdf.Name.XObject
+        image.Subtype = pikepdf.Name.Image
+        image.Width = image.Height = 300
+        image.ColorSpace = pikepdf.Name.DeviceRGB
+        image.BitsPerComponent = 8
+        image.Filter = pikepdf.Name.FlateDecode
+        if mask is not None:
+            image.Mask = pikepdf.Array(mask)
+        resources[f"/Im{index}"] = pdf.make_indirect(image)
+        content += f"q 72 0 0 72 {10 + index * 80} 10 cm /Im{index} Do Q\n".encode()
+    page = pikepdf.Page(pikepdf.Dictionary(Type=pikepdf.Name.Page, MediaBox=[0, 0, 200, 100],
+                                           Resources=pikepdf.Dictionary(XObject=resources),
+                                           Contents=pdf.make_stream(content)))
+    pdf.pages.append(page)
+    pdf.save(str(path), object_stream_mode=pikepdf.ObjectStreamMode.disable, compress_streams=False)
+    pdf.close()
+    if generation:
+        # Görsel nesnelerinin kuşak numarası elle yükseltilir; bayt konumları değişmez
+        data = path.read_bytes()
+        with pikepdf.open(str(path)) as pdf:
+            numbers = [obj.objgen[0] for obj in pdf.pages[0].Resources.XObject.values()]
+        head, xref = data.rsplit(b"\nxref\n", 1)
+        entries = xref.split(b"\n")
+        for number in numbers:
+            head = head.replace(f"\n{number} 0 obj".encode(), f"\n{number} {generation} obj".encode())
+            head = head.replace(f" {number} 0 R".encode(), f" {number} {generation} R".encode())
+            entries[number + 1] = entries[number + 1].replace(b" 00000 n", f" {generation:05d} n".encode())
+        data = head + b"\nxref\n" + b"\n".join(entries)
+        path.write_bytes(data)
+    return str(path)
+
+
+def image_objects(path):
+    with pikepdf.open(path) as pdf:
+        return [(obj.objgen[1], str(obj.get("/Filter")), int(obj.Width))
+                for obj in pdf.pages[0].Resources.XObject.values()]
+
+
+def test_compress_skips_color_key_masked_images(tmp_path):
+    source = make_image_pdf(tmp_path / "a.pdf", masks=(None, [0, 10, 0, 10, 0, 10]))
+    report = PDFTools().compress_pdf_report(source, str(tmp_path / "out.pdf"), quality="/screen",
+                                            subset_fonts=False, workers=1)
+    assert report["images_recompressed"] == 1
+    filters = sorted(filter for _, filter, _ in image_objects(report["output"]))
+    assert filters == ["/DCTDecode", "/FlateDecode"]
+
+
+def test_compress_handles_nonzero_generation(tmp_path):
+    source = make_image_pdf(tmp_path / "a.pdf", generation=3)
+    assert [generation for generation, _, _ in image_objects(source)] == [3]
+    report = PDFTools().compress_pdf_report(source, str(tmp_path / "out.pdf"), quality="/screen",
+                                            subset_fonts=False, workers=1)
+    assert report["images_recompressed"] == 1
+    assert [(filter, width) for _, filter, width in image_objects(report["output"])] == [("/DCTDecode", 72)]
+
+
+def page_texts(path):
+    doc = fitz.open(path)
+    texts = [page.get_text().strip() for page in doc]
+    doc.close()
+    return texts
+
+
+def test_split_by_page_count(tmp_path):
+    pdf_file = make_pdf(tmp_path / "a.pdf", 5)
+    calls = []
+    files = PDFTools().split_pdf(pdf_file, str(tmp_path), pages_per_split=2,
+                                 progress_callback=lambda done, total: calls.append((done, total)))
+    assert [os.path.basename(path) for path in files] == ["split_1-2.pdf", "split_3-4.pdf", "split_5-5.pdf"]
+    assert [page_texts(path) for path in files] == [["Sayfa 1", "Sayfa 2"], ["Sayfa 3", "Sayfa 4"], ["Sayfa 5"]]
+    assert calls == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_split_by_ranges(tmp_path):
+    pdf_file = make_pdf(tmp_path / "a.pdf", 5)
+    files = PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="ranges", ranges=["4-5", "1,3", "1-3"])
+    assert [os.path.basename(path) for path in files] == ["split_4-5.pdf", "split_1-3.pdf", "split_1-3_1.pdf"]
+    assert [page_texts(path) for path in files] == [["Sayfa 4", "Sayfa 5"], ["Sayfa 1", "Sayfa 3"],
+                                                    ["Sayfa 1", "Sayfa 2", "Sayfa 3"]]
+    files = PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="ranges", ranges="2;5-")
+    assert [page_texts(path) for path in files] == [["Sayfa 2"], ["Sayfa 5"]]
+    with pytest.raises(ValueError):
+        PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="ranges", ranges=[])
+    with pytest.raises(ValueError):
+        PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="chapters")
+
+
+def test_split_by_bookmarks(tmp_path):
+    doc = fitz.open()
+    for number in range(5):
+        doc.new_page(width=200, height=200).insert_text((20, 40), f"Sayfa {number + 1}", fontsize=12)
+    doc.set_toc([[1, "Giriş", 2], [2, "Alt başlık", 3], [1, "Bölüm/2", 4]])
+    pdf_file = str(tmp_path / "a.pdf")
+    doc.save(pdf_file)
+    doc.close()
+
+    (tmp_path / "out").mkdir()
+    files = PDFTools().split_pdf(pdf_file, str(tmp_path / "out"), split_type="bookmarks", workers=1)
+    assert [os.path.basename(path) for path in files] == ["00_split_1-1.pdf", "01_Giriş.pdf", "02_Bölüm_2.pdf"]
+    assert [page_texts(path) for path in files] == [["Sayfa 1"], ["Sayfa 2", "Sayfa 3"], ["Sayfa 4", "Sayfa 5"]]
+    # Her parça yalnızca kendi sayfalarına bağlı yer imlerini taşır
+    assert outline_titles(files[1]) == [("Giriş", ["Alt başlık"])]
+    assert outline_titles(files[2]) == [("Bölüm/2", [])]
+
+    with pytest.raises(ValueError):
+        PDFTools().split_pdf(make_pdf(tmp_path / "b.pdf", 2), str(tmp_path), split_type="bookmarks")
+
+
+def make_shared_image_pdf(path, page_count):
+    # Tüm sayfalar aynı kaynak sözlüğünü paylaşır; her sayfa yalnızca kendi görselini çizer
+    import random
+    import zlib
+
+    pdf = pikepdf.new()
+    rng = random.Random(2)
+    xobjects = pikepdf.Dictionary()
+    for index in range(page_count):
+        pixels = bytes(rng.randrange(256) for _ in range(120 * 120 * 3))
+        image = pikepdf.Stream(pdf, zlib.compress(pixels))
+        image.Type, image.Subtype = pikepdf.Name.XObject, pikepdf.Name.Image
+        image.Width = image.Height = 120
+        image.ColorSpace, image.BitsPerComponent = pikepdf.Name.DeviceRGB, 8
+        image.Filter = pikepdf.Name.FlateDecode
+        xobjects[f"/Im{index}"] = pdf.make_indirect(image)
+    resources = pdf.make_indirect(pikepdf.Dictionary(XObject=xobjects))
+    for index in range(page_count):
+        content = pdf.make_stream(f"q 100 0 0 100 0 0 cm /Im{index} Do Q".encode())
+        pdf.pages.append(pikepdf.Page(pikepdf.Dictionary(Type=pikepdf.Name.Page, MediaBox=[0, 0, 100, 100],
+                                                         Resources=resources, Contents=content)))
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
+
+
+def test_split_by_size_keeps_only_used_resources(tmp_path):
+    pdf_file = make_shared_image_pdf(tmp_path / "a.pdf", 6)
+    image_size = 120 * 120 * 3
+    max_size = int(image_size * 2.5)
+    files = PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="size", max_size=max_size)
+    assert len(files) == 3
+    for path in files:
+        assert os.path.getsize(path) <= max_size
+        with pikepdf.open(path) as pdf:
+            assert len(pdf.pages) == 2
+            images = {obj.objgen for obj in pdf.objects
+                      if isinstance(obj, pikepdf.Stream) and obj.get("/Subtype") == "/Image"}
+            assert len(images) == 2
+
+    assert len(PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="size", max_size=10 ** 9)) == 1
+    assert len(PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="size", max_size=1)) == 6
+    with pytest.raises(ValueError):
+        PDFTools().split_pdf(pdf_file, str(tmp_path), split_type="size")
+
+
+def test_parallel_split_matches_serial(tmp_path):
+    pdf_file = make_pdf(tmp_path / "a.pdf", 8)
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+    serial = PDFTools().split_pdf(pdf_file, str(tmp_path / "serial"), workers=1)
+    parallel = PDFTools().split_pdf(pdf_file, str(tmp_path / "parallel"), workers=2)
+    assert [os.path.basename(path) for path in parallel] == [os.path.basename(path) for path in serial]
+    assert [page_texts(path) for path in parallel] == [page_texts(path) for path in serial]
+
+
+def test_serial_split_opens_source_once(tmp_path, monkeypatch):
+    pdf_file = make_pdf(tmp_path / "a.pdf", 6)
+    opened = []
+    original_open = pikepdf.open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return original_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(pdf_tools.pikepdf, "open", counting_open)
+    files = PDFTools().split_pdf(pdf_file, str(tmp_path), workers=1)
+    assert len(files) == 6
+    assert opened == [pdf_file]
@@ -0,0 +1,35 @@
+from api.ratelimit import QuotaTracker, RateLimiter
+from api.storage import apply_op
+
+DAY = 86400
+
+
+def test_rate_limiter_prune_drops_refilled_buckets():
+    limiter = RateLimiter(rate=1, burst=2, shards=1)
+    assert limiter.acquire("a", now=0.0) == 0.0
+    assert limiter.prune(now=0.5) == 0
+    assert limiter.prune(now=10.0) == 1
+    assert len(limiter) == 0
+
+
+def test_quota_prune_drops_expired_counters():
+    quotas = QuotaTracker(per_minute=0, per_day=5)
+    quotas.add("old", now=10 * DAY + 5)
+    quotas.add("fresh", now=11 * DAY + 5)
+
+    ops = quotas.prune(now=11 * DAY + 10)
+    assert ops == [("prune_quotas", {"before": 11})]
+    assert set(quotas._counters) == {"fresh"}
+    assert [op[1]["subject"] for op in quotas.flush_ops()] == ["fresh"]
+    assert quotas.prune(now=11 * DAY + 20) == []
+    assert quotas.prune(now=12 * DAY) == [("prune_quotas", {"before": 12})]
+    assert quotas._counters == {}
+
+
+def test_prune_quotas_deletes_persisted_rows(store):
+    for subject, day in (("old", 10), ("fresh", 11)):
+        store.put_quota({"subject": subject, "minute": day * 1440, "minute_count": 1, "day": day, "day_count": 3})
+    store.apply_batch([("prune_quotas", {"before": 11})])
+    assert [quota["subject"] for quota in store.iter_quotas()] == ["fresh"]
+    apply_op(store, ("prune_quotas", {"before": 12}))
+    assert list(store.iter_quotas()) == []
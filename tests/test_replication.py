@@ -0,0 +1,94 @@
+import asyncio
+
+from api.replication import ReplicaFollower, ReplicationLog
+from api.repository import Repository
+from api.storage import SQLiteStore
+
+LICENSE = {"license_key": "KEY1", "email": "a@example.com", "name": "A", "license_type": "pro",
+           "created_at": "2026-01-01T00:00:00", "expires_at": "2099-01-01T00:00:00", "is_active": True,
+           "usage_count": 0}
+
+
+def test_log_since_detects_gaps_and_epoch_changes():
+    log = ReplicationLog(capacity=3)
+    for number in range(5):
+        log.append(("put_api_key", {"api_key": f"k{number}"}))
+    assert [seq for seq, _ in log.since(log.epoch, 2)] == [3, 4, 5]
+    assert [seq for seq, _ in log.since(log.epoch, 3, limit=1)] == [4]
+    assert log.since(log.epoch, 5) == []
+    assert log.since(log.epoch, 1) is None
+    assert log.since(log.epoch, 6) is None
+    assert log.since("eski", 4) is None
+
+
+def test_log_coalesces_usage():
+    log = ReplicationLog()
+    log.append_usage("license", "KEY1", {"usage_count": 1})
+    log.append_usage("license", "KEY1", {"usage_count": 2})
+    log.append_usage("api_key", "k1", {"usage_count": 1, "last_used": "t"})
+    assert log.flush_usage() == 2
+    assert [op for _, op in log.since(log.epoch, 0)] == [
+        ("update_license", "KEY1", {"usage_count": 2}),
+        ("update_api_key", "k1", {"usage_count": 1, "last_used": "t"})
+    ]
+    assert log.flush_usage() == 0
+
+
+class LocalFollower(ReplicaFollower):
+    # Birincil düğümün uç noktaları yerine doğrudan günlük ve depo okunur
+    def __init__(self, repository, primary):
+        super().__init__(repository, primary_url="http://primary", token="t")
+        self.primary = primary
+
+    async def _get(self, path, params=None):
+        log = self.primary.log
+        if path == "/replication/snapshot":
+            return {"licenses": [dict(lic) for lic in self.primary.licenses.values()],
+                    "api_keys": [dict(key) for key in self.primary.api_keys.values()],
+                    "epoch": log.epoch, "seq": log.seq}
+        entries = log.since(params["epoch"], params["since"])
+        if entries is None:
+            return {"reset": True}
+        return {"reset": False, "ops": [[seq, list(op)] for seq, op in entries],
+                "seq": entries[-1][0] if entries else params["since"]}
+
+
+def test_replica_applies_primary_changes(tmp_path):
+    async def scenario():
+        primary = Repository(str(tmp_path / "usage.journal"))
+        await primary.open(lambda: SQLiteStore(str(tmp_path / "toolbox.db")))
+        primary.log = ReplicationLog(capacity=4)
+        try:
+            await primary.put_license(dict(LICENSE))
+            replica = Repository(str(tmp_path / "replica.journal"))
+            follower = LocalFollower(replica, primary)
+            await follower.bootstrap()
+            assert replica.replica and replica.get_license("KEY1") == primary.get_license("KEY1")
+
+            await primary.update_license("KEY1", is_active=False)
+            primary.record_license_usage("KEY1", count=3)
+            primary.log.flush_usage()
+            await primary.put_api_key({"api_key": "k1", "service": "ocr", "created_at": "2026-01-01T00:00:00",
+                                       "is_active": True, "usage_count": 0})
+            assert await follower.poll() == 3
+            assert follower.seq == primary.log.seq
+            assert replica.get_license("KEY1") == primary.get_license("KEY1")
+            assert replica.get_api_key("k1") == primary.get_api_key("k1")
+
+            # Replikadaki kullanım yerelde sayılır ve birincile iletilmek üzere biriktirilir
+            replica.record_api_key_usage("k1", "2026-05-01T00:00:00", count=2)
+            assert replica.take_forwarded_usage() == {("api_key", "k1"): [2, "2026-05-01T00:00:00"]}
+            assert primary.get_api_key("k1")["usage_count"] == 0
+
+            # Günlük kapasitesini aşan gecikmede replika anlık görüntüden yeniden başlar
+            for number in range(6):
+                await primary.update_api_key("k1", usage_count=number + 10)
+            assert await follower.poll() == 0
+            assert follower.snapshots == 2
+            assert replica.get_api_key("k1")["usage_count"] == 15
+            replica.apply(("update_license", "MISSING", {"is_active": True}))
+            assert replica.get_license("MISSING") is None
+        finally:
+            await primary.close()
+
+    asyncio.run(scenario())
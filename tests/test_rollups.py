@@ -0,0 +1,79 @@
+import pytest
+
+from api.rollups import Series, UsageRollups
+
+HOUR = 3600
+DAY = 86400
+NOW = 100 * DAY
+RETENTION = {60: 2 * HOUR, 3600: 2 * DAY, 86400: 365 * DAY}
+
+
+def test_series_keeps_buckets_sorted():
+    series = Series()
+    for bucket in (5, 7, 3, 7, 5, 1):
+        series.add(bucket)
+    assert list(series.buckets) == [1, 3, 5, 7]
+    assert list(series.counts) == [1, 1, 2, 2]
+    series.set(4, 9)
+    assert list(series.between(3, 5)) == [(3, 1), (4, 9), (5, 2)]
+    assert series.trim(5) == 3
+    assert list(series.buckets) == [5, 7]
+
+
+def recorded():
+    rollups = UsageRollups(retention=RETENTION)
+    # Son 3 saatte her 10 dakikada bir olay
+    for offset in range(0, 3 * HOUR, 600):
+        rollups.record(("key:A", "license_type:pro"), now=NOW - 3 * HOUR + offset)
+    return rollups
+
+
+def test_downsample_keeps_totals_in_coarser_resolution():
+    rollups = recorded()
+    start, end = NOW - 3 * HOUR, NOW - 1
+    step, resolution, points = rollups.timeseries("key:A", start, end, HOUR, now=NOW)
+    assert (step, resolution) == (HOUR, HOUR)
+    assert [point["count"] for point in points] == [6, 6, 6]
+
+    ops = rollups.downsample(now=NOW)
+    assert ("prune_rollups", {"step": 60, "before": (NOW - 2 * HOUR) // 60}) in ops
+    _, resolution, points = rollups.timeseries("key:A", start, end, 60, now=NOW)
+    assert resolution == HOUR
+    assert sum(point["count"] for point in points) == 18
+    _, resolution, points = rollups.timeseries("key:A", NOW - HOUR, end, 600, now=NOW)
+    assert resolution == 60
+    assert [point["count"] for point in points] == [1] * 6
+
+
+def test_downsample_drops_empty_series():
+    rollups = UsageRollups(retention=RETENTION)
+    rollups.record(("key:old",), now=NOW - 3 * DAY)
+    rollups.downsample(now=NOW)
+    assert len(rollups) == 0
+    _, resolution, points = rollups.timeseries("key:old", NOW - 4 * DAY, NOW, DAY, now=NOW)
+    assert resolution == DAY
+    assert sum(point["count"] for point in points) == 1
+
+
+def test_timeseries_limits_point_count():
+    rollups = UsageRollups(retention={60: 30 * DAY, 3600: 90 * DAY, 86400: 365 * DAY})
+    with pytest.raises(ValueError):
+        rollups.timeseries("key:A", NOW - 10 * DAY, NOW, 60, now=NOW)
+    # Eski başlangıçlar kaba çözünürlüğe düştüğü için nokta sayısı sınırın altında kalır
+    step, resolution, points = rollups.timeseries("key:A", NOW - 300 * DAY, NOW, 60, now=NOW)
+    assert (step, resolution, len(points)) == (DAY, DAY, 301)
+
+
+def test_rollups_round_trip_through_store(store):
+    rollups = recorded()
+    store.apply_batch(rollups.flush_ops())
+    assert rollups.flush_ops() == []
+    store.apply_batch(rollups.downsample(now=NOW))
+
+    restored = UsageRollups(retention=RETENTION)
+    restored.load(store.iter_rollups())
+    for step in (60, HOUR):
+        assert (restored.timeseries("key:A", NOW - 3 * HOUR, NOW - 1, step, now=NOW)
+                == rollups.timeseries("key:A", NOW - 3 * HOUR, NOW - 1, step, now=NOW))
+    assert {record["step"] for record in store.iter_rollups()
+            if record["bucket"] < (NOW - 2 * HOUR) // 60} == {HOUR, DAY}
@@ -0,0 +1,47 @@
+import pytest
+
+from api.storage import JSONStore
+from components import serialization
+from components.license_manager import LicenseManager
+
+requires_no_msgspec = pytest.mark.skipif(serialization.msgspec is not None, reason="msgspec kurulu")
+
+
+@pytest.mark.parametrize("format", ["json", "compact"])
+def test_text_formats_round_trip(tmp_path, format):
+    data = {"KEY1": {"email": "a@example.com", "usage": {"pdf": 3}, "is_active": True}}
+    path = tmp_path / "data.json"
+    serialization.save_file(path, data, format)
+    assert serialization.load_file(path) == data
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        serialization.check_format("pickle")
+
+
+def test_marshal_header_is_not_readable():
+    import marshal
+
+    with pytest.raises(ValueError):
+        serialization.unpack(b"TBX\x02" + marshal.dumps({"a": 1}))
+
+
+@requires_no_msgspec
+def test_binary_format_requires_msgspec(workdir):
+    with pytest.raises(ValueError):
+        serialization.encode({"a": 1}, "binary")
+    with pytest.raises(ValueError):
+        JSONStore("licenses.bin", "api_keys.bin", "quotas.bin", "rollups.bin", format="binary")
+    with pytest.raises(ValueError):
+        LicenseManager(storage_format="binary")
+    assert not list(workdir.iterdir())
+
+
+@pytest.mark.skipif(serialization.msgspec is None, reason="msgspec kurulu değil")
+def test_binary_format_round_trip(tmp_path):
+    data = {"KEY1": {"email": "a@example.com", "usage": {"pdf": 3}}}
+    path = tmp_path / "data.bin"
+    serialization.save_file(path, data, "binary")
+    assert path.read_bytes().startswith(serialization.BINARY_MSGPACK)
+    assert serialization.load_file(path) == data
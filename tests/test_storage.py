@@ -0,0 +1,63 @@
+import json
+
+from api.storage import SQLiteStore, migrate_json_to_sqlite, open_store
+
+LICENSE = {
+    "license_key": "KEY1",
+    "email": "a@example.com",
+    "name": "A",
+    "license_type": "pro",
+    "created_at": "2026-01-01T00:00:00",
+    "expires_at": "2027-01-01T00:00:00",
+    "is_active": True,
+    "usage_count": 3,
+    "seats": 5
+}
+API_KEY = {"api_key": "tk_1", "service": "ocr", "created_at": "2026-01-01T00:00:00", "is_active": False,
+           "usage_count": 0, "last_used": "2026-02-01T00:00:00"}
+
+
+def test_store_round_trip(store):
+    store.put_license(LICENSE)
+    store.put_api_key(API_KEY)
+    assert store.get_license("KEY1") == LICENSE
+    assert store.get_api_key("tk_1") == API_KEY
+    assert store.get_license("MISSING") is None
+
+    assert store.update_license("KEY1", usage_count=4, last_used="2026-03-01T00:00:00", is_active=False)
+    assert not store.update_license("MISSING", usage_count=1)
+    updated = store.get_license("KEY1")
+    assert (updated["usage_count"], updated["last_used"], updated["is_active"]) == (4, "2026-03-01T00:00:00", False)
+    assert updated["seats"] == 5
+    assert (store.count_licenses(), store.count_api_keys()) == (1, 1)
+
+
+def test_migrate_json_to_sqlite(workdir):
+    second = dict(LICENSE, license_key="KEY2", is_active=False)
+    del second["seats"]
+    (workdir / "licenses.json").write_text(json.dumps({"KEY1": LICENSE, "KEY2": second}))
+    (workdir / "api_keys.json").write_text(json.dumps({"tk_1": API_KEY}))
+
+    assert migrate_json_to_sqlite("licenses.json", "api_keys.json", "toolbox.db") == (2, 1)
+    # Tekrar çalıştırmak kayıtları çoğaltmaz
+    assert migrate_json_to_sqlite("licenses.json", "api_keys.json", "toolbox.db") == (2, 1)
+
+    store = SQLiteStore("toolbox.db")
+    try:
+        assert {lic["license_key"]: lic for lic in store.iter_licenses()} == {"KEY1": LICENSE, "KEY2": second}
+        assert list(store.iter_api_keys()) == [API_KEY]
+    finally:
+        store.close()
+
+
+def test_open_store_backends(workdir):
+    sqlite_store = open_store("sqlite", str(workdir / "a.db"))
+    sqlite_store.put_license(LICENSE)
+    sqlite_store.close()
+    reopened = open_store("sqlite", str(workdir / "a.db"))
+    assert reopened.get_license("KEY1") == LICENSE
+    reopened.close()
+
+    json_store = open_store("json")
+    json_store.put_license(LICENSE)
+    assert json.loads((workdir / "licenses.json").read_text())["KEY1"] == LICENSE
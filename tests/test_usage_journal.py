@@ -0,0 +1,91 @@
+import asyncio
+
+from api.repository import Repository
+from api.storage import SQLiteStore
+from components.usage_journal import UsageJournal
+
+LICENSE = {"license_key": "KEY1", "email": "a@example.com", "name": "A", "license_type": "pro",
+           "created_at": "2026-01-01T00:00:00", "expires_at": "2099-01-01T00:00:00", "is_active": True,
+           "usage_count": 0}
+
+
+def test_replay_keeps_latest_record_and_skips_torn_line(tmp_path):
+    journal = UsageJournal(str(tmp_path / "usage.journal"))
+    journal.append("license", "KEY1", 1)
+    journal.append("license", "KEY1", 2)
+    journal.flush()
+    assert journal.seal() == journal.sealed_path
+
+    journal.append("license", "KEY1", 3)
+    journal.append("api_key", "tk_1", 7, "2026-02-01T00:00:00")
+    journal.flush()
+    with open(journal.path, "ab") as f:
+        f.write(b'{"s":"license","k":"KEY1","u":9')
+
+    assert journal.replay() == {
+        ("license", "KEY1"): {"usage_count": 3},
+        ("api_key", "tk_1"): {"usage_count": 7, "last_used": "2026-02-01T00:00:00"}
+    }
+    journal.reset()
+    assert journal.replay() == {}
+
+
+def test_seal_does_not_overwrite_pending_compaction(tmp_path):
+    journal = UsageJournal(str(tmp_path / "usage.journal"))
+    journal.append("license", "KEY1", 1)
+    sealed = journal.seal()
+    journal.append("license", "KEY1", 2)
+    assert journal.seal() == sealed
+    assert journal.read(sealed) == {("license", "KEY1"): {"usage_count": 1}}
+    assert journal.read(journal.path) == {("license", "KEY1"): {"usage_count": 2}}
+    journal.close()
+
+
+def test_compaction_writes_usage_to_store(tmp_path):
+    db_path = str(tmp_path / "toolbox.db")
+
+    async def scenario():
+        repository = Repository(str(tmp_path / "usage.journal"))
+        await repository.open(lambda: SQLiteStore(db_path))
+        await repository.put_license(dict(LICENSE))
+        for _ in range(3):
+            repository.record_license_usage("KEY1")
+        assert await repository.compact() == 1
+        assert repository.journal.size() == 0
+        assert repository.store.get_license("KEY1")["usage_count"] == 3
+        await repository.close()
+
+    asyncio.run(scenario())
+
+
+def test_open_replays_journal_after_crash(tmp_path):
+    db_path = str(tmp_path / "toolbox.db")
+    journal_path = str(tmp_path / "usage.journal")
+
+    async def crash():
+        repository = Repository(journal_path)
+        await repository.open(lambda: SQLiteStore(db_path))
+        await repository.put_license(dict(LICENSE))
+        repository.record_license_usage("KEY1", count=5)
+        repository.journal.flush()
+        # Sıkıştırma yapılmadan kapanış: kullanım yalnızca günlükte kalır
+        repository._compactor.cancel()
+        await repository.writer.stop()
+        repository.journal.close()
+        repository.store.close()
+
+    async def restart():
+        repository = Repository(journal_path)
+        await repository.open(lambda: SQLiteStore(db_path))
+        try:
+            assert repository.get_license("KEY1")["usage_count"] == 5
+            assert repository.store.get_license("KEY1")["usage_count"] == 5
+            assert repository.journal.replay() == {}
+        finally:
+            await repository.close()
+
+    asyncio.run(crash())
+    store = SQLiteStore(db_path)
+    assert store.get_license("KEY1")["usage_count"] == 0
+    store.close()
+    asyncio.run(restart())
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+from api.writer import StoreWriter
+
+
+class RecordingStore:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+
+    def apply_batch(self, ops):
+        self.release.wait()
+        if self.fail:
+            raise RuntimeError("disk dolu")
+        self.batches.append(list(ops))
+
+
+def test_concurrent_submits_share_one_batch():
+    store = RecordingStore()
+
+    async def scenario():
+        writer = StoreWriter(store, max_delay=0.05)
+        writer.start()
+        futures = [writer.submit(("put_license", {"license_key": f"K{number}"})) for number in range(10)]
+        futures.append(writer.submit(("update_license", "K0", {"is_active": False}),
+                                     ("update_license", "K1", {"is_active": False})))
+        results = await asyncio.gather(*futures)
+        await writer.stop()
+        return writer, results
+
+    writer, results = asyncio.run(scenario())
+    assert len(store.batches) == 1
+    assert [op[0] for op in store.batches[0]] == ["put_license"] * 10 + ["update_license"] * 2
+    assert results == [12] * 11
+    assert (writer.batches_committed, writer.ops_committed) == (1, 12)
+
+
+def test_batches_are_capped_by_max_batch():
+    store = RecordingStore()
+
+    async def scenario():
+        writer = StoreWriter(store, max_batch=4, max_delay=0.05)
+        writer.start()
+        await asyncio.gather(*[writer.submit(("put_license", {})) for _ in range(10)])
+        await writer.stop()
+
+    asyncio.run(scenario())
+    assert [len(batch) for batch in store.batches] == [4, 4, 2]
+
+
+def test_failed_batch_fails_every_waiter():
+    store = RecordingStore(fail=True)
+
+    async def scenario():
+        writer = StoreWriter(store, max_delay=0.05)
+        writer.start()
+        futures = [writer.submit(("put_license", {})) for _ in range(3)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        store.fail = False
+        # Hata sonrası yazıcı çalışmaya devam eder
+        await writer.submit(("put_license", {}))
+        await writer.stop()
+        return writer, results
+
+    writer, results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len({id(result) for result in results}) == 1
+    assert (writer.batches_committed, writer.ops_committed) == (1, 1)
+
+
+def test_stop_flushes_queued_ops():
+    store = RecordingStore()
+    store.release.clear()
+
+    async def scenario():
+        writer = StoreWriter(store, max_batch=2, max_delay=0)
+        writer.start()
+        futures = [writer.submit(("put_license", {"license_key": f"K{number}"})) for number in range(5)]
+        await asyncio.sleep(0.01)
+        # İlk grup yazılırken kapatılır; kuyruktakiler de yazılmalı
+        stopping = asyncio.ensure_future(writer.stop())
+        await asyncio.sleep(0.01)
+        store.release.set()
+        await stopping
+        return futures
+
+    futures = asyncio.run(scenario())
+    assert all(future.done() and not future.exception() for future in futures)
+    assert [op[1]["license_key"] for batch in store.batches for op in batch] == [f"K{number}" for number in range(5)]
+
+
+def test_repository_close_flushes_pending_writes(workdir):
+    from api.repository import Repository
+    from api.storage import SQLiteStore
+
+    async def scenario():
+        repository = Repository(str(workdir / "usage.journal"))
+        await repository.open(lambda: SQLiteStore(str(workdir / "toolbox.db")))
+        repository.put_license({"license_key": "K1", "email": "a@example.com", "name": "A", "license_type": "pro",
+                                "created_at": "2030-01-01T00:00:00", "expires_at": "2031-01-01T00:00:00",
+                                "is_active": True})
+        with repository.transaction() as ops:
+            repository.update_license("K1", name="B")
+        repository.commit(ops)
+        await repository.close()
+
+    asyncio.run(scenario())
+    store = SQLiteStore(str(workdir / "toolbox.db"))
+    try:
+        assert [lic["name"] for lic in store.iter_licenses()] == ["B"]
+    finally:
+        store.close()
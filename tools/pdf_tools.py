@@ -2,52 +2,659 @@ import os
 import fitz
 from PIL import Image
 import io
-from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+import re
+import hashlib
+import shutil
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pikepdf
 
+PDF_RENDER_WORKERS = int(os.environ.get("TOOLBOX_PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+# Her süreç başına düşen parça sayısı; küçük parçalar yükü dengeler, büyükler belge açma maliyetini azaltır
+PDF_RENDER_CHUNKS_PER_WORKER = 4
+PDF_RENDER_MIN_PARALLEL_PAGES = 4
+# Aynı anda kuyruğa alınan parça sayısı işçi başına bununla sınırlanır; yazılmayı bekleyen
+# görüntüler bellekte birikmez
+PDF_RENDER_PENDING_PER_WORKER = 2
+# qpdf kopyalanan sayfaların nesnelerini kaydedene kadar bellekte tutar; bu sayıdan fazla dosya
+# ara PDF'lerde gruplar halinde birleştirilir, tekrarlar her grupta ayıklandığı için bellek sınırlı kalır
+PDF_MERGE_GROUP_SIZE = int(os.environ.get("TOOLBOX_PDF_MERGE_GROUP_SIZE", "32"))
+PDF_SPLIT_WORKERS = int(os.environ.get("TOOLBOX_PDF_SPLIT_WORKERS", str(os.cpu_count() or 1)))
+SPLIT_TYPES = ("pages", "ranges", "bookmarks", "size")
+# Boyuta göre ayırmada her çıktı dosyasının sabit yükü (başlık, sayfa ağacı, xref) için tahmini pay
+SPLIT_FILE_OVERHEAD = 2048
+PDF_COMPRESS_WORKERS = int(os.environ.get("TOOLBOX_PDF_COMPRESS_WORKERS", str(os.cpu_count() or 1)))
+# Ghostscript -dPDFSETTINGS adlarıyla uyumlu ön ayarlar: hedef çözünürlük ve JPEG kalitesi
+COMPRESS_PRESETS = {
+    "/screen": {"dpi": 72, "quality": 40},
+    "/ebook": {"dpi": 150, "quality": 60},
+    "/printer": {"dpi": 300, "quality": 85},
+}
+# Etkin çözünürlüğü hedefin bu katından düşük olan görseller küçültülmez
+COMPRESS_DPI_THRESHOLD = 1.5
+COMPRESS_MIN_IMAGE_SIDE = 32
+COMPRESS_IMAGE_FORMATS = ("jpeg", "jpeg2000")
+LOSSY_FILTERS = ("/DCTDecode", "/JPXDecode")
+OBJECT_CLASSES = ("images", "fonts", "content", "other_streams", "objects")
+# Akışlar ve dolaylı diziler dışında içeriğine göre birleştirilen sözlük türleri
+DEDUPE_DICTIONARY_TYPES = ("/FontDescriptor", "/Font", "/ExtGState")
+
+
+def parse_page_ranges(pages, total):
+    # "1-3,7,10-" biçimindeki metin veya 1 tabanlı sayfa listesi, 0 tabanlı sıralı listeye çevrilir
+    if pages is None:
+        return list(range(total))
+    if isinstance(pages, int):
+        pages = [pages]
+    if isinstance(pages, str):
+        numbers = []
+        for part in pages.replace(" ", "").split(","):
+            if not part:
+                continue
+            start, dash, end = part.partition("-")
+            try:
+                first = int(start) if start else 1
+                last = (int(end) if end else total) if dash else first
+            except ValueError:
+                raise ValueError(f"Geçersiz sayfa aralığı: {part}")
+            numbers.extend(range(first, last + 1))
+        pages = numbers
+    selected = []
+    seen = set()
+    for number in pages:
+        number = int(number)
+        if number < 1 or number > total:
+            raise ValueError(f"Sayfa numarası 1-{total} aralığında olmalı: {number}")
+        if number not in seen:
+            seen.add(number)
+            selected.append(number - 1)
+    return selected
+
+
+def _replace_references(obj, replacements):
+    # Doğrudan (dolaylı olmayan) iç içe sözlük ve dizilerde yinelenen nesne referansları değiştirilir
+    if isinstance(obj, pikepdf.Array):
+        entries = enumerate(list(obj))
+    elif isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream)):
+        entries = list(obj.items())
+    else:
+        return
+    for key, value in entries:
+        if not isinstance(value, pikepdf.Object):
+            continue
+        if value.is_indirect:
+            canonical = replacements.get(value.objgen)
+            if canonical is not None:
+                obj[key] = canonical
+        elif isinstance(value, (pikepdf.Array, pikepdf.Dictionary)):
+            _replace_references(value, replacements)
+
+
+def _object_key(obj, stream_digests):
+    if isinstance(obj, pikepdf.Stream):
+        digest = stream_digests.get(obj.objgen)
+        if digest is None:
+            digest = stream_digests[obj.objgen] = hashlib.sha256(obj.read_raw_bytes()).digest()
+        header = pikepdf.Dictionary({key: value for key, value in obj.stream_dict.items() if key != "/Length"})
+        return b"S" + digest + header.unparse(resolved=True)
+    if isinstance(obj, pikepdf.Dictionary) and obj.get("/Type") in DEDUPE_DICTIONARY_TYPES:
+        return b"D" + obj.unparse(resolved=True)
+    # Dolaylı diziler çoğunlukla renk uzayı ve font genişlik tablolarıdır
+    if isinstance(obj, pikepdf.Array):
+        return b"A" + obj.unparse(resolved=True)
+    return None
+
+
+def dedupe_objects(pdf):
+    # Aynı içerikli akışlar (font, görsel, ICC profili...) ve bunlara bağlı sözlükler tek nesneye indirgenir.
+    # Bir tur sonra referanslar değiştiği için üst nesneler de eşleşebilir; yeni eşleşme kalmayana kadar tekrarlanır.
+    stream_digests = {}
+    dropped = set()
+    while True:
+        seen = {}
+        replacements = {}
+        for obj in pdf.objects:
+            if obj.objgen in dropped:
+                continue
+            key = _object_key(obj, stream_digests)
+            if key is None:
+                continue
+            canonical = seen.setdefault(key, obj)
+            if canonical is not obj:
+                replacements[obj.objgen] = canonical
+        if not replacements:
+            return len(dropped)
+        dropped.update(replacements)
+        # Artık referans verilmeyen kopyalar kaydederken yazılmaz
+        for obj in pdf.objects:
+            if obj.objgen not in dropped:
+                _replace_references(obj, replacements)
+        _replace_references(pdf.trailer, replacements)
+
+
+def _outline_destination(pdf, item):
+    # Hedef doğrudan dizi, isimli hedef veya GoTo eylemi olabilir; sayfa referanslı diziye çözülür
+    destination = item.destination
+    if destination is None and item.action is not None and item.action.get("/S") == "/GoTo":
+        destination = item.action.get("/D")
+    if isinstance(destination, (pikepdf.String, pikepdf.Name)):
+        name = str(destination)
+        resolved = None
+        if "/Names" in pdf.Root and "/Dests" in pdf.Root.Names:
+            resolved = pikepdf.NameTree(pdf.Root.Names.Dests).get(name)
+        if resolved is None and "/Dests" in pdf.Root:
+            resolved = pdf.Root.Dests.get(name if name.startswith("/") else "/" + name)
+        destination = resolved
+    if isinstance(destination, pikepdf.Dictionary):
+        destination = destination.get("/D")
+    if isinstance(destination, pikepdf.Array) and len(destination) and destination[0].is_indirect:
+        return destination
+    return None
+
+
+def _copy_outline_items(pdf, items, page_map):
+    copied = []
+    for item in items:
+        children = _copy_outline_items(pdf, item.children, page_map)
+        destination = _outline_destination(pdf, item)
+        page = page_map.get(destination[0].objgen) if destination is not None else None
+        if page is None:
+            # Hedef sayfası seçilmemiş başlık atlanır, alt başlıkları bir üst seviyeye taşınır
+            copied.extend(children)
+            continue
+        new_item = pikepdf.OutlineItem(item.title, pikepdf.Array([page, *list(destination)[1:]]))
+        new_item.is_closed = item.is_closed
+        new_item.children.extend(children)
+        copied.append(new_item)
+    return copied
+
+
+def _content_names(page):
+    # Sayfa içeriğinde adıyla kullanılan kaynaklar (/Im0, /F1 ...); içerik okunamazsa None
+    try:
+        return {str(operand) for operands, _ in pikepdf.parse_content_stream(page)
+                for operand in operands if isinstance(operand, pikepdf.Name)}
+    except Exception:
+        return None
+
+
+def _page_resources(page):
+    # Sayfadan ulaşılan dolaylı nesneler ve yaklaşık boyutları; üst sayfa ağacına geri dönen bağlar izlenmez.
+    # Sayfalar arasında paylaşılan kaynak sözlüğünden yalnızca içerikte kullanılan girdiler sayılır
+    used = _content_names(page)
+    pending = [value for key, value in page.items() if key not in ("/Parent", "/P", "/Resources")]
+    resources = page.get("/Resources")
+    if isinstance(resources, pikepdf.Dictionary):
+        for entries in resources.values():
+            if used is not None and isinstance(entries, pikepdf.Dictionary):
+                pending.extend(value for name, value in entries.items() if name in used)
+            else:
+                pending.append(entries)
+    sizes = {}
+    while pending:
+        value = pending.pop()
+        if not isinstance(value, pikepdf.Object):
+            continue
+        if value.is_indirect:
+            if value.objgen in sizes or value.objgen == page.objgen:
+                continue
+            if isinstance(value, pikepdf.Dictionary) and value.get("/Type") in ("/Page", "/Pages"):
+                continue
+            if isinstance(value, pikepdf.Stream):
+                sizes[value.objgen] = int(value.stream_dict.get("/Length", 0)) + 64
+            else:
+                sizes[value.objgen] = len(value.unparse(resolved=True))
+        if isinstance(value, pikepdf.Array):
+            pending.extend(value)
+        elif isinstance(value, (pikepdf.Dictionary, pikepdf.Stream)):
+            pending.extend(item for key, item in value.items() if key not in ("/Parent", "/P"))
+    return sizes
+
+
+def _split_filename(title):
+    name = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', "_", str(title)).strip(" ._")
+    return name[:80] or "bolum"
+
+
+def _write_split_chunks(pdf_file, chunks, outlines):
+    # Paralel modda her süreç kaynağı bir kez açar ve kendi parça grubunu yazar
+    with pikepdf.open(pdf_file) as source:
+        return _write_chunks_from(source, chunks, outlines)
+
+
+def _write_chunks_from(source, chunks, outlines, progress_callback=None):
+    # Açık kaynaktan parçalar sırayla yazılır; yer imi ağacı bir kez okunur
+    written = []
+    source_outline = source.open_outline() if outlines else None
+    for output_file, page_numbers in chunks:
+        with pikepdf.new() as output:
+            page_map = {}
+            for index in page_numbers:
+                output.pages.append(source.pages[index])
+                page_map[source.pages[index].obj.objgen] = output.pages[-1].obj
+            if source_outline is not None and source_outline.root:
+                items = _copy_outline_items(source, source_outline.root, page_map)
+                if items:
+                    with output.open_outline() as outline:
+                        outline.root.extend(items)
+            # Paylaşılan kaynak sözlüğünden bu parçanın sayfalarında kullanılmayan font/görseller atılır
+            output.remove_unreferenced_resources()
+            output.save(output_file, compress_streams=True,
+                        object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        written.append(output_file)
+        if progress_callback is not None:
+            progress_callback(len(written), len(chunks))
+    return written
+
+
+def _image_dpi(doc):
+    # Görselin sayfalardaki en büyük gösterimine göre etkin çözünürlüğü (xref -> DPI)
+    dpi = {}
+    for page in doc:
+        for info in page.get_image_info(xrefs=True):
+            xref = info.get("xref")
+            bbox = fitz.Rect(info["bbox"])
+            if not xref or bbox.is_empty:
+                continue
+            effective = min(info["width"] / (bbox.width / 72), info["height"] / (bbox.height / 72))
+            dpi[xref] = min(dpi.get(xref, effective), effective)
+    return dpi
+
+
+def _colorspace_components(colorspace):
+    if colorspace == "/DeviceGray":
+        return 1
+    if colorspace == "/DeviceRGB":
+        return 3
+    if isinstance(colorspace, pikepdf.Array) and len(colorspace) > 1:
+        if colorspace[0] == "/ICCBased":
+            return int(colorspace[1].get("/N", 0))
+        if colorspace[0] == "/CalGray":
+            return 1
+        if colorspace[0] == "/CalRGB":
+            return 3
+    return None
+
+
+def _recompress_image(obj, scale, format, quality):
+    # Maske, 1 bitlik ve /Decode dizili görseller olduğu gibi bırakılır; renk anahtarlı (/Mask dizisi)
+    # görsellerde kayıplı sıkıştırma anahtar rengi bozacağı için dokunulmaz
+    if obj.get("/ImageMask") or "/Decode" in obj or int(obj.get("/BitsPerComponent", 8)) == 1:
+        return None
+    if isinstance(obj.get("/Mask"), pikepdf.Array):
+        return None
+    try:
+        try:
+            image = pikepdf.PdfImage(obj).as_pil_image(apply_mask=False)
+        except TypeError:
+            image = pikepdf.PdfImage(obj).as_pil_image()
+    except Exception:
+        return None
+    if image.mode == "P":
+        image = image.convert("RGB")
+    if image.mode not in ("L", "RGB"):
+        return None
+    if scale < 1:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.LANCZOS)
+    buffer = io.BytesIO()
+    if format == "jpeg2000":
+        # Kalite 0-100 aralığından PSNR (dB) hedefine çevrilir
+        image.save(buffer, "JPEG2000", quality_mode="dB", quality_layers=[25 + quality * 0.25])
+        filter = "/JPXDecode"
+    else:
+        image.save(buffer, "JPEG", quality=quality, optimize=True)
+        filter = "/DCTDecode"
+    data = buffer.getvalue()
+    if len(data) >= len(obj.read_raw_bytes()):
+        return None
+    return data, image.size, image.mode, filter
+
+
+def _recompress_images(pdf_file, tasks, format, quality):
+    # Alt süreçte çalışır; görseller (nesne, kuşak) numarasıyla kaynaktan okunur
+    results = []
+    with pikepdf.open(pdf_file) as pdf:
+        for objgen, scale in tasks:
+            result = _recompress_image(pdf.get_object(objgen), scale, format, quality)
+            if result is not None:
+                results.append((objgen, *result))
+    return results
+
+
+def _apply_image(obj, data, size, mode, filter):
+    components = 1 if mode == "L" else 3
+    colorspace = obj.get("/ColorSpace")
+    if _colorspace_components(colorspace) != components:
+        colorspace = pikepdf.Name.DeviceGray if components == 1 else pikepdf.Name.DeviceRGB
+    obj.write(data, filter=pikepdf.Name(filter))
+    if "/DecodeParms" in obj:
+        del obj["/DecodeParms"]
+    obj.Width, obj.Height = size
+    obj.BitsPerComponent = 8
+    obj.ColorSpace = colorspace
+
+
+def object_class_sizes(pdf):
+    # Akışlar ham (sıkıştırılmış) boyutlarıyla, diğer nesneler yaklaşık yazım boyutlarıyla sayılır
+    fonts = set()
+    content = set()
+    for page in pdf.pages:
+        contents = page.obj.get("/Contents")
+        for stream in (contents if isinstance(contents, pikepdf.Array) else [contents]):
+            if isinstance(stream, pikepdf.Stream):
+                content.add(stream.objgen)
+    for obj in pdf.objects:
+        if isinstance(obj, pikepdf.Dictionary) and obj.get("/Type") == "/FontDescriptor":
+            for key in ("/FontFile", "/FontFile2", "/FontFile3"):
+                if key in obj:
+                    fonts.add(obj[key].objgen)
+    sizes = {name: {"count": 0, "bytes": 0} for name in OBJECT_CLASSES}
+    for obj in pdf.objects:
+        if isinstance(obj, pikepdf.Stream):
+            if obj.get("/Type") in ("/ObjStm", "/XRef"):
+                continue
+            if obj.get("/Subtype") == "/Image":
+                name = "images"
+            elif obj.objgen in fonts:
+                name = "fonts"
+            elif obj.objgen in content or obj.get("/Subtype") == "/Form":
+                name = "content"
+            else:
+                name = "other_streams"
+            size = len(obj.read_raw_bytes())
+        elif isinstance(obj, (pikepdf.Dictionary, pikepdf.Array)):
+            name = "objects"
+            size = len(obj.unparse(resolved=True))
+        else:
+            continue
+        sizes[name]["count"] += 1
+        sizes[name]["bytes"] += size
+    return sizes
+
+
+IMAGE_FORMATS = {"jpeg": "jpg", "jpg": "jpg", "png": "png", "webp": "webp"}
+
+
+def _encode_page(doc, page_num, dpi, format, quality, grayscale, alpha):
+    # JPEG alfa kanalı taşıyamaz; saydamlık yalnızca PNG/WebP'de korunur
+    alpha = alpha and format != "jpg"
+    pix = doc[page_num].get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72),
+                                   colorspace=fitz.csGRAY if grayscale else fitz.csRGB, alpha=alpha)
+    if format == "jpg":
+        return pix.tobytes("jpg", jpg_quality=quality)
+    if format == "png":
+        return pix.tobytes("png")
+    # MuPDF WebP yazamaz; PIL görüntüsü kopyalanmadan pixmap belleği üzerine kurulur
+    mode = ("L" if grayscale else "RGB") + ("A" if alpha else "")
+    img = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+    buffer = io.BytesIO()
+    (img.convert("RGBA") if mode == "LA" else img).save(buffer, "WEBP", quality=quality)
+    # Pixmap serbest bırakılmadan önce PIL'in bellek görünümüne tuttuğu referans bırakılır
+    del img
+    return buffer.getvalue()
+
+
+def _encode_chunk(pdf_file, page_numbers, options):
+    # Alt süreçte çalışır; her süreç belgeyi kendisi açar
+    doc = fitz.open(pdf_file)
+    try:
+        return [(page_num, _encode_page(doc, page_num, *options)) for page_num in page_numbers]
+    finally:
+        doc.close()
+
+
+class DirectorySink:
+    def __init__(self, output_dir, prefix="page"):
+        self.output_dir = output_dir
+        self.prefix = prefix
+
+    def write(self, page_num, data, extension):
+        output_file = os.path.join(self.output_dir, f"{self.prefix}_{page_num+1}.{extension}")
+        with open(output_file, "wb") as f:
+            f.write(data)
+        return output_file
+
+
+class MemorySink:
+    # Diske yazmak istemeyenler için; sayfalar 1 tabanlı numarayla saklanır
+    def __init__(self):
+        self.pages = {}
+
+    def write(self, page_num, data, extension):
+        self.pages[page_num + 1] = data
+        return data
+
+
 class PDFTools:
     def __init__(self):
         pass
 
-    def merge_pdfs(self, pdf_files, output_path):
-        merger = PdfMerger()
-        for pdf_file in pdf_files:
-            merger.append(pdf_file)
-        merger.write(output_path)
-        merger.close()
+    def merge_pdfs(self, pdf_files, output_path, pages=None, outlines="keep", dedupe=True, progress_callback=None):
+        # outlines: keep = başlıklar olduğu gibi (PdfMerger davranışı), merge = her dosya için bir üst başlık,
+        # none = başlık yok
+        # pages: pdf_files ile aynı sırada, her dosya için None veya "1-3,7" biçiminde sayfa seçimi
+        if outlines not in ("merge", "keep", "none"):
+            raise ValueError(f"Geçersiz başlık modu: {outlines}")
+        pages = list(pages) if pages is not None else [None] * len(pdf_files)
+        if len(pages) != len(pdf_files):
+            raise ValueError("Sayfa seçimi sayısı dosya sayısıyla aynı olmalı")
+        if len(pdf_files) <= PDF_MERGE_GROUP_SIZE:
+            return self._merge_group(pdf_files, output_path, pages, outlines, dedupe, progress_callback)
+        
+        temp_dir = tempfile.mkdtemp(prefix="toolbox-merge-", dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            parts = []
+            size = PDF_MERGE_GROUP_SIZE
+            for start in range(0, len(pdf_files), size):
+                part = os.path.join(temp_dir, f"part_{len(parts)}.pdf")
+                callback = None
+                if progress_callback is not None:
+                    callback = lambda done, total, start=start: progress_callback(start + done, len(pdf_files))
+                self._merge_group(pdf_files[start:start + size], part, pages[start:start + size],
+                                  outlines, dedupe, callback)
+                parts.append(part)
+            return self.merge_pdfs(parts, output_path, outlines="none" if outlines == "none" else "keep",
+                                   dedupe=dedupe)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _merge_group(self, pdf_files, output_path, pages, outlines, dedupe, progress_callback=None):
+        # Kaynak akışlar kaydetme anına kadar diskten okunur; bu yüzden kaynaklar kayıt bitene kadar açık kalır
+        sources = []
+        output = pikepdf.new()
+        try:
+            entries = []
+            for done, (pdf_file, selection) in enumerate(zip(pdf_files, pages), 1):
+                source = pikepdf.open(pdf_file)
+                sources.append(source)
+                page_map = {}
+                first_page = len(output.pages)
+                for index in parse_page_ranges(selection, len(source.pages)):
+                    output.pages.append(source.pages[index])
+                    page_map[source.pages[index].obj.objgen] = output.pages[-1].obj
+                if page_map:
+                    entries.append((pdf_file, source, page_map, first_page))
+                if progress_callback is not None:
+                    progress_callback(done, len(pdf_files))
+            
+            if outlines != "none":
+                with output.open_outline() as outline:
+                    for pdf_file, source, page_map, first_page in entries:
+                        with source.open_outline() as source_outline:
+                            items = _copy_outline_items(source, source_outline.root, page_map)
+                        if outlines == "keep":
+                            outline.root.extend(items)
+                            continue
+                        title = os.path.splitext(os.path.basename(pdf_file))[0]
+                        top = pikepdf.OutlineItem(title, first_page)
+                        top.children.extend(items)
+                        outline.root.append(top)
+            
+            if dedupe:
+                dedupe_objects(output)
+            output.save(output_path, compress_streams=True,
+                        object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        finally:
+            output.close()
+            for source in sources:
+                source.close()
         return output_path
 
-    def split_pdf(self, pdf_file, output_dir, split_type="pages", pages_per_split=1):
-        reader = PdfReader(pdf_file)
-        total_pages = len(reader.pages)
-        output_files = []
+    def split_pdf(self, pdf_file, output_dir, split_type="pages", pages_per_split=1, ranges=None, max_size=None,
+                  outlines=True, workers=None, progress_callback=None):
+        # split_type: pages = sabit sayfa sayısı (1 = her sayfa ayrı dosya), ranges = aralık listesi,
+        # bookmarks = üst seviye yer imleri, size = max_size baytı aşmayan parçalar
+        if split_type not in SPLIT_TYPES:
+            raise ValueError(f"Geçersiz ayırma türü: {split_type}")
+        with pikepdf.open(pdf_file) as source:
+            chunks = self._plan_split(source, split_type, pages_per_split, ranges, max_size)
+            
+            used = set()
+            planned = []
+            for name, page_numbers in chunks:
+                output_file = os.path.join(output_dir, f"{name}.pdf")
+                index = 1
+                while output_file in used:
+                    output_file = os.path.join(output_dir, f"{name}_{index}.pdf")
+                    index += 1
+                used.add(output_file)
+                planned.append((output_file, page_numbers))
+            
+            workers = min(PDF_SPLIT_WORKERS if workers is None else int(workers), len(planned))
+            if workers <= 1:
+                # Tek süreçte planlama için açılan kaynak tüm parçalar için yeniden kullanılır
+                return _write_chunks_from(source, planned, outlines, progress_callback)
         
+        # Parçalar süreç başına birkaç gruba bölünür; her grup kaynağı bir kez açar
+        group_size = max(1, -(-len(planned) // (workers * PDF_RENDER_CHUNKS_PER_WORKER)))
+        groups = [planned[i:i + group_size] for i in range(0, len(planned), group_size)]
+        output_files = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for written in executor.map(_write_split_chunks, [pdf_file] * len(groups), groups,
+                                        [outlines] * len(groups)):
+                output_files.extend(written)
+                if progress_callback is not None:
+                    progress_callback(len(output_files), len(planned))
+        return output_files
+
+    def _plan_split(self, source, split_type, pages_per_split, ranges, max_size):
+        total_pages = len(source.pages)
         if split_type == "pages":
-            for i in range(0, total_pages, pages_per_split):
-                writer = PdfWriter()
-                for j in range(i, min(i + pages_per_split, total_pages)):
-                    writer.add_page(reader.pages[j])
-                output_file = os.path.join(output_dir, f"split_{i+1}-{min(i+pages_per_split, total_pages)}.pdf")
-                with open(output_file, "wb") as f:
-                    writer.write(f)
-                output_files.append(output_file)
+            pages_per_split = max(1, int(pages_per_split))
+            return [(f"split_{i+1}-{min(i+pages_per_split, total_pages)}",
+                     list(range(i, min(i + pages_per_split, total_pages))))
+                    for i in range(0, total_pages, pages_per_split)]
         
-        return output_files
+        if split_type == "ranges":
+            if not ranges:
+                raise ValueError("Aralık listesi boş olamaz")
+            if isinstance(ranges, str):
+                ranges = ranges.split(";")
+            chunks = []
+            for selection in ranges:
+                page_numbers = parse_page_ranges(selection, total_pages)
+                if page_numbers:
+                    chunks.append((f"split_{page_numbers[0]+1}-{page_numbers[-1]+1}", page_numbers))
+            return chunks
+        
+        if split_type == "bookmarks":
+            page_index = {page.obj.objgen: index for index, page in enumerate(source.pages)}
+            starts = {}
+            with source.open_outline() as outline:
+                for item in outline.root:
+                    destination = _outline_destination(source, item)
+                    index = page_index.get(destination[0].objgen) if destination is not None else None
+                    if index is not None:
+                        starts.setdefault(index, item.title)
+            if not starts:
+                raise ValueError("PDF'te sayfaya bağlı yer imi bulunamadı")
+            bounds = sorted(starts)
+            chunks = []
+            if bounds[0] > 0:
+                chunks.append((f"{0:02d}_split_1-{bounds[0]}", list(range(bounds[0]))))
+            for number, start in enumerate(bounds, 1):
+                end = bounds[number] if number < len(bounds) else total_pages
+                chunks.append((f"{number:02d}_{_split_filename(starts[start])}", list(range(start, end))))
+            return chunks
+        
+        if not max_size or int(max_size) <= 0:
+            raise ValueError("Boyuta göre ayırmak için max_size (bayt) verilmeli")
+        max_size = int(max_size)
+        # Parça boyutu, parçadaki sayfaların ulaştığı benzersiz nesnelerin toplamıyla tahmin edilir;
+        # birden çok sayfanın paylaştığı font/görsel parçada bir kez sayılır
+        chunks = []
+        current, current_objects, current_size = [], set(), SPLIT_FILE_OVERHEAD
+        for index, page in enumerate(source.pages):
+            resources = _page_resources(page.obj)
+            added = len(page.obj.unparse(resolved=True)) + sum(
+                size for objgen, size in resources.items() if objgen not in current_objects)
+            if current and current_size + added > max_size:
+                chunks.append(current)
+                current, current_objects, current_size = [], set(), SPLIT_FILE_OVERHEAD
+                added = len(page.obj.unparse(resolved=True)) + sum(resources.values())
+            current.append(index)
+            current_objects.update(resources)
+            current_size += added
+        if current:
+            chunks.append(current)
+        return [(f"split_{chunk[0]+1}-{chunk[-1]+1}", chunk) for chunk in chunks]
 
-    def pdf_to_jpg(self, pdf_file, output_dir, dpi=300):
+    def pdf_to_jpg(self, pdf_file, output_dir, dpi=300, pages=None, workers=None, quality=95, progress_callback=None):
+        return self.pdf_to_images(pdf_file, output_dir, dpi=dpi, format="jpeg", quality=quality, pages=pages,
+                                  workers=workers, progress_callback=progress_callback)
+
+    def pdf_to_images(self, pdf_file, output_dir, dpi=300, format="png", quality=95, grayscale=False, alpha=False,
+                      pages=None, workers=None, progress_callback=None):
+        return list(self.export_pages(pdf_file, DirectorySink(output_dir), dpi=dpi, format=format, quality=quality,
+                                      grayscale=grayscale, alpha=alpha, pages=pages, workers=workers,
+                                      progress_callback=progress_callback))
+
+    def export_pages(self, pdf_file, sink, dpi=300, format="jpeg", quality=95, grayscale=False, alpha=False,
+                     pages=None, workers=None, progress_callback=None):
+        # Sayfalar tek tek üretilir; her sayfa yazılır yazılmaz sink.write sonucu döndürülür
+        format = format.lower().lstrip(".")
+        if format not in IMAGE_FORMATS:
+            raise ValueError(f"Desteklenmeyen görüntü formatı: {format}")
+        extension = IMAGE_FORMATS[format]
+        options = (dpi, extension, quality, grayscale, alpha)
         doc = fitz.open(pdf_file)
-        image_files = []
+        try:
+            page_numbers = parse_page_ranges(pages, len(doc))
+            workers = min(PDF_RENDER_WORKERS if workers is None else int(workers), len(page_numbers))
+            if workers <= 1 or len(page_numbers) < PDF_RENDER_MIN_PARALLEL_PAGES:
+                rendered = ((page_num, _encode_page(doc, page_num, *options)) for page_num in page_numbers)
+                yield from self._write_pages(rendered, sink, extension, len(page_numbers), progress_callback)
+                return
+        finally:
+            doc.close()
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            output_file = os.path.join(output_dir, f"page_{page_num+1}.jpg")
-            img.save(output_file, "JPEG", quality=95)
-            image_files.append(output_file)
-        
-        doc.close()
-        return image_files
+        rendered = self._render_parallel(pdf_file, page_numbers, options, workers)
+        yield from self._write_pages(rendered, sink, extension, len(page_numbers), progress_callback)
+
+    def _render_parallel(self, pdf_file, page_numbers, options, workers):
+        # Sayfalar ardışık parçalara bölünür; sonuçlar sayfa sırasıyla döndürülür
+        chunk_size = max(1, -(-len(page_numbers) // (workers * PDF_RENDER_CHUNKS_PER_WORKER)))
+        chunks = deque(page_numbers[i:i + chunk_size] for i in range(0, len(page_numbers), chunk_size))
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pending = deque()
+        try:
+            while chunks or pending:
+                while chunks and len(pending) < workers * PDF_RENDER_PENDING_PER_WORKER:
+                    pending.append(executor.submit(_encode_chunk, pdf_file, chunks.popleft(), options))
+                yield from pending.popleft().result()
+        finally:
+            # Üretici erken bırakılırsa bekleyen parçalar iptal edilir
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _write_pages(self, rendered, sink, extension, total, progress_callback=None):
+        for done, (page_num, data) in enumerate(rendered, 1):
+            result = sink.write(page_num, data, extension)
+            if progress_callback is not None:
+                progress_callback(done, total)
+            yield result
 
     def jpg_to_pdf(self, image_files, output_path):
         doc = fitz.open()
@@ -62,11 +669,117 @@ class PDFTools:
         doc.close()
         return output_path
 
-    def compress_pdf(self, pdf_file, output_path, quality="/ebook"):
-        with pikepdf.open(pdf_file) as pdf:
-            pdf.save(output_path, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    def compress_pdf(self, pdf_file, output_path, quality="/ebook", dpi=None, image_quality=None, image_format="jpeg",
+                     subset_fonts=True, workers=None, progress_callback=None):
+        self.compress_pdf_report(pdf_file, output_path, quality, dpi, image_quality, image_format,
+                                 subset_fonts, workers, progress_callback)
         return output_path
 
+    def compress_pdf_report(self, pdf_file, output_path, quality="/ebook", dpi=None, image_quality=None,
+                            image_format="jpeg", subset_fonts=True, workers=None, progress_callback=None):
+        if quality not in COMPRESS_PRESETS:
+            raise ValueError(f"Geçersiz sıkıştırma ön ayarı: {quality}")
+        if image_format not in COMPRESS_IMAGE_FORMATS:
+            raise ValueError(f"Desteklenmeyen görsel formatı: {image_format}")
+        dpi = dpi or COMPRESS_PRESETS[quality]["dpi"]
+        image_quality = image_quality or COMPRESS_PRESETS[quality]["quality"]
+        
+        temp_dir = tempfile.mkdtemp(prefix="toolbox-compress-", dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            source = pdf_file
+            fonts_subset = False
+            doc = fitz.open(pdf_file)
+            try:
+                placements = _image_dpi(doc)
+                if subset_fonts:
+                    # fontTools gerektirir; kurulu değilse veya font alt kümelenemiyorsa fontlar olduğu gibi kalır
+                    try:
+                        doc.subset_fonts()
+                        source = os.path.join(temp_dir, "subset.pdf")
+                        # garbage=0: nesne numaraları korunur, görsel xref'leri geçerli kalır
+                        doc.save(source)
+                        fonts_subset = True
+                    except Exception:
+                        source = pdf_file
+            finally:
+                doc.close()
+            
+            with pikepdf.open(source) as pdf:
+                # Aynı içerikli görseller bir kez sıkıştırılır; ortak ölçek en büyük gösterime göre seçilir
+                # fitz yalnızca nesne numarasını verir; kuşak numarası sıfır varsayılmaz
+                images = {obj.objgen[0]: obj for obj in pdf.objects
+                          if isinstance(obj, pikepdf.Stream) and obj.get("/Subtype") == "/Image"}
+                groups = {}
+                for objnum, effective in placements.items():
+                    obj = images.get(objnum)
+                    if obj is None:
+                        continue
+                    if min(int(obj.get("/Width", 0)), int(obj.get("/Height", 0))) < COMPRESS_MIN_IMAGE_SIDE:
+                        continue
+                    key = _object_key(obj, {})
+                    group = groups.setdefault(key, {"objects": [], "dpi": effective, "filter": obj.get("/Filter")})
+                    group["objects"].append(obj)
+                    group["dpi"] = min(group["dpi"], effective)
+                tasks = []
+                members = {}
+                for group in groups.values():
+                    scale = dpi / group["dpi"] if group["dpi"] > dpi * COMPRESS_DPI_THRESHOLD else 1.0
+                    if scale == 1.0 and group["filter"] in LOSSY_FILTERS:
+                        continue
+                    objgen = group["objects"][0].objgen
+                    tasks.append((objgen, scale))
+                    members[objgen] = group["objects"]
+                
+                results = self._run_image_tasks(source, tasks, image_format, image_quality, workers, progress_callback)
+                for objgen, data, size, mode, filter in results:
+                    for member in members[objgen]:
+                        _apply_image(member, data, size, mode, filter)
+                
+                deduplicated = dedupe_objects(pdf)
+                pdf.remove_unreferenced_resources()
+                pdf.save(output_path, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        with pikepdf.open(pdf_file) as pdf:
+            before = object_class_sizes(pdf)
+        with pikepdf.open(output_path) as pdf:
+            after = object_class_sizes(pdf)
+        return {
+            "output": output_path,
+            "preset": quality,
+            "dpi": dpi,
+            "image_quality": image_quality,
+            "image_format": image_format,
+            "images_recompressed": sum(len(members[result[0]]) for result in results),
+            "objects_deduplicated": deduplicated,
+            "fonts_subset": fonts_subset,
+            "input_size": os.path.getsize(pdf_file),
+            "output_size": os.path.getsize(output_path),
+            "classes": {name: {"before": before[name], "after": after[name]} for name in OBJECT_CLASSES}
+        }
+
+    def _run_image_tasks(self, pdf_file, tasks, format, quality, workers=None, progress_callback=None):
+        if not tasks:
+            return []
+        workers = min(PDF_COMPRESS_WORKERS if workers is None else int(workers), len(tasks))
+        group_size = max(1, -(-len(tasks) // (max(workers, 1) * PDF_RENDER_CHUNKS_PER_WORKER)))
+        groups = [tasks[i:i + group_size] for i in range(0, len(tasks), group_size)]
+        results = []
+        if workers <= 1:
+            for done, group in enumerate(groups, 1):
+                results.extend(_recompress_images(pdf_file, group, format, quality))
+                if progress_callback is not None:
+                    progress_callback(done, len(groups))
+            return results
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for done, group_results in enumerate(executor.map(_recompress_images, [pdf_file] * len(groups), groups,
+                                                              [format] * len(groups), [quality] * len(groups)), 1):
+                results.extend(group_results)
+                if progress_callback is not None:
+                    progress_callback(done, len(groups))
+        return results
+
     def add_watermark_text(self, pdf_file, output_path, text, position=(100, 100), opacity=0.5):
         doc = fitz.open(pdf_file)
         for page in doc: